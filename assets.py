@@ -0,0 +1,80 @@
+import io
+import os
+import time
+from urllib.parse import parse_qs, urlparse
+
+import discord
+
+ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+URL_EXPIRY_MARGIN = 3600 # Stop reusing a signed CDN URL an hour before Discord expires it
+
+class AssetCache:
+    """Media files read into memory once and served as discord.File objects from buffers.
+
+    With reuse_urls on, the CDN URL of an upload that stays on its message (remember()) is
+    reused for later embeds instead of uploading the same bytes again, until the URL's signature
+    is close to expiring.
+    """
+    def __init__(self, directory: str = ASSET_DIR, reuse_urls: bool = False):
+        self.directory = directory
+        self.reuse_urls = reuse_urls
+        self._blobs: dict[str, bytes] = {}
+        self._urls: dict[str, tuple[str, float]] = {} # name -> (url, expires)
+
+    def load(self) -> int:
+        """Reads every file in the directory. Returns the number of bytes held."""
+        blobs = {}
+        try: names = os.listdir(self.directory)
+        except FileNotFoundError: names = []
+        for name in names:
+            path = os.path.join(self.directory, name)
+            if not os.path.isfile(path): continue
+            with open(path, "rb") as f:
+                blobs[name] = f.read()
+        self._blobs = blobs
+        return sum(len(b) for b in blobs.values())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._blobs
+
+    def file(self, name: str, filename: str | None = None) -> discord.File | None:
+        blob = self._blobs.get(name)
+        if blob is None: return None
+        # BytesIO shares the bytes object until written to, so this doesn't copy
+        return discord.File(io.BytesIO(blob), filename=filename or name)
+
+    def cdn_url(self, name: str) -> str | None:
+        if not self.reuse_urls: return None
+        cached = self._urls.get(name)
+        if not cached: return None
+        url, expires = cached
+        if expires - URL_EXPIRY_MARGIN <= time.time():
+            del self._urls[name]
+            return None
+        return url
+
+    def thumbnail(self, embed: discord.Embed, name: str, filename: str | None = None) -> list[discord.File] | None:
+        """Points the embed thumbnail at the asset. Returns the attachments to send with it
+        ([] when a CDN URL is reused), or None if the asset doesn't exist."""
+        url = self.cdn_url(name)
+        if url:
+            embed.set_thumbnail(url=url)
+            return []
+        file = self.file(name, filename)
+        if file is None: return None
+        embed.set_thumbnail(url=f"attachment://{file.filename}")
+        return [file]
+
+    def remember(self, name: str, message: discord.Message | None, filename: str | None = None):
+        """Records the CDN URL of the asset uploaded on `message` for later reuse."""
+        if not self.reuse_urls or message is None: return
+        filename = filename or name
+        for attachment in message.attachments:
+            if attachment.filename == filename:
+                self._urls[name] = (attachment.url, _url_expiry(attachment.url))
+                return
+
+def _url_expiry(url: str) -> float:
+    # Signed attachment URLs carry their expiry as hex epoch seconds in ?ex=
+    try: return int(parse_qs(urlparse(url).query)["ex"][0], 16)
+    except (KeyError, ValueError, IndexError): return time.time() + 12 * 3600
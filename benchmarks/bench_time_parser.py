@@ -0,0 +1,191 @@
+"""Micro-benchmark: single-pass time_parser.parse_time_input vs. the old exception-cascade parser.
+
+Run from the repo root: python benchmarks/bench_time_parser.py
+"""
+import os
+import re
+import sys
+import timeit
+import zoneinfo
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from time_parser import parse_time_input
+
+# --- Legacy implementation (verbatim from main.py before the rewrite) ---
+def legacy_parse_duration_string(input_str: str) -> int:
+    if not input_str: return 0
+    clean_str = input_str.strip().lower()
+    
+    # Check for plain number (default to minutes)
+    if clean_str.isdigit():
+        return int(clean_str) * 60
+        
+    # Composite Parser (e.g. "47h 30m", "1d 2h")
+    # Finds all pairs of (number, unit)
+    matches = re.findall(r"(\d+)\s*([a-z]+)", clean_str)
+    
+    if not matches:
+        # No units found, and wasn't a plain number.
+        raise ValueError(f"Invalid Duration: '{input_str}'. Use '30m', '1h', '1d', or '1h 30m'.")
+        
+    total_seconds = 0
+    valid_units = ['m', 'min', 'mins', 'h', 'hr', 'hour', 'hours', 'd', 'day', 'days']
+    
+    for val_str, unit in matches:
+        if unit not in valid_units:
+             raise ValueError(f"Invalid Unit: '{unit}' in '{input_str}'.")
+             
+        val = int(val_str)
+        if unit in ['m', 'min', 'mins']: total_seconds += val * 60
+        elif unit in ['h', 'hr', 'hour', 'hours']: total_seconds += val * 3600
+        elif unit in ['d', 'day', 'days']: total_seconds += val * 86400
+
+    return total_seconds
+
+def legacy_parse_time_input(user_input: str, mode: str = "smart", user_tz_str: str = "UTC") -> int | tuple[str, str]:
+    user_input = user_input.strip().lower()
+    
+    # Clean up timezone suffixes that NLP might incorrectly leave in the time string
+    user_input = re.sub(r'\s*\(?utc\)?$', '', user_input)
+    user_input = re.sub(r'\s*\(?gmt\)?$', '', user_input)
+    user_input = user_input.strip()
+    
+    try:
+        user_tz = zoneinfo.ZoneInfo(user_tz_str) if user_tz_str.upper() != "UTC" else timezone.utc
+    except:
+        user_tz = timezone.utc
+        
+    current_local = datetime.now(user_tz)
+    current_utc = datetime.now(timezone.utc)
+    
+    if mode == "smart":
+        try: return legacy_parse_time_input(user_input, "utc_custom", user_tz_str)
+        except: pass
+        try: return legacy_parse_time_input(user_input, "utc_date_only", user_tz_str)
+        except: pass
+        if re.match(r"^\d{1,2}:\d{2}$", user_input):
+             try: return legacy_parse_time_input(user_input, "utc_today", user_tz_str)
+             except: pass
+        try: return legacy_parse_time_input(user_input, "duration", user_tz_str)
+        except: pass
+        raise ValueError(f"Invalid Time. Use '10m', '14:00' ({user_tz_str}), or 'YYYY-MM-DD'.")
+
+    if mode == "duration":
+        # Don't catch/mask here, let parse_duration_string error bubble up
+        seconds = legacy_parse_duration_string(user_input)
+        return int((current_utc + timedelta(seconds=seconds)).timestamp())
+        
+    elif mode == "utc_today":
+        match = re.match(r"^(\d{1,2}):(\d{2})$", user_input)
+        if match:
+            hour = int(match.group(1))
+            minute = int(match.group(2))
+            if not (0 <= hour <= 23 and 0 <= minute <= 59): raise ValueError("Time out of range.")
+            target = current_local.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            return int(target.timestamp())
+        raise ValueError("Invalid Format.")
+
+    elif mode == "utc_tomorrow":
+        match = re.match(r"^(\d{1,2}):(\d{2})$", user_input)
+        if match:
+            hour = int(match.group(1))
+            minute = int(match.group(2))
+            target = current_local.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            target += timedelta(days=1)
+            return int(target.timestamp())
+        raise ValueError("Invalid Format.")
+
+    elif mode == "utc_custom":
+        formats = [
+            "%Y-%m-%d %H:%M",
+            "%Y/%m/%d %H:%M",
+            "%Y-%m-%d %H:%M:%S",
+            "%Y/%m/%d %H:%M:%S",
+            "%d-%m-%Y %H:%M",
+            "%d/%m/%Y %H:%M"
+        ]
+        for fmt in formats:
+            try:
+                user_tz = zoneinfo.ZoneInfo(user_tz_str) if user_tz_str.upper() != "UTC" else timezone.utc
+            except:
+                user_tz = timezone.utc
+            
+            try:
+                dt = datetime.strptime(user_input, fmt)
+                dt = dt.replace(tzinfo=user_tz)
+                return int(dt.timestamp())
+            except ValueError: continue
+        raise ValueError("Invalid Format.")
+
+    elif mode == "utc_date_only":
+        formats = [
+            "%Y-%m-%d",
+            "%Y/%m/%d",
+            "%d-%m-%Y",
+            "%d/%m/%Y"
+        ]
+        for fmt in formats:
+            try:
+                user_tz = zoneinfo.ZoneInfo(user_tz_str) if user_tz_str.upper() != "UTC" else timezone.utc
+            except:
+                user_tz = timezone.utc
+
+            try:
+                dt = datetime.strptime(user_input, fmt)
+                dt = dt.replace(tzinfo=user_tz)
+                return ("DATE_ONLY", dt.strftime("%Y-%m-%d"))
+            except ValueError: continue
+        raise ValueError("Invalid Format.")
+    
+    raise ValueError("Invalid time expression.")
+
+# --- Benchmark ---
+INPUTS = [
+    ("10m", "UTC"),
+    ("1h 30m", "UTC"),
+    ("14:00", "UTC"),
+    ("14:00", "America/New_York"),
+    ("2026-06-25 15:00", "UTC"),
+    ("2026/06/25 15:00:30", "Asia/Kolkata"),
+    ("25/06/2026 15:00", "Europe/Berlin"),
+    ("2026-06-25", "UTC"),
+    ("25-06-2026", "UTC"),
+    ("garbage", "UTC"),
+]
+
+def check_equivalence():
+    """Same answers as the legacy parser for every input it supports (durations within 1s)."""
+    for text, tz in INPUTS:
+        try: old = legacy_parse_time_input(text, "smart", tz)
+        except ValueError: old = ValueError
+        try: new = parse_time_input(text, "smart", tz)
+        except ValueError: new = ValueError
+        if isinstance(old, int) and isinstance(new, int):
+            assert abs(old - new) <= 1, (text, tz, old, new)
+        else:
+            assert old == new, (text, tz, old, new)
+
+def bench(fn, number: int) -> float:
+    def run():
+        for text, tz in INPUTS:
+            try: fn(text, "smart", tz)
+            except ValueError: pass
+    return min(timeit.repeat(run, number=number, repeat=5)) / (number * len(INPUTS))
+
+def _safe(fn, text: str, tz: str):
+    try: return fn(text, "smart", tz)
+    except ValueError: return None
+
+if __name__ == "__main__":
+    check_equivalence()
+    n = 2000
+    old = bench(legacy_parse_time_input, n)
+    new = bench(parse_time_input, n)
+    print(f"legacy parse_time_input: {old * 1e6:8.2f} us/call")
+    print(f"single-pass parser:      {new * 1e6:8.2f} us/call")
+    print(f"speedup:                 {old / new:8.1f}x")
+    for text, tz in INPUTS:
+        o = min(timeit.repeat(lambda: _safe(legacy_parse_time_input, text, tz), number=n, repeat=3)) / n
+        w = min(timeit.repeat(lambda: _safe(parse_time_input, text, tz), number=n, repeat=3)) / n
+        print(f"  {text!r:28} {tz:18} {o * 1e6:7.2f} -> {w * 1e6:6.2f} us ({o / w:4.1f}x)")
@@ -0,0 +1,84 @@
+"""Benchmark: per-timer dicts vs. the slotted timer_model.Timer.
+
+Timer is what the TimerIndex keeps between saves; the scheduler pass still scans the dicts it
+loads each tick, so that scan is timed as-is for reference, not compared. Reports retained memory
+per 100k timers (as loaded from the stored JSON), the cost of building the index copies, and
+checks that Timer round-trips every row losslessly.
+
+Run from the repo root: python benchmarks/bench_timer_model.py
+"""
+import gc
+import json
+import os
+import random
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from timer_model import Timer
+
+N = 100_000
+NOW = 1_800_000_000
+
+NOTIFY = ["📢 Message in Server (Ping Role)", "📩 DM Me", "⚠️ Message in Server (Ping @everyone)", "🔕 Message in Server (Silent)"]
+LABELS = ["🐻 Bear Trap", "🛡️ Arena Reset", "🤡 Crazy Joe", "🏰 Castle Battle", "⚔️ SvS Battle", "Foundry"]
+
+def make_rows(n: int) -> str:
+    rng = random.Random(7)
+    rows = []
+    for i in range(n):
+        end = NOW + rng.randint(-600, 86400 * 3)
+        row = {
+            "id": f"{i:012x}", "label": f"{rng.choice(LABELS)} {i % 7}", "end_epoch": end, "start_epoch": end - 86400,
+            "owner_id": 100000000000000000 + rng.randint(0, 10**6), "role_id": 200000000000000000 + rng.randint(0, 1000),
+            "notify_method": rng.choice(NOTIFY), "mode": "smart", "recurrence_seconds": rng.choice([0, 86400, 171000]),
+            "image_url": None, "discord_event_id": None, "event_duration": 900,
+            "reminders": rng.choice([[], [300], [1800, 300], [18000, 3600]]), "sent_reminders": [],
+            "description": "Prepare your troops!",
+        }
+        if i % 10 == 0: row["override_epoch"] = end + 3600
+        rows.append(row)
+    # Serialize so both sides start from freshly parsed JSON, like load_legacy_data()
+    return json.dumps(rows)
+
+# --- The check_timers scan over the loaded dicts, minus the sends ---
+def scan_dicts(timers: list) -> tuple[int, int]:
+    due_reminders = expired = 0
+    for timer in timers:
+        if timer.get("type") == "foundry_job": continue
+        reminders = timer.get("reminders", [])
+        sent = timer.get("sent_reminders", [])
+        target_epoch = timer.get("override_epoch", timer["end_epoch"])
+        remain = target_epoch - NOW
+        for r_sec in reminders:
+            if r_sec in sent: continue
+            if remain <= r_sec and remain > -60: due_reminders += 1
+        if NOW >= target_epoch: expired += 1
+    return due_reminders, expired
+
+def retained(build) -> tuple[int, object]:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, obj
+
+if __name__ == "__main__":
+    blob = make_rows(N)
+
+    dict_bytes, dicts = retained(lambda: json.loads(blob))
+    # Converting happens once per load; the dicts are dropped afterwards
+    timer_bytes, timers = retained(lambda: [Timer.from_dict(d) for d in json.loads(blob)])
+
+    assert all(t.to_dict() == d for t, d in zip(timers, dicts)), "round trip is not lossless"
+
+    t_scan = min(timeit.repeat(lambda: scan_dicts(dicts), number=5, repeat=5)) / 5
+    t_conv = min(timeit.repeat(lambda: [Timer.from_dict(d) for d in dicts], number=1, repeat=3))
+
+    print(f"memory per {N:,} timers:  dicts {dict_bytes / 2**20:7.1f} MiB   Timer {timer_bytes / 2**20:7.1f} MiB   ({dict_bytes / timer_bytes:.1f}x smaller)")
+    print(f"index build (dict -> Timer): {t_conv * 1e3:.1f} ms per {N:,}")
+    print(f"scheduler scan (dicts, unchanged): {t_scan * 1e3:.1f} ms per {N:,}")
@@ -1,6 +1,7 @@
 import os
 import logging
 import sqlite3
+import threading
 
 from dotenv import load_dotenv
 
@@ -84,49 +85,273 @@ def init_db():
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS legacy_bot_data (
             guild_id TEXT PRIMARY KEY,
-            data TEXT
+            data TEXT,
+            version INTEGER DEFAULT 0
+        )
+    """)
+    
+    # Alert outbox: written with the timer state change, drained by the delivery worker
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS alert_outbox (
+            key TEXT PRIMARY KEY,
+            kind TEXT,
+            payload TEXT,
+            due REAL,
+            status TEXT DEFAULT 'pending',
+            attempts INTEGER DEFAULT 0,
+            next_attempt REAL,
+            delivered REAL,
+            last_error TEXT,
+            context_id TEXT
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_alert_outbox_pending ON alert_outbox (status, next_attempt)")
+    
+    # Bot bookkeeping (e.g. hash of the last synced command tree)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS bot_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
         )
     """)
     
     # Run migrations
-    try:
-        cursor.execute("ALTER TABLE bot_settings ADD COLUMN giftcode_dashboard_id TEXT")
-    except Exception as e:
-        # Ignore if the column already exists
-        if "duplicate column name" not in str(e).lower() and "already exists" not in str(e).lower():
-            logger.debug(f"Migration notice: {e}")
+    for migration in ("ALTER TABLE bot_settings ADD COLUMN giftcode_dashboard_id TEXT",
+                      "ALTER TABLE alert_outbox ADD COLUMN context_id TEXT",
+                      "ALTER TABLE legacy_bot_data ADD COLUMN version INTEGER DEFAULT 0"):
+        try:
+            cursor.execute(migration)
+        except Exception as e:
+            # Ignore if the column already exists
+            if "duplicate column name" not in str(e).lower() and "already exists" not in str(e).lower():
+                logger.debug(f"Migration notice: {e}")
 
     conn.commit()
     conn.close()
     logger.info("Turso database initialized successfully.")
 
-def load_legacy_data() -> dict:
+# guild_id -> (hash of the JSON, row version) as this process last read or wrote it
+_row_state: dict[str, tuple[int, int]] = {}
+# Rows a load found changed since this process last read or wrote them (see pop_changed_rows)
+_changed_rows: set[str] = set()
+# Loads also run in worker threads (speculative snapshots): guards the two above
+_state_lock = threading.Lock()
+
+def _note_rows(states: dict[str, tuple[int, int]], changed: bool):
+    """Records rows as read (changed=True) or written. Versions only move forward, so a load
+    that read a row before a save committed can't roll its state back."""
+    with _state_lock:
+        for gid, state in states.items():
+            known = _row_state.get(gid)
+            if known and known[1] > state[1]: continue
+            if changed and known != state: _changed_rows.add(gid)
+            _row_state[gid] = state
+
+class RowConflict(Exception):
+    """Another process wrote the row after this one loaded it. Nothing was saved; reload and retry."""
+
+class LegacyData(dict):
+    """The loaded contexts, plus the (digest, version) each row had when loaded.
+
+    save_legacy_data skips rows whose JSON still matches, so only contexts this caller changed
+    are written, and writes those only if the row is still at the loaded version: a save can't
+    overwrite a write it hasn't seen, from another process or from a newer load in this one."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.loaded: dict[str, tuple[int, int]] = {}
+
+def _context_clause(scope: tuple[int, tuple[int, ...]] | None) -> tuple[str, tuple]:
+    """SQL filter for the legacy rows a set of shards needs: global rows (non-numeric ids, e.g.
+    USER_PREFS) always, DM contexts with shard 0, guild contexts by (id >> 22) % count."""
+    if not scope: return "", ()
+    count, ids = scope
+    kind = "COALESCE(json_extract(data, '$.kind'), '')"
+    return (f" WHERE guild_id GLOB '*[^0-9]*' OR ({kind} = 'dm' AND ?)"
+            f" OR ({kind} != 'dm' AND (CAST(guild_id AS INTEGER) >> 22) % ? IN ({', '.join('?' * len(ids))}))"), (int(0 in ids), count, *ids)
+
+def load_legacy_data(scope: tuple[int, tuple[int, ...]] | None = None) -> dict:
+    """Every context, or with scope = (shard_count, shard_ids) only the ones those shards own."""
     conn = get_db_connection()
     if not conn: return {}
+    clause, params = _context_clause(scope)
     cursor = conn.cursor()
-    cursor.execute("SELECT guild_id, data FROM legacy_bot_data")
+    cursor.execute(f"SELECT guild_id, data, COALESCE(version, 0) FROM legacy_bot_data{clause}", params)
     rows = cursor.fetchall()
     conn.close()
     
     import json
-    result = {}
-    for gid, data in rows:
+    result = LegacyData()
+    for gid, data, version in rows:
+        gid = str(gid)
         result[gid] = json.loads(data)
+        result.loaded[gid] = (hash(data), version)
+    _note_rows(result.loaded, changed=True)
     return result
 
-def save_legacy_data(data: dict):
+def pop_changed_rows() -> set[str]:
+    """Ids whose stored JSON differed, when loaded, from what this process last read or wrote:
+    on the first load every row, later the rows other processes wrote."""
+    global _changed_rows
+    with _state_lock:
+        changed, _changed_rows = _changed_rows, set()
+    return changed
+
+def save_legacy_data(data: dict, outbox: list[dict] | None = None) -> set[str]:
+    """Writes every context that changed since it was loaded/saved; outbox entries (see
+    add_outbox_rows) go in the same transaction. Returns the ids written.
+
+    All or nothing: raises RowConflict, having written nothing, if one of the rows was updated
+    (or created) since it was loaded (see LegacyData)."""
     conn = get_db_connection()
-    if not conn: return
+    if not conn: return set()
     cursor = conn.cursor()
     import json
-    for gid, gdata in data.items():
-        cursor.execute("""
-            INSERT OR REPLACE INTO legacy_bot_data (guild_id, data)
-            VALUES (?, ?)
-        """, (str(gid), json.dumps(gdata)))
-    conn.commit()
-    conn.close()
+    # A plain dict (not from load_legacy_data) is checked against the last state this process saw
+    if isinstance(data, LegacyData): loaded = data.loaded
+    else:
+        with _state_lock: loaded = dict(_row_state)
+    written = {}
+    try:
+        for gid, gdata in data.items():
+            gid = str(gid)
+            blob = json.dumps(gdata)
+            digest = hash(blob)
+            base = loaded.get(gid)
+            if base and base[0] == digest: continue
+            version = base[1] if base else None
+            if version is None:
+                cursor.execute("""
+                    INSERT OR IGNORE INTO legacy_bot_data (guild_id, data, version)
+                    VALUES (?, ?, 1)
+                """, (gid, blob))
+            else:
+                cursor.execute("""
+                    UPDATE legacy_bot_data SET data = ?, version = ?
+                    WHERE guild_id = ? AND COALESCE(version, 0) = ?
+                """, (blob, version + 1, gid, version))
+            if cursor.rowcount != 1: raise RowConflict(f"Context {gid} was changed by another process")
+            written[gid] = (digest, (version or 0) + 1)
+        if outbox: add_outbox_rows(cursor, outbox)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    _note_rows(written, changed=False)
+    loaded.update(written)
+    return set(written)
+
+# --- Alert Outbox ---
+def add_outbox_rows(cursor, entries: list[dict], lease: float = 0.0) -> int:
+    """Queues alerts. The key is the idempotency key: an alert already queued (or sent) is ignored.
+    With a lease, the worker leaves the rows alone until that long past due. Returns rows added."""
+    import json
+    cursor.executemany("""
+        INSERT OR IGNORE INTO alert_outbox (key, kind, payload, due, next_attempt, context_id)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, [(e["key"], e["kind"], json.dumps(e["payload"]), e["due"], e["due"] + lease, e.get("context_id")) for e in entries])
+    return cursor.rowcount
+
+def claim_outbox_row(entry: dict, lease: float) -> bool:
+    """Queues one alert that the caller will deliver itself. False if the key was already queued."""
+    conn = get_db_connection()
+    if not conn: return False
+    try:
+        added = add_outbox_rows(conn.cursor(), [entry], lease)
+        conn.commit()
+    finally:
+        conn.close()
+    return added == 1
 
+def _shard_clause(scope: tuple[int, tuple[int, ...]] | None) -> tuple[str, tuple]:
+    """SQL filter for rows whose context maps to one of the given shards ((id >> 22) % count).
+    Rows without a context (queued before the column existed) go to shard 0."""
+    if not scope: return "", ()
+    count, ids = scope
+    return (f" AND ((context_id IS NULL AND ?) OR (CAST(context_id AS INTEGER) >> 22) % ? IN ({', '.join('?' * len(ids))}))",
+            (int(0 in ids), count, *ids))
+
+def fetch_due_outbox(now: float, limit: int = 50, scope: tuple[int, tuple[int, ...]] | None = None) -> list[dict]:
+    """Due pending rows, oldest first. scope = (shard_count, shard_ids) limits them to those shards' contexts."""
+    conn = get_db_connection()
+    if not conn: return []
+    import json
+    clause, params = _shard_clause(scope)
+    try:
+        rows = conn.execute(f"""
+            SELECT key, kind, payload, due, attempts FROM alert_outbox
+            WHERE status = 'pending' AND next_attempt <= ?{clause}
+            ORDER BY due LIMIT ?
+        """, (now, *params, limit)).fetchall()
+    finally:
+        conn.close()
+    return [{"key": k, "kind": kind, "payload": json.loads(p), "due": due, "attempts": a} for k, kind, p, due, a in rows]
+
+def update_outbox(results: list[tuple]):
+    """results: (key, status, attempts, next_attempt, delivered, last_error) per row."""
+    conn = get_db_connection()
+    if not conn: return
+    try:
+        conn.executemany("""
+            UPDATE alert_outbox SET status = ?, attempts = ?, next_attempt = ?, delivered = ?, last_error = ?
+            WHERE key = ?
+        """, [(status, attempts, next_attempt, delivered, error, key) for key, status, attempts, next_attempt, delivered, error in results])
+        conn.commit()
+    finally:
+        conn.close()
+
+def outbox_stats(scope: tuple[int, tuple[int, ...]] | None = None) -> tuple[int, float | None]:
+    """Pending rows and the oldest pending due time."""
+    conn = get_db_connection()
+    if not conn: return 0, None
+    clause, params = _shard_clause(scope)
+    try:
+        return conn.execute(f"SELECT COUNT(*), MIN(due) FROM alert_outbox WHERE status = 'pending'{clause}", params).fetchone()
+    finally:
+        conn.close()
+
+def prune_outbox(before: float):
+    """Drops finished rows older than `before` (their keys have done their dedupe job by then)."""
+    conn = get_db_connection()
+    if not conn: return
+    try:
+        conn.execute("DELETE FROM alert_outbox WHERE status != 'pending' AND due < ?", (before,))
+        conn.commit()
+    finally:
+        conn.close()
+
+def storage_writable() -> bool:
+    """True if the local DB grants a write lock (BEGIN IMMEDIATE, then rolled back)."""
+    conn = get_db_connection()
+    if not conn: return False
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("ROLLBACK")
+        return True
+    except Exception as e:
+        logger.warning(f"Storage write probe failed: {e}")
+        return False
+    finally:
+        conn.close()
+
+def get_meta(key: str) -> str | None:
+    conn = get_db_connection()
+    if not conn: return None
+    try:
+        row = conn.execute("SELECT value FROM bot_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    finally:
+        conn.close()
+
+def set_meta(key: str, value: str):
+    conn = get_db_connection()
+    if not conn: return
+    try:
+        conn.execute("INSERT OR REPLACE INTO bot_meta (key, value) VALUES (?, ?)", (key, value))
+        conn.commit()
+    finally:
+        conn.close()
 
 if __name__ == "__main__":
     init_db()
@@ -0,0 +1,168 @@
+import asyncio
+import itertools
+import logging
+import time
+from collections import OrderedDict, deque
+
+import discord
+
+import metrics
+
+logger = logging.getLogger("Chrono")
+
+BATCH_REMAINING = metrics.gauge("chrono_dm_batch_remaining", "Recipients not yet attempted across in-progress DM fan-out batches.")
+BATCH_RECIPIENTS = metrics.counter("chrono_dm_batch_recipients_total", "Role fan-out recipients by outcome.", ("status",))
+
+PRIORITY_DIRECT = 0 # Manager / lead DMs: a handful of recipients, never stuck behind a big batch
+PRIORITY_BULK = 1
+CHUNK_REUSE = 60 # Seconds an unchunked guild's fetched member list serves further fan-outs
+
+class TokenBucket:
+    """`rate` tokens per second, bursting up to `burst`."""
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    async def take(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class DMBatch:
+    """One role fan-out: its recipients and what happened to each of them."""
+    def __init__(self, label: str):
+        self.label = label
+        self.created = time.time()
+        self.finished: float | None = None
+        self.resolved = False
+        self.recipients: dict[int, None] = {} # Insertion-ordered set
+        self.results: dict[int, str] = {} # user_id -> "sent" / "failed"
+
+    def add(self, user_ids) -> list[int]:
+        """Adds recipients, skipping ones already in the batch. Returns the new ones."""
+        new = [uid for uid in user_ids if uid not in self.recipients]
+        self.recipients.update(dict.fromkeys(new))
+        return new
+
+    @property
+    def pending(self) -> int:
+        return len(self.recipients) - len(self.results)
+
+    def record(self, user_id: int, status: str):
+        self.results[user_id] = status
+        BATCH_RECIPIENTS.inc(status=status)
+        if self.resolved and not self.pending: self.finished = time.time()
+
+    def summary(self) -> dict:
+        sent = sum(1 for s in self.results.values() if s == "sent")
+        return {
+            "label": self.label, "recipients": len(self.recipients), "sent": sent,
+            "failed": len(self.results) - sent, "pending": self.pending, "resolved": self.resolved,
+            "seconds": round((self.finished or time.time()) - self.created, 1),
+        }
+
+class DMFanout:
+    """Priority queue of DMs drained by a fixed pool of workers under a shared rate limit.
+
+    Callers only enqueue; workers open (or reuse) the recipient's DM channel and hand the send
+    to `deliver(send_coro, kind, target_epoch)`, which owns metrics and error logging and returns
+    whether it landed. DM channels are kept in a bounded LRU so repeat recipients cost no lookup.
+    """
+    def __init__(self, client: discord.Client, deliver, workers: int = 4, rate: float = 40.0,
+                 channel_cache: int = 5000, history: int = 50):
+        self.client = client
+        self.deliver = deliver
+        self.workers = workers
+        self.bucket = TokenBucket(rate, rate)
+        self.channel_cache = channel_cache
+        self.queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self.batches: deque[DMBatch] = deque(maxlen=history)
+        self._seq = itertools.count() # FIFO within a priority
+        self._channels: OrderedDict[int, discord.DMChannel] = OrderedDict()
+        self._tasks: list[asyncio.Task] = []
+        self._resolving: set[asyncio.Task] = set() # Referenced until done, or the loop may drop them
+        self._chunks: dict[int, tuple[float, list[discord.Member]]] = {} # guild_id -> (fetched at, members)
+        BATCH_REMAINING.set_function(lambda: sum(b.pending for b in self.batches if not b.finished))
+
+    def start(self):
+        if self._tasks: return
+        self._tasks = [asyncio.create_task(self._work(), name=f"dm-fanout-{i}") for i in range(self.workers)]
+
+    def enqueue(self, user_ids, content: str, kind: str, target_epoch: float,
+                priority: int = PRIORITY_DIRECT, batch: DMBatch | None = None):
+        """Queues the same DM for every recipient (duplicates dropped)."""
+        for user_id in dict.fromkeys(user_ids):
+            self.queue.put_nowait((priority, next(self._seq), user_id, content, kind, target_epoch, batch))
+
+    def fan_out_roles(self, guild: discord.Guild, role_ids, content: str, kind: str, target_epoch: float,
+                      label: str, exclude=()) -> DMBatch:
+        """DMs every member of the roles, each member once. Members are resolved in the background."""
+        batch = DMBatch(label)
+        self.batches.append(batch)
+        task = asyncio.create_task(self._resolve(batch, guild, list(role_ids), content, kind, target_epoch, set(exclude)))
+        self._resolving.add(task)
+        task.add_done_callback(self._resolving.discard)
+        return batch
+
+    async def role_members(self, guild: discord.Guild, role_ids: list[int]) -> list[discord.Member]:
+        if guild.chunked:
+            roles = [r for r in map(guild.get_role, role_ids) if r]
+            return list({m.id: m for r in roles for m in r.members}.values())
+        # Unchunked guilds (lazy member cache) only know a few members: ask the gateway for the
+        # full list, once per CHUNK_REUSE for a burst of alerts in the same guild
+        fetched, members = self._chunks.get(guild.id, (0.0, None))
+        if members is None or time.monotonic() - fetched > CHUNK_REUSE:
+            members = await guild.chunk(cache=False)
+            self._chunks[guild.id] = (time.monotonic(), members)
+            for gid in [g for g, (t, _) in self._chunks.items() if time.monotonic() - t > CHUNK_REUSE]:
+                del self._chunks[gid]
+        wanted = set(role_ids)
+        return [m for m in members if any(r.id in wanted for r in m.roles)]
+
+    async def _resolve(self, batch: DMBatch, guild: discord.Guild, role_ids: list[int], content: str,
+                       kind: str, target_epoch: float, exclude: set):
+        try:
+            members = await self.role_members(guild, role_ids)
+            recipients = [m.id for m in members if not m.bot and m.id not in exclude]
+            new = batch.add(recipients)
+            metrics.TIMERS_DUE.inc(len(new), kind=kind)
+            self.enqueue(new, content, kind, target_epoch, PRIORITY_BULK, batch)
+        except Exception as e:
+            logger.error(f"DM fan-out for {batch.label}: could not resolve role members: {e}")
+        finally:
+            batch.resolved = True
+            if not batch.pending: batch.finished = time.time()
+
+    async def dm_channel(self, user_id: int) -> discord.DMChannel:
+        channel = self._channels.get(user_id)
+        if channel:
+            self._channels.move_to_end(user_id)
+            return channel
+        # create_dm reuses discord.py's cached channel if there is one; otherwise one REST call, no user fetch
+        channel = await self.client.create_dm(discord.Object(id=user_id))
+        self._channels[user_id] = channel
+        while len(self._channels) > self.channel_cache:
+            self._channels.popitem(last=False)
+        return channel
+
+    async def _work(self):
+        while True:
+            _, _, user_id, content, kind, target_epoch, batch = await self.queue.get()
+            ok = False
+            try:
+                await self.bucket.take()
+                channel = await self.dm_channel(user_id)
+                ok = await self.deliver(channel.send(content), kind, target_epoch)
+            except Exception as e:
+                metrics.ALERTS_FAILED.inc(kind=kind)
+                logger.error(f"DM fan-out to {user_id} failed: {e}")
+            finally:
+                if batch: batch.record(user_id, "sent" if ok else "failed")
+                self.queue.task_done()
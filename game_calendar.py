@@ -0,0 +1,77 @@
+"""Upcoming game-event instants, precomputed so lookups are a bisect instead of date arithmetic.
+
+Global series (foundry ON weeks, Sundays, the two castle cycles) are expanded `weeks` ahead
+and topped up as lookups move forward. Per-context cycle voting windows are rebuilt on every save,
+so the scheduler can skip contexts with nothing due.
+"""
+import bisect
+from datetime import datetime, timezone
+
+DAY = 86400
+WEEK = 7 * DAY
+
+def _utc(*args) -> int:
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp())
+
+# name -> (anchor, period). Anchors are known occurrences; everything else follows from them.
+SERIES = {
+    "foundry": (_utc(2026, 3, 4), 2 * WEEK),           # Time-selection Wednesday 00:00 of an ON week
+    "sunday": (_utc(2026, 3, 1), WEEK),                # Sunday 00:00
+    "castle_internal": (_utc(2026, 2, 14, 12), 4 * WEEK),
+    "castle_svs": (_utc(2026, 2, 28, 12), 4 * WEEK),
+}
+
+class GameCalendar:
+    """Sorted upcoming instants per series, covering at least `weeks` ahead of the last lookup."""
+    def __init__(self, weeks: int = 8):
+        self.horizon = weeks * WEEK
+        self.table: dict[str, list[int]] = {name: [] for name in SERIES}
+
+    def refresh(self, now: int):
+        """Drops instants older than a day and extends each series to now + horizon."""
+        for name, (anchor, period) in SERIES.items():
+            instants = self.table[name]
+            cut = bisect.bisect_left(instants, now - DAY)
+            if cut: del instants[:cut]
+            # Floor division also walks back past the anchor, so lookups before it work too
+            last = instants[-1] if instants else anchor + (now - DAY - anchor) // period * period
+            while last + period <= now + self.horizon:
+                last += period
+                instants.append(last)
+
+    def next_after(self, name: str, after: int) -> int:
+        """First instant of the series strictly later than `after`."""
+        instants = self.table[name]
+        if not instants or instants[0] > after or instants[-1] <= after:
+            if instants and instants[0] > after: instants.clear() # Asked about the past: start over
+            self.refresh(after)
+        return instants[bisect.bisect_right(instants, after)]
+
+def cycle_windows(cycle: dict) -> list[tuple[int, str]]:
+    """The cycle's pending manager DMs: (instant, "pre"|"post"), pre-voting 24h before start."""
+    out = []
+    if not cycle.get("pre_dm_sent", False): out.append((cycle["start_epoch"] - DAY, "pre"))
+    if not cycle.get("post_dm_sent", False): out.append((cycle["start_epoch"] + cycle["duration_sec"], "post"))
+    return out
+
+class CycleTable:
+    """Earliest pending cycle DM per context, as of the last save."""
+    def __init__(self):
+        self.next_due: dict[str, int] = {}
+
+    def rebuild(self, data: dict):
+        self.next_due = {}
+        self.update(data, data.keys())
+
+    def update(self, data: dict, context_ids):
+        """Recomputes just these contexts (the ones a save wrote)."""
+        for cid in context_ids:
+            ctx = data.get(cid)
+            instants = [t for cycle in ctx.get("cycles", []) for t, _ in cycle_windows(cycle)] if isinstance(ctx, dict) else []
+            if instants: self.next_due[cid] = min(instants)
+            else: self.next_due.pop(cid, None)
+
+    def due(self, context_id: str, now: int) -> bool:
+        """False only when the context's next cycle DM is known to be in the future."""
+        instant = self.next_due.get(context_id)
+        return instant is None or instant <= now
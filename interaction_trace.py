@@ -0,0 +1,164 @@
+import contextvars
+import functools
+import logging
+import os
+import time
+
+import discord
+from discord import app_commands
+
+try: # Private: tracing of webhook time is skipped if discord.py moves it
+    from discord.webhook.async_ import AsyncWebhookAdapter
+except ImportError:
+    AsyncWebhookAdapter = None
+
+import metrics
+
+logger = logging.getLogger("Chrono")
+
+# Discord drops the interaction if it isn't acknowledged within 3 seconds
+ACK_DEADLINE = 3.0
+SLOW_INTERACTION_SECONDS = 2.0 # SLOW_INTERACTION_MS, read by install() (after the bot loaded .env)
+
+INTERACTION_SECONDS = metrics.histogram(
+    "chrono_interaction_seconds", "Interaction span durations per command and phase (receipt, ack, db, discord, followup, total).",
+    ("command", "phase"), buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 30.0))
+INTERACTION_LATE_ACKS = metrics.counter("chrono_interaction_late_acks_total", "Interactions acknowledged after the 3s deadline, or never.", ("command",))
+
+class Trace:
+    """Spans for one interaction: receipt delay, time to first response, DB and Discord time, last followup."""
+    __slots__ = ("name", "token", "start", "receipt", "ack", "ack_kind", "followup", "db", "discord")
+    def __init__(self, name: str, interaction: discord.Interaction):
+        self.name = name
+        self.token = interaction.token # Tells this interaction's followup webhook from other webhooks
+        self.start = time.perf_counter()
+        # Gateway + dispatch delay: Discord's snowflake timestamp versus our wall clock
+        self.receipt = max(0.0, time.time() - interaction.created_at.timestamp())
+        self.ack: float | None = None
+        self.ack_kind: str | None = None
+        self.followup: float | None = None
+        self.db = 0.0
+        self.discord = 0.0
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+current: contextvars.ContextVar[Trace | None] = contextvars.ContextVar("interaction_trace", default=None)
+
+def add(phase: str, seconds: float):
+    """Adds time to the active interaction's "db" or "discord" span. No-op outside an interaction."""
+    trace = current.get()
+    if trace: setattr(trace, phase, getattr(trace, phase) + seconds)
+
+def _finish(trace: Trace):
+    total = trace.elapsed()
+    for phase, value in (("receipt", trace.receipt), ("ack", trace.ack), ("db", trace.db),
+                         ("discord", trace.discord), ("followup", trace.followup), ("total", total)):
+        if value is not None: INTERACTION_SECONDS.observe(value, command=trace.name, phase=phase)
+    late = trace.ack is None or trace.receipt + trace.ack > ACK_DEADLINE
+    if late: INTERACTION_LATE_ACKS.inc(command=trace.name)
+    if late or total > SLOW_INTERACTION_SECONDS:
+        ack = f"{trace.ack:.2f}s ({trace.ack_kind})" if trace.ack is not None else "never"
+        followup = f"{trace.followup:.2f}s" if trace.followup is not None else "-"
+        logger.warning(
+            f"Slow interaction {trace.name}: total {total:.2f}s, receipt {trace.receipt:.2f}s, ack {ack}, "
+            f"db {trace.db:.2f}s, discord {trace.discord:.2f}s, last followup {followup}")
+
+async def traced(name: str, interaction: discord.Interaction, call):
+    trace = Trace(name, interaction)
+    token = current.set(trace)
+    try:
+        return await call()
+    finally:
+        current.reset(token)
+        _finish(trace)
+
+class TracedCommandTree(app_commands.CommandTree):
+    """CommandTree that wraps every slash command (and autocomplete) invocation in a Trace."""
+    async def _call(self, interaction: discord.Interaction):
+        data = interaction.data or {}
+        name = data.get("name", "unknown")
+        # Include subcommand names
+        options = data.get("options") or []
+        while options and options[0].get("type") in (1, 2):
+            name += " " + options[0]["name"]
+            options = options[0].get("options") or []
+        if interaction.type is discord.InteractionType.autocomplete: name += " (autocomplete)"
+        return await traced(f"/{name}", interaction, functools.partial(super()._call, interaction))
+
+def _item_name(view, item) -> str:
+    callback = getattr(item, "callback", None)
+    callback = getattr(callback, "callback", callback) # Decorated items wrap the function
+    return f"{type(view).__name__}.{getattr(callback, '__name__', type(item).__name__)}"
+
+def _wrap_response(method, kind: str):
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        result = await method(self, *args, **kwargs)
+        trace = current.get()
+        if trace and trace.ack is None:
+            trace.ack = trace.elapsed()
+            trace.ack_kind = kind
+        return result
+    return wrapper
+
+def _wrap_adapter_request(method):
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        if current.get() is None: return await method(self, *args, **kwargs)
+        start = time.perf_counter()
+        try: return await method(self, *args, **kwargs)
+        finally: add("discord", time.perf_counter() - start)
+    return wrapper
+
+def _wrap_followup(method):
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        result = await method(self, *args, **kwargs)
+        trace = current.get()
+        # Only the interaction's own followups: alert webhooks sent from a handler aren't
+        if trace and self.type is discord.WebhookType.application and self.token == trace.token:
+            trace.followup = trace.elapsed()
+        return result
+    return wrapper
+
+_installed = False
+
+def _patch(owner, attr: str, wrap) -> bool:
+    """Replaces owner.attr with wrap(original). Skipped with a warning if discord.py no longer has it."""
+    method = getattr(owner, attr, None) if owner is not None else None
+    if not callable(method):
+        logger.warning(f"Interaction tracing: {getattr(owner, '__name__', owner)}.{attr} not found, not traced")
+        return False
+    setattr(owner, attr, wrap(method))
+    return True
+
+def install():
+    """Patches view/modal dispatch and interaction responses so every interaction gets a Trace."""
+    global _installed, SLOW_INTERACTION_SECONDS
+    if _installed: return
+    _installed = True
+    SLOW_INTERACTION_SECONDS = float(os.environ.get("SLOW_INTERACTION_MS", 2000)) / 1000
+
+    # View/Modal._scheduled_task and CommandTree._call are private; each hook is skipped if it's gone
+    if not callable(getattr(app_commands.CommandTree, "_call", None)):
+        logger.warning("Interaction tracing: CommandTree._call not found, slash commands not traced")
+
+    def wrap_view_task(view_task):
+        async def view_scheduled_task(self, item, interaction):
+            return await traced(_item_name(self, item), interaction, functools.partial(view_task, self, item, interaction))
+        return view_scheduled_task
+    _patch(discord.ui.View, "_scheduled_task", wrap_view_task)
+
+    def wrap_modal_task(modal_task):
+        async def modal_scheduled_task(self, interaction, *args):
+            return await traced(type(self).__name__, interaction, functools.partial(modal_task, self, interaction, *args))
+        return modal_scheduled_task
+    _patch(discord.ui.Modal, "_scheduled_task", wrap_modal_task)
+
+    for attr, kind in (("defer", "defer"), ("send_message", "message"), ("edit_message", "edit"),
+                       ("send_modal", "modal"), ("autocomplete", "autocomplete")):
+        _patch(discord.InteractionResponse, attr, functools.partial(_wrap_response, kind=kind))
+    # Interaction responses and followups go through the webhook adapter, not bot.http
+    _patch(AsyncWebhookAdapter, "request", _wrap_adapter_request)
+    _patch(discord.Webhook, "send", _wrap_followup)
@@ -1,6 +1,10 @@
 import os
 import sys
 
+# Load .env first: settings (here and in imported modules) are read at import time
+from dotenv import load_dotenv
+load_dotenv()
+
 # --- SSL Fix for Windows ---
 import ssl
 import certifi
@@ -19,15 +23,60 @@ print("--- CHRONO CLOUDY STARTUP ---")
 
 # --- Health-Check Server (Render Keep-Alive) ---
 from aiohttp import web
+import hmac
+import metrics
+from stall_watchdog import StallWatchdog
+
+# Logs (and ranks) whatever blocks the event loop for longer than STALL_THRESHOLD_MS
+stall_watchdog = StallWatchdog(threshold=float(os.environ.get("STALL_THRESHOLD_MS", 250)) / 1000)
 
 async def health_handler(request):
     return web.Response(text="OK")
 
+async def metrics_handler(request):
+    return web.Response(body=metrics.REGISTRY.render().encode(), headers={"Content-Type": metrics.CONTENT_TYPE})
+
+def admin_request(request) -> bool:
+    # Debug routes are admin only: disabled unless ADMIN_TOKEN is set
+    token = os.environ.get("ADMIN_TOKEN")
+    supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip() or request.query.get("token", "")
+    return bool(token) and hmac.compare_digest(supplied, token)
+
+async def memory_handler(request):
+    if not admin_request(request): return web.Response(status=403, text="Forbidden")
+    if request.query.get("stop"):
+        # Don't fall through to the report: diff() would start tracing again
+        allocation_tracker.stop()
+        return web.json_response({"tracing": False})
+    try: top = int(request.query.get("top", 15))
+    except ValueError: top = 15
+    return web.json_response(await memory_report(top))
+
+async def ready_handler(request):
+    report = await readiness_report()
+    return web.json_response(report, status=200 if report["ready"] else 503)
+
+async def live_handler(request):
+    report = liveness_report()
+    return web.json_response(report, status=200 if report["live"] else 503)
+
+async def stalls_handler(request):
+    # Stack frames and file paths: same token as /debug/memory
+    if not admin_request(request): return web.Response(status=403, text="Forbidden")
+    try: n = int(request.query.get("n", 10))
+    except ValueError: n = 10
+    return web.json_response({"threshold_seconds": stall_watchdog.threshold, "sites": stall_watchdog.report(n)})
+
 async def start_health_server():
     try:
         app = web.Application()
         app.router.add_get("/health", health_handler)
         app.router.add_get("/", health_handler)
+        app.router.add_get("/ready", ready_handler)
+        app.router.add_get("/live", live_handler)
+        app.router.add_get("/metrics", metrics_handler)
+        app.router.add_get("/debug/stalls", stalls_handler)
+        app.router.add_get("/debug/memory", memory_handler)
         port = int(os.environ.get("PORT", 8080))
         runner = web.AppRunner(app)
         await runner.setup()
@@ -52,18 +101,13 @@ import traceback
 import platform
 import socket
 import logging
-from typing import Any
-
-# --- Single Instance Lock ---
-try:
-    single_instance_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    single_instance_socket.bind(("127.0.0.1", 47200))
-except socket.error:
-    print("Another instance of the bot is already running. Exiting.")
-    sys.exit(1)
+import math
+import itertools
+import functools
+import hashlib
+from collections import OrderedDict
 
 from datetime import datetime, timedelta, timezone
-import zoneinfo
 import groq
 
 # --- Logging Setup ---
@@ -71,18 +115,53 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name
 logger = logging.getLogger("Chrono")
 
 # --- Configuration ---
-from dotenv import load_dotenv
-load_dotenv()
 TOKEN = os.getenv("TOKEN")
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
+# --- Sharding ---
+# SHARD_COUNT (+ optional SHARD_IDS, e.g. "0-3") runs an AutoShardedBot; SHARDED=1 lets Discord pick the count.
+# With SHARD_IDS each process runs a shard group and only schedules the contexts it owns (see shards.py).
+import shards
+try:
+    SHARD_COUNT, SHARD_IDS = shards.from_env()
+except ValueError as e:
+    print(f"Bad shard configuration: {e}")
+    sys.exit(1)
+SHARDED = SHARD_COUNT is not None or os.getenv("SHARDED", "").lower() in ("1", "true", "yes")
+ownership = shards.ShardOwnership(SHARD_COUNT, SHARD_IDS)
+
+# --- Single Instance Lock ---
+# One port per shard group, so several shard processes can share a host
+try:
+    single_instance_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    single_instance_socket.bind(("127.0.0.1", 47200 + (SHARD_IDS[0] if SHARD_IDS else 0)))
+except socket.error:
+    print("Another instance of the bot is already running. Exiting.")
+    sys.exit(1)
+
 groq_client = None
 if GROQ_API_KEY:
     groq_client = groq.AsyncGroq(api_key=GROQ_API_KEY)
 
-from db_turso import init_db
+from db_turso import init_db, claim_outbox_row, update_outbox
 init_db()
 
+from name_index import GuildNameIndex
+from time_parser import parse_duration_string, parse_time_input
+import tz_index
+import recurrence
+from game_calendar import GameCalendar, CycleTable, SERIES as GAME_SERIES
+from timer_index import TimerIndex, ensure_timer_ids, locate, new_timer_id
+import interaction_trace
+interaction_trace.install()
+from memstats import AllocationTracker, discord_cache_sizes, format_bytes, rss_bytes
+from ttl_store import TTLStore, sweep_forever
+from dm_fanout import DMFanout
+from webhook_pool import WebhookPool
+from outbox import OutboxWorker, nonce_for
+from prearm import PREARMED, ArmedAlert, Prearmer
+from assets import AssetCache
+
 DUMMY_SPACER = "https://dummyimage.com/600x1/2f3136/2f3136.png"
 
 DM_TEMPLATES = {
@@ -176,7 +255,30 @@ def create_tables():
 
 create_tables()
 
-class StratusBot(commands.Bot):
+def instrument_rest(request):
+    """Wraps HTTPClient.request to time every REST call by its route template."""
+    async def timed_request(route, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await request(route, **kwargs)
+        except discord.HTTPException as e:
+            metrics.REST_ERRORS.inc(method=route.method, route=route.path, status=e.status)
+            raise
+        except Exception:
+            metrics.REST_ERRORS.inc(method=route.method, route=route.path, status="error")
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.REST_SECONDS.observe(elapsed, method=route.method, route=route.path)
+            interaction_trace.add("discord", elapsed)
+    return timed_request
+
+# LAZY_MEMBERS=1: skip member chunking at startup and only keep recently seen members (see Member Cache).
+# Cuts startup time and RSS on big guilds; members needed for permission checks are fetched on demand.
+LAZY_MEMBERS = os.getenv("LAZY_MEMBERS", "").lower() in ("1", "true", "yes")
+MEMBER_CACHE_SIZE = int(os.getenv("MEMBER_CACHE_SIZE", "2000"))
+
+class StratusBot(commands.AutoShardedBot if SHARDED else commands.Bot):
     def __init__(self):
         # Optimization for 512MB RAM: Only enable strictly needed intents
         intents = discord.Intents.default()
@@ -185,33 +287,163 @@ class StratusBot(commands.Bot):
         # Presences consume massive amounts of RAM: KEEP DISABLED
         intents.presences = False 
         
+        # Members intent stays on for join/leave events and on-demand queries; lazy mode just doesn't hoard them
+        member_options = {}
+        if LAZY_MEMBERS:
+            member_options = {"chunk_guilds_at_startup": False, "member_cache_flags": discord.MemberCacheFlags.none()}
+        
+        if SHARDED: member_options.update(shard_count=SHARD_COUNT, shard_ids=SHARD_IDS)
+        
         # Max_messages limits the internal memory cache to 10 (default 1000)
-        super().__init__(command_prefix="!", intents=intents, max_messages=10)
+        super().__init__(command_prefix="!", intents=intents, max_messages=10, tree_cls=interaction_trace.TracedCommandTree, **member_options)
 
     async def setup_hook(self):
         # Start health check immediately, don't wait for Discord connection
         await start_health_server()
         
+        # Build the timezone index off the loop so the first autocomplete is already fast
+        await asyncio.to_thread(tz_index.warm)
+        
+        # Game media is read once here instead of from disk every round
+        asset_bytes = await asyncio.to_thread(asset_cache.load)
+        logger.info(f"Assets cached: {asset_bytes // 1024} KiB")
+        
+        # Metrics: REST timing, loop lag / stall watchdog, queue depth gauges
+        self.http.request = instrument_rest(self.http.request)
+        stall_watchdog.start()
+        register_queue_gauges()
+        dm_fanout.start()
+        alert_outbox.start()
+        
+        # Expire abandoned wizards / RPS challenges
+        self.state_sweeper = asyncio.create_task(sweep_forever(state_stores))
+        
         # Register Persistent Views
         
         # Legacy cogs removed.
         
-        # Force Sync Slash Commands
-        logger.info("Forcing Command Tree Sync...")
+        # Sync Slash Commands (only when the tree changed since the last global sync)
         try:
-            await self.tree.sync()
-            self.commands_synced = True
-            logger.info("Command Tree Synced!")
+            await sync_commands_if_changed()
         except Exception as e:
             logger.error(f"Failed to sync command tree: {e}")
 
+    async def close(self):
+        if webhook_pool: await webhook_pool.close()
+        await super().close()
+
 bot = StratusBot()
 
 # --- Data Management (Turso Legacy Storage) ---
-from db_turso import load_legacy_data as load_data, save_legacy_data as save_data
+from db_turso import load_legacy_data, save_legacy_data, pop_changed_rows, RowConflict, storage_writable, get_meta, set_meta
 import asyncio
+import threading
+# In-process only. With several shard processes each context is written by the process that owns it;
+# a save that still races another process raises db_turso.RowConflict instead of overwriting it.
 db_lock = asyncio.Lock()
 
+# Bumped after every committed save, so speculative snapshots can tell whether they went stale.
+data_generation = 0
+
+# USER_PREFS mirror (user_id -> tz string), refreshed on saves and on loads that find it changed, so tz lookups never hit the DB.
+user_tz_cache: dict[str, str] | None = None
+
+# Per-context id/label index of the last saved timers, for autocomplete and label lookups.
+timer_index = TimerIndex()
+
+def load_data() -> dict:
+    """The contexts this process owns (all of them unless it runs a subset of the shards)."""
+    start = time.perf_counter()
+    data = load_legacy_data(ownership.scope())
+    elapsed = time.perf_counter() - start
+    metrics.DB_SECONDS.observe(elapsed, op="load")
+    interaction_trace.add("db", elapsed)
+    metrics.DB_ROWS.set(len(data), kind="contexts")
+    # Rows another process wrote: bring the mirrors up to date (on the loop; thread loads leave them queued)
+    if threading.current_thread() is threading.main_thread(): refresh_mirrors(data, pop_changed_rows())
+    return data
+
+def save_data(data: dict, outbox: list[dict] | None = None):
+    global data_generation
+    ensure_timer_ids(data)
+    start = time.perf_counter()
+    written = save_legacy_data(data, outbox)
+    elapsed = time.perf_counter() - start
+    metrics.DB_SECONDS.observe(elapsed, op="save")
+    interaction_trace.add("db", elapsed)
+    data_generation += 1
+    # Only the contexts this save wrote need re-indexing
+    refresh_mirrors(data, written)
+    if not timer_index.loaded: rebuild_indexes(data)
+    metrics.DB_ROWS.set(len(data), kind="contexts")
+    metrics.DB_ROWS.set(timer_index.timers, kind="timers")
+
+def refresh_mirrors(data: dict, context_ids: set[str]):
+    """Re-reads these contexts into the tz cache and indexes (if built yet)."""
+    global user_tz_cache
+    if not context_ids: return
+    if "USER_PREFS" in context_ids: user_tz_cache = dict(data.get("USER_PREFS", {}))
+    if timer_index.loaded:
+        timer_index.update(data, context_ids)
+        cycle_table.update(data, context_ids)
+
+def rebuild_indexes(data: dict):
+    timer_index.rebuild(data)
+    cycle_table.rebuild(data)
+
+def get_timer_index(context_id: str):
+    """Index for one context. First call loads the DB (and persists ids for timers that predate them)."""
+    if not timer_index.loaded:
+        data = load_data()
+        if ensure_timer_ids(data): save_data(data)
+        else: rebuild_indexes(data)
+    return timer_index.get(context_id)
+
+def find_timer(data: dict, context_id: str, label: str) -> int | None:
+    """Position of the timer labelled `label` in data[context_id]["timers"], via the index."""
+    idx = get_timer_index(context_id)
+    hit = idx.find(label) if idx else None
+    if not hit: return None
+    timers = data.get(context_id, {}).get("timers", [])
+    return locate(timers, hit.id, idx.position[hit.id])
+
+# --- Speculative Context Resolution ---
+class SpeculativeContext:
+    """Lookups started alongside the Groq call, so they're ready the moment the parse returns.
+
+    Loads the DB snapshot in a worker thread and warms the guild's role/member names while
+    the LLM request is in flight.
+    """
+    def __init__(self, guild: discord.Guild | None):
+        self.guild = guild
+        # Read the generation BEFORE the load starts: any save after this point invalidates the snapshot.
+        self.generation = data_generation
+        self._consumed = False
+        self._data_task = asyncio.create_task(asyncio.to_thread(load_data))
+        self._names_task = asyncio.create_task(warm_guild_names(guild)) if guild else None
+
+    async def data(self) -> dict:
+        """Read-only snapshot (may be slightly stale)."""
+        return await self._data_task
+
+    async def data_for_update(self) -> dict:
+        """Must be called while holding db_lock. Reuses the snapshot if nothing was saved since it was taken."""
+        snapshot = await self._data_task
+        if not self._consumed and data_generation == self.generation:
+            self._consumed = True
+            return snapshot
+        return load_data()
+
+    async def names_ready(self):
+        if self._names_task: await self._names_task
+
+    def discard(self):
+        """Cancel whatever hasn't finished (e.g. the parse failed)."""
+        for task in (self._data_task, self._names_task):
+            if not task: continue
+            if not task.done(): task.cancel()
+            elif not task.cancelled(): task.exception() # Mark retrieved, we don't care anymore
+
 # --- Sticky Dashboard Globals ---
 cached_dashboard_channels: set[int] = set()
 sticky_tasks: dict[int, asyncio.Task] = {}
@@ -233,25 +465,21 @@ async def do_sticky(guild: discord.Guild, channel_id: int):
 
 # --- Autocomplete Helper ---
 async def timer_autocomplete(interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
-    data = load_data()
-    guild_id = str(interaction.guild_id)
-    choices = []
-    if guild_id in data and "timers" in data[guild_id]:
-        # Filter matching timers
-        for t in data[guild_id]["timers"]:
-            if current.lower() in t['label'].lower():
-                choices.append(app_commands.Choice(name=t['label'], value=t['label']))
-    # Return top 25 matches (Discord limit)
-    return choices[:25]
+    context_id = str(interaction.guild_id) if interaction.guild_id else str(interaction.user.id)
+    idx = get_timer_index(context_id)
+    if not idx: return []
+    # Top 25 matches (Discord limit), served from memory
+    return [app_commands.Choice(name=t.label, value=t.label) for t in idx.search(current, limit=25)]
 
 # --- Google Calendar Helper ---
-def generate_gcal_link(label: str, start_epoch: int, duration_seconds: int = 3600) -> str:
-    """Generates a Google Calendar 'Add to Calendar' link."""
-    start_dt = datetime.fromtimestamp(start_epoch, timezone.utc)
+def generate_gcal_link(label: str, start_epoch: int, duration_seconds: int = 3600, recurrence_seconds: int = 0, recurrence_tz: str = None) -> str:
+    """Generates a Google Calendar 'Add to Calendar' link (repeating, if Google can express the interval)."""
+    zone = recurrence.rule_zone(recurrence_seconds, recurrence_tz)
+    start_dt = datetime.fromtimestamp(start_epoch, zone or timezone.utc)
     end_dt = start_dt + timedelta(seconds=duration_seconds)
     
-    # Format: YYYYMMDDTHHMMSSZ
-    fmt = "%Y%m%dT%H%M%SZ"
+    # Format: YYYYMMDDTHHMMSSZ (UTC), or local wall time + ctz so the series follows DST
+    fmt = "%Y%m%dT%H%M%S" if zone else "%Y%m%dT%H%M%SZ"
     dates = f"{start_dt.strftime(fmt)}/{end_dt.strftime(fmt)}"
     
     # Minimal URL encoding (manual for safety/speed)
@@ -262,14 +490,18 @@ def generate_gcal_link(label: str, start_epoch: int, duration_seconds: int = 360
         "dates": dates,
         "details": "Scheduled via Chrono Cloudy"
     }
+    rule = recurrence.rrule(recurrence_seconds)
+    if rule: params["recur"] = rule
+    if zone: params["ctz"] = str(zone)
     query = urllib.parse.urlencode(params)
     return f"https://www.google.com/calendar/render?{query}"
 
 # --- User Timezone Helpers ---
 def get_user_tz_str(user_id: int) -> str:
-    data = load_data()
-    prefs = data.get("USER_PREFS", {})
-    return prefs.get(str(user_id), "UTC")
+    global user_tz_cache
+    if user_tz_cache is None:
+        user_tz_cache = dict(load_data().get("USER_PREFS", {}))
+    return user_tz_cache.get(str(user_id), "UTC")
 
 async def set_user_tz_str(user_id: int, tz_str: str) -> bool:
     async with db_lock:
@@ -278,47 +510,17 @@ async def set_user_tz_str(user_id: int, tz_str: str) -> bool:
             data["USER_PREFS"] = {}
         
         try:
-            if tz_str.upper() == "UTC":
-                data["USER_PREFS"][str(user_id)] = "UTC"
-            else:
-                zoneinfo.ZoneInfo(tz_str)
-                data["USER_PREFS"][str(user_id)] = tz_str
+            # Accepts any case or an alias ("est", "Kolkata"), stores the canonical zone name
+            zone = tz_index.get_index().resolve(tz_str)
+            if not zone: return False
+            tz_index.get_zone(zone)
+            data["USER_PREFS"][str(user_id)] = zone
             save_data(data)
             return True
         except:
             return False
 
 # --- Helpers ---
-def parse_duration_string(input_str: str) -> int:
-    if not input_str: return 0
-    clean_str = input_str.strip().lower()
-    
-    # Check for plain number (default to minutes)
-    if clean_str.isdigit():
-        return int(clean_str) * 60
-        
-    # Composite Parser (e.g. "47h 30m", "1d 2h")
-    # Finds all pairs of (number, unit)
-    matches = re.findall(r"(\d+)\s*([a-z]+)", clean_str)
-    
-    if not matches:
-        # No units found, and wasn't a plain number.
-        raise ValueError(f"Invalid Duration: '{input_str}'. Use '30m', '1h', '1d', or '1h 30m'.")
-        
-    total_seconds = 0
-    valid_units = ['m', 'min', 'mins', 'h', 'hr', 'hour', 'hours', 'd', 'day', 'days']
-    
-    for val_str, unit in matches:
-        if unit not in valid_units:
-             raise ValueError(f"Invalid Unit: '{unit}' in '{input_str}'.")
-             
-        val = int(val_str)
-        if unit in ['m', 'min', 'mins']: total_seconds += val * 60
-        elif unit in ['h', 'hr', 'hour', 'hours']: total_seconds += val * 3600
-        elif unit in ['d', 'day', 'days']: total_seconds += val * 86400
-
-    return total_seconds
-
 def parse_reminders_string(input_str: str) -> list:
     if not input_str: return []
     try:
@@ -326,103 +528,6 @@ def parse_reminders_string(input_str: str) -> list:
         return [parse_duration_string(p) for p in parts if p]
     except: return []
 
-def parse_time_input(user_input: str, mode: str = "smart", user_tz_str: str = "UTC") -> int | tuple[str, str]:
-    user_input = user_input.strip().lower()
-    
-    # Clean up timezone suffixes that NLP might incorrectly leave in the time string
-    user_input = re.sub(r'\s*\(?utc\)?$', '', user_input)
-    user_input = re.sub(r'\s*\(?gmt\)?$', '', user_input)
-    user_input = user_input.strip()
-    
-    try:
-        user_tz = zoneinfo.ZoneInfo(user_tz_str) if user_tz_str.upper() != "UTC" else timezone.utc
-    except:
-        user_tz = timezone.utc
-        
-    current_local = datetime.now(user_tz)
-    current_utc = datetime.now(timezone.utc)
-    
-    if mode == "smart":
-        try: return parse_time_input(user_input, "utc_custom", user_tz_str)
-        except: pass
-        try: return parse_time_input(user_input, "utc_date_only", user_tz_str)
-        except: pass
-        if re.match(r"^\d{1,2}:\d{2}$", user_input):
-             try: return parse_time_input(user_input, "utc_today", user_tz_str)
-             except: pass
-        try: return parse_time_input(user_input, "duration", user_tz_str)
-        except: pass
-        raise ValueError(f"Invalid Time. Use '10m', '14:00' ({user_tz_str}), or 'YYYY-MM-DD'.")
-
-    if mode == "duration":
-        # Don't catch/mask here, let parse_duration_string error bubble up
-        seconds = parse_duration_string(user_input)
-        return int((current_utc + timedelta(seconds=seconds)).timestamp())
-        
-    elif mode == "utc_today":
-        match = re.match(r"^(\d{1,2}):(\d{2})$", user_input)
-        if match:
-            hour = int(match.group(1))
-            minute = int(match.group(2))
-            if not (0 <= hour <= 23 and 0 <= minute <= 59): raise ValueError("Time out of range.")
-            target = current_local.replace(hour=hour, minute=minute, second=0, microsecond=0)
-            return int(target.timestamp())
-        raise ValueError("Invalid Format.")
-
-    elif mode == "utc_tomorrow":
-        match = re.match(r"^(\d{1,2}):(\d{2})$", user_input)
-        if match:
-            hour = int(match.group(1))
-            minute = int(match.group(2))
-            target = current_local.replace(hour=hour, minute=minute, second=0, microsecond=0)
-            target += timedelta(days=1)
-            return int(target.timestamp())
-        raise ValueError("Invalid Format.")
-
-    elif mode == "utc_custom":
-        formats = [
-            "%Y-%m-%d %H:%M",
-            "%Y/%m/%d %H:%M",
-            "%Y-%m-%d %H:%M:%S",
-            "%Y/%m/%d %H:%M:%S",
-            "%d-%m-%Y %H:%M",
-            "%d/%m/%Y %H:%M"
-        ]
-        for fmt in formats:
-            try:
-                user_tz = zoneinfo.ZoneInfo(user_tz_str) if user_tz_str.upper() != "UTC" else timezone.utc
-            except:
-                user_tz = timezone.utc
-            
-            try:
-                dt = datetime.strptime(user_input, fmt)
-                dt = dt.replace(tzinfo=user_tz)
-                return int(dt.timestamp())
-            except ValueError: continue
-        raise ValueError("Invalid Format.")
-
-    elif mode == "utc_date_only":
-        formats = [
-            "%Y-%m-%d",
-            "%Y/%m/%d",
-            "%d-%m-%Y",
-            "%d/%m/%Y"
-        ]
-        for fmt in formats:
-            try:
-                user_tz = zoneinfo.ZoneInfo(user_tz_str) if user_tz_str.upper() != "UTC" else timezone.utc
-            except:
-                user_tz = timezone.utc
-
-            try:
-                dt = datetime.strptime(user_input, fmt)
-                dt = dt.replace(tzinfo=user_tz)
-                return ("DATE_ONLY", dt.strftime("%Y-%m-%d"))
-            except ValueError: continue
-        raise ValueError("Invalid Format.")
-    
-    raise ValueError("Invalid time expression.")
-
 def get_duration_str(start: int, end: int) -> str:
     diff = end - start
     if diff < 0: return "Unknown"
@@ -441,61 +546,29 @@ def get_interval_str(seconds: int) -> str:
     if seconds == 0: return "None"
     return get_duration_str(0, seconds)
 
+# Precomputed game-event instants (see game_calendar.py)
+game_events = GameCalendar()
+cycle_table = CycleTable() # Next pending voting-window DM per context, rebuilt on save
+
 def get_next_cycle(start_year: int, start_month: int, start_day: int, hour: int = 12) -> int:
     """Calculates next occurrence of a 28-day cycle from a start date."""
-    ref_date = datetime(start_year, start_month, start_day, hour, 0, 0, tzinfo=timezone.utc)
-    now = datetime.now(timezone.utc)
-    
-    # If reference is future, use it
-    if ref_date > now: return int(ref_date.timestamp())
-    
-    # Otherwise, add 28 days until future
-    # Optimization: Calculate weeks difference directly
-    diff = now - ref_date
-    weeks_passed = diff.days // 7
-    cycles_passed = weeks_passed // 4
-    
-    next_date = ref_date + timedelta(weeks=(cycles_passed + 1) * 4)
-    # Ensure it's engaging in the future (simple check)
-    if next_date <= now: next_date += timedelta(weeks=4)
-    
-    return int(next_date.timestamp())
+    anchor = int(datetime(start_year, start_month, start_day, hour, 0, 0, tzinfo=timezone.utc).timestamp())
+    now = int(time.time())
+    if anchor > now: return anchor # If reference is future, use it
+    for name, (series_anchor, period) in GAME_SERIES.items():
+        if series_anchor == anchor and period == 2419200: return game_events.next_after(name, now)
+    return recurrence.next_occurrence(anchor, 2419200, now)
 
 def get_next_foundry_target() -> int:
     """Returns next Wednesday 00:00 UTC (Time Selection Phase) for a 14-day cycle.
     Based on the rule that the week of Feb 23, 2026 (Wed Feb 25) is an OFF week,
     meaning the next active Wednesday is March 4, 2026."""
-    now = datetime.now(timezone.utc)
-    
-    # 1. Find the upcoming Wednesday (Weekday 2 is Wednesday)
-    days_ahead = (2 - now.weekday()) % 7
-    if days_ahead == 0 and now.hour > 20: 
-         days_ahead = 7
-    
-    target_wed = now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=days_ahead)
-    
-    # 2. Determine if this Wednesday is an "On" or "Off" week.
-    # Known ON week Wednesday: March 4, 2026 UTC
-    reference_wed = datetime(2026, 3, 4, tzinfo=timezone.utc)
-    
-    # Calculate days difference between our target Wednesday and the reference date
-    days_diff = (target_wed - reference_wed).days
-    
-    # If the difference is not a multiple of 14, it's an OFF week, so add 7 days to get to the ON week
-    if days_diff % 14 != 0:
-        target_wed += timedelta(days=7)
-        
-    return int(target_wed.timestamp())
+    # The current Wednesday still counts until 21:00 UTC
+    return game_events.next_after("foundry", int(time.time()) - 21 * 3600)
 
 def get_next_sunday_from_now() -> int:
     """Returns next Sunday relative to now."""
-    now = datetime.now(timezone.utc)
-    days_ahead = (6 - now.weekday()) % 7 # Sunday is 6
-    if days_ahead == 0: days_ahead = 7 # Next Sunday
-    
-    target = now + timedelta(days=days_ahead)
-    target = target.replace(hour=0, minute=0, second=0, microsecond=0)
-    return int(target.timestamp())
+    return game_events.next_after("sunday", int(time.time()))
 
 # --- Discord Event Helpers ---
 async def create_discord_event(guild: discord.Guild, label: str, start_epoch: int, duration_seconds: int = 900, description: str = None):
@@ -556,8 +629,41 @@ def is_admin(interaction: discord.Interaction) -> bool:
     """Consolidated Admin Check"""
     return interaction.user.guild_permissions.administrator
 
+# --- Member Cache ---
+# Recently seen/fetched members, for when discord.py's own member cache is off (LAZY_MEMBERS).
+member_lru: OrderedDict[tuple[int, int], discord.Member] = OrderedDict()
+
+def remember_member(member):
+    if not LAZY_MEMBERS or not isinstance(member, discord.Member): return
+    key = (member.guild.id, member.id)
+    member_lru[key] = member
+    member_lru.move_to_end(key)
+    while len(member_lru) > MEMBER_CACHE_SIZE:
+        member_lru.popitem(last=False)
+
+def get_cached_member(guild: discord.Guild, user_id: int) -> discord.Member | None:
+    member = guild.get_member(user_id)
+    if member: return member
+    key = (guild.id, user_id)
+    member = member_lru.get(key)
+    if member: member_lru.move_to_end(key)
+    return member
+
+async def get_member(guild: discord.Guild, user_id: int) -> discord.Member | None:
+    """Cache first, then one REST fetch. None if the user isn't in the guild (anymore)."""
+    member = get_cached_member(guild, user_id)
+    if member: return member
+    try:
+        member = await guild.fetch_member(user_id)
+    except discord.HTTPException:
+        return None
+    remember_member(member)
+    return member
+
 def check_permissions(interaction: discord.Interaction, owner_id: int) -> bool:
-    """True if user is Owner OR has management perms OR outranks the owner."""
+    """True if user is Owner OR has management perms OR outranks the owner.
+    Cache only: callers hold db_lock or are about to send a modal, so no REST here. An owner
+    who isn't cached (lazy member cache) can't be outranked; managers still pass."""
     if interaction.user.id == owner_id: return True
     if not interaction.guild: return False # In DMs, only owner can edit (checked above)
     if interaction.user.guild_permissions.administrator: return True
@@ -565,19 +671,144 @@ def check_permissions(interaction: discord.Interaction, owner_id: int) -> bool:
     if interaction.user.guild_permissions.manage_messages: return True
     
     # Hierarchy check
-    owner_member = interaction.guild.get_member(owner_id)
+    owner_member = get_cached_member(interaction.guild, owner_id)
     if owner_member and interaction.user.top_role.position > owner_member.top_role.position:
         return True
     return False
 
+# --- Role / Member Name Lookup ---
+# Per-guild trigram/prefix indexes, built lazily and kept current by the member/role events below.
+guild_indexes: dict[int, GuildNameIndex] = {}
+guild_index_builds: dict[int, asyncio.Task] = {}
+guild_index_backlog: dict[int, list] = {} # Events that arrived while a build was running
+
+async def _build_guild_index(guild: discord.Guild):
+    # Snapshot names on the loop (cheap), do the heavy indexing in a thread
+    snapshot = GuildNameIndex.snapshot(guild)
+    try:
+        idx = await asyncio.to_thread(GuildNameIndex.from_snapshot, snapshot)
+        for op in guild_index_backlog.pop(guild.id, []): op(idx)
+        guild_indexes[guild.id] = idx
+        logger.info(f"Name index built for {guild.name}: {len(idx.members)} members, {len(idx.roles)} roles")
+    finally:
+        guild_index_builds.pop(guild.id, None)
+        guild_index_backlog.pop(guild.id, None)
+
+async def warm_guild_names(guild: discord.Guild):
+    """Makes sure the guild's name index exists (runs while Groq is thinking)."""
+    idx = guild_indexes.get(guild.id)
+    # Rebuild once if the first build happened before member chunking finished
+    if idx and (idx.complete or not guild.chunked): return
+    task = guild_index_builds.get(guild.id)
+    if not task:
+        task = asyncio.create_task(_build_guild_index(guild))
+        guild_index_builds[guild.id] = task
+    await asyncio.shield(task)
+
+def _index_update(guild_id: int, op):
+    """Applies an incremental update now, or queues it if a build is in flight."""
+    if guild_id in guild_index_builds:
+        guild_index_backlog.setdefault(guild_id, []).append(op)
+    if guild_id in guild_indexes:
+        op(guild_indexes[guild_id])
+
+def find_role_by_name(guild: discord.Guild, query: str) -> discord.Role | None:
+    """Best-ranked role whose name contains the query."""
+    idx = guild_indexes.get(guild.id)
+    if not idx:
+        q = query.lower()
+        return next((r for r in guild.roles if q in r.name.lower()), None)
+    for role_id in idx.roles.search(query):
+        role = guild.get_role(role_id)
+        if role: return role
+    return None
+
+async def find_member_by_name(guild: discord.Guild, query: str) -> discord.Member | None:
+    """Best-ranked member whose username or display name contains the query."""
+    idx = guild_indexes.get(guild.id)
+    if not idx:
+        q = query.lower()
+        member = discord.utils.find(lambda m: q in m.name.lower() or q in m.display_name.lower(), guild.members)
+    else:
+        member = None
+        for member_id in idx.members.search(query):
+            member = await get_member(guild, member_id)
+            if member: break
+    if member or guild.chunked: return member
+    
+    # Member list isn't (fully) cached: ask the gateway for name prefix matches
+    try:
+        found = await guild.query_members(query=query, limit=5, cache=False)
+    except (asyncio.TimeoutError, discord.ClientException):
+        return None
+    for m in found:
+        remember_member(m)
+        _index_update(guild.id, lambda idx, m=m: idx.add_member(m))
+    return found[0] if found else None
+
+@bot.event
+async def on_member_join(member: discord.Member):
+    _index_update(member.guild.id, lambda idx: idx.add_member(member))
+
+@bot.event
+async def on_raw_member_remove(payload: discord.RawMemberRemoveEvent):
+    member_lru.pop((payload.guild_id, payload.user.id), None)
+    _index_update(payload.guild_id, lambda idx: idx.remove_member(payload.user.id))
+
+@bot.event
+async def on_member_update(before: discord.Member, after: discord.Member):
+    if (after.guild.id, after.id) in member_lru: remember_member(after)
+    if before.nick != after.nick or before.name != after.name:
+        _index_update(after.guild.id, lambda idx: idx.add_member(after))
+
+@bot.event
+async def on_user_update(before: discord.User, after: discord.User):
+    if before.name == after.name and before.global_name == after.global_name: return
+    for guild in after.mutual_guilds:
+        member = get_cached_member(guild, after.id)
+        if member: _index_update(guild.id, lambda idx, m=member: idx.add_member(m))
+
+@bot.event
+async def on_guild_role_create(role: discord.Role):
+    _index_update(role.guild.id, lambda idx: idx.add_role(role))
+
+@bot.event
+async def on_guild_role_update(before: discord.Role, after: discord.Role):
+    if before.name != after.name:
+        _index_update(after.guild.id, lambda idx: idx.add_role(after))
+
+@bot.event
+async def on_guild_role_delete(role: discord.Role):
+    _index_update(role.guild.id, lambda idx: idx.remove_role(role.id))
+
+@bot.event
+async def on_interaction(interaction: discord.Interaction):
+    remember_member(interaction.user)
+
+@bot.event
+async def on_guild_remove(guild: discord.Guild):
+    for key in [k for k in member_lru if k[0] == guild.id]: del member_lru[key]
+    guild_indexes.pop(guild.id, None)
+    guild_index_backlog.pop(guild.id, None)
+
+# Conversation/game state lives in TTL stores: abandoned flows expire instead of piling up.
+# TTLs slide, so every step a user takes restarts the clock.
+
 # --- Foundry State ---
-user_foundry_state: dict[int, dict[str, Any]] = {} # {user_id: {"step": "awaiting_time", "guild_id": 123, "channel_id": 456}}
-user_cycle_states: dict[int, dict[str, Any]] = {}
+user_foundry_state = TTLStore("foundry", ttl=12 * 3600) # {user_id: {"step": "awaiting_time", "guild_id": 123, "channel_id": 456}}
+user_cycle_states = TTLStore("cycle", ttl=24 * 3600)
+
+# --- RPS State ---
+active_targeted_rps = TTLStore("rps", ttl=15 * 60) # {match_id: {"p1": ..., "p2": ..., ...}}
+# assets/ lives in memory (loaded in setup_hook); ASSET_CDN_REUSE=1 re-links result images instead of re-uploading
+asset_cache = AssetCache(reuse_urls=os.getenv("ASSET_CDN_REUSE", "").lower() in ("1", "true", "yes"))
 
 # --- DM Setup Wizard State ---
-user_setup_state: dict[int, dict[str, Any]] = {}
+user_setup_state = TTLStore("setup_wizard", ttl=30 * 60)
 # Format: {user_id: {"step": str, "guild_id": int, "data": {"label": ..., "end_epoch": ..., etc}}}
 
+state_stores = [user_foundry_state, user_cycle_states, active_targeted_rps, user_setup_state]
+
 # --- UI Components ---
 class EditShiftView(discord.ui.View):
     def __init__(self, guild_id: str, timer_index: int, new_end: int):
@@ -970,7 +1201,8 @@ class TimerDetailsModal(discord.ui.Modal, title="Configure Operation"):
             None, # Image URL removed from Modal due to limit
             event_duration=event_duration,
             reminders=reminders,
-            description=self.desc_input.value.strip() or None
+            description=self.desc_input.value.strip() or None,
+            recurrence_tz=self.user_tz if parse_mode == "smart" else None
         )
         try: await interaction.message.edit(content="✅ **Configuration Saved**", view=None)
         except: pass
@@ -1116,7 +1348,7 @@ class TimerWizardView(discord.ui.View):
             async with db_lock:
                 data = load_data()
                 guild_id = str(interaction.guild_id)
-                if guild_id not in data: data[guild_id] = {"timers": []}
+                if guild_id not in data: data[guild_id] = {"kind": "guild", "timers": []}
                 if "timers" not in data[guild_id]: data[guild_id]["timers"] = []
     
                 # Check for existing Foundry Job
@@ -1129,6 +1361,7 @@ class TimerWizardView(discord.ui.View):
                 end_epoch = get_next_foundry_target()
                 
                 new_job = {
+                    "id": new_timer_id(),
                     "label": label,
                     "end_epoch": end_epoch,
                     "start_epoch": int(time.time()),
@@ -1670,10 +1903,11 @@ class DashboardView(discord.ui.View):
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
 class RecurrenceSuggestionView(discord.ui.View):
-    def __init__(self, context_id: str, label: str, interval: int, interval_str: str, is_dm: bool):
+    def __init__(self, context_id: str, label: str, interval: int, interval_str: str, is_dm: bool, timer_id: str = None):
         super().__init__(timeout=None)
         self.context_id = context_id
         self.label = label
+        self.timer_id = timer_id
         self.interval = interval
         self.interval_str = interval_str
         self.is_dm = is_dm
@@ -1686,17 +1920,17 @@ class RecurrenceSuggestionView(discord.ui.View):
         success = False
         async with db_lock:
             data = load_data()
-            if self.context_id in data and "timers" in data[self.context_id]:
-                for t in data[self.context_id]["timers"]:
-                    if t['label'].lower() == self.label.lower():
-                        if not check_permissions(interaction, t['owner_id']):
-                            await interaction.response.send_message("❌ You can only modify your own timers.", ephemeral=True)
-                            return
-                        
-                        t["recurrence_seconds"] = self.interval
-                        save_data(data)
-                        success = True
-                        break
+            timers = data.get(self.context_id, {}).get("timers", [])
+            pos = locate(timers, self.timer_id) if self.timer_id else find_timer(data, self.context_id, self.label)
+            if pos is not None:
+                t = timers[pos]
+                if not check_permissions(interaction, t['owner_id']):
+                    await interaction.response.send_message("❌ You can only modify your own timers.", ephemeral=True)
+                    return
+                
+                t["recurrence_seconds"] = self.interval
+                save_data(data)
+                success = True
         
         if success:
             if not self.is_dm and interaction.guild:
@@ -1712,7 +1946,7 @@ class RecurrenceSuggestionView(discord.ui.View):
         await interaction.response.send_message("❌ Timer not found. It may have already expired.", ephemeral=True)
 
 # --- Core Logic ---
-async def add_timer(interaction: discord.Interaction, label: str, end_epoch: int, role_id: int, notify_method: str, mode: str, recurrence_seconds: int = 0, image_url: str = None, event_duration: int = 900, reminders: list = None, description: str = None):
+async def add_timer(interaction: discord.Interaction, label: str, end_epoch: int, role_id: int, notify_method: str, mode: str, recurrence_seconds: int = 0, image_url: str = None, event_duration: int = 900, reminders: list = None, description: str = None, spec: SpeculativeContext = None, recurrence_tz: str = None):
     # Context ID (Guild OR User)
     context_id = str(interaction.guild_id) if interaction.guild else str(interaction.user.id)
     is_dm = interaction.guild is None
@@ -1723,12 +1957,13 @@ async def add_timer(interaction: discord.Interaction, label: str, end_epoch: int
          discord_event_id = await create_discord_event(interaction.guild, label, end_epoch, event_duration, description=description)
     
     async with db_lock:
-        data = load_data()
-        if context_id not in data: data[context_id] = {"timers": []}
+        data = await spec.data_for_update() if spec else load_data()
+        if context_id not in data: data[context_id] = {"kind": "dm" if is_dm else "guild", "timers": []}
         if "timers" not in data[context_id]: data[context_id]["timers"] = []
         
         # Save Timer
         new_timer = {
+            "id": new_timer_id(),
             "label": label,
             "end_epoch": end_epoch,
             "start_epoch": int(time.time()),
@@ -1744,6 +1979,9 @@ async def add_timer(interaction: discord.Interaction, label: str, end_epoch: int
             "sent_reminders": [],
             "description": description
         }
+        # Whole-day repeats of a time given in the user's zone keep their local time across DST
+        recurrence_tz = recurrence.rule_zone_name(recurrence_seconds, recurrence_tz)
+        if recurrence_tz: new_timer["recurrence_tz"] = recurrence_tz
         
         data[context_id]["timers"].append(new_timer)
         data[context_id]["timers"].sort(key=lambda x: x["end_epoch"])
@@ -1771,13 +2009,13 @@ async def add_timer(interaction: discord.Interaction, label: str, end_epoch: int
                     
                     # Check if strictly positive, matching, and a multiple of a day (or exact)
                     if diff1 > 0 and diff1 == diff2 and (diff1 % 86400 == 0):
-                        suggest_view = RecurrenceSuggestionView(context_id, label, diff1, get_interval_str(diff1), is_dm)
+                        suggest_view = RecurrenceSuggestionView(context_id, label, diff1, get_interval_str(diff1), is_dm, new_timer["id"])
     
         save_data(data)
     
     # Confirmation Embed
     ts = int(end_epoch)
-    gcal_link = generate_gcal_link(label, end_epoch, event_duration)
+    gcal_link = generate_gcal_link(label, end_epoch, event_duration, recurrence_seconds, recurrence_tz)
     
     embed = discord.Embed(title="✅ Timer Set", color=discord.Color.green())
     desc = f"**{label}**\n📅 <t:{ts}:F> (<t:{ts}:R>)\n"
@@ -1924,7 +2162,7 @@ async def update_dashboard(guild_or_user, data, resend: bool = False):
 async def run_setup(guild, channel):
     data = load_data()
     guild_id = str(guild.id)
-    if guild_id not in data: data[guild_id] = {}
+    if guild_id not in data: data[guild_id] = {"kind": "guild"}
     
     dashboards = data[guild_id].get("dashboards", [])
     if not dashboards and "dashboard_message_id" in data[guild_id]:
@@ -1960,7 +2198,7 @@ async def run_setup(guild, channel):
 
     async with db_lock:
         data = load_data()
-        if guild_id not in data: data[guild_id] = {}
+        if guild_id not in data: data[guild_id] = {"kind": "guild"}
         if "timers" not in data[guild_id]: data[guild_id]["timers"] = []
         if "dashboards" not in data[guild_id]: data[guild_id]["dashboards"] = []
         
@@ -2051,6 +2289,36 @@ async def cleanup_events_slash(interaction: discord.Interaction):
             
     await interaction.followup.send(f"✅ **Cleanup Complete:** Removed {deleted_count} unnecessary Discord events.", ephemeral=True)
 
+# --- Command Sync ---
+# Global syncs are slow and rate limited, so boots only sync when the tree's hash differs from the stored one.
+# !sync (in DMs) / !syncglobal always sync; FORCE_SYNC=1 forces it at startup.
+def command_tree_hash() -> str:
+    """Stable hash of the global command payloads (names, options, contexts, installs, ...)."""
+    payloads = [cmd.to_dict(bot.tree) for cmd in bot.tree.get_commands()]
+    payloads.sort(key=lambda p: (p.get("type", 1), p["name"]))
+    blob = json.dumps(payloads, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+async def sync_global_commands() -> list:
+    synced = await bot.tree.sync()
+    set_meta("command_tree_hash", command_tree_hash())
+    bot.commands_synced = True
+    return synced
+
+async def sync_commands_if_changed():
+    if not ownership.owns_globals():
+        bot.commands_synced = True # The shard 0 process syncs for everyone
+        return
+    tree_hash = command_tree_hash()
+    force = os.getenv("FORCE_SYNC", "").lower() in ("1", "true", "yes")
+    if not force and get_meta("command_tree_hash") == tree_hash:
+        bot.commands_synced = True
+        logger.info(f"Command tree unchanged ({tree_hash[:12]}), skipping global sync")
+        return
+    logger.info(f"Command tree changed ({tree_hash[:12]}), syncing...")
+    synced = await sync_global_commands()
+    logger.info(f"✅ Synced {len(synced)} Global Commands")
+
 @bot.command()
 async def sync(ctx):
     try:
@@ -2064,7 +2332,7 @@ async def sync(ctx):
         else:
             # Global Sync (For DMs / User App)
             await ctx.send("🔄 **Global Syncing...** (Updates DMs/All Servers - Takes up to 1h)")
-            synced = await bot.tree.sync()
+            synced = await sync_global_commands()
             await ctx.send(f"✅ **Global Sync Complete:** {len(synced)} commands.")
     except Exception as e:
         await ctx.send(f"❌ Sync failed: {e}")
@@ -2074,8 +2342,7 @@ async def parse_natural_language_groq(text: str, user_tz_str: str = "UTC") -> di
         raise ValueError("Groq API Key is not configured.")
         
     try:
-        import zoneinfo
-        user_tz = zoneinfo.ZoneInfo(user_tz_str) if user_tz_str.upper() != "UTC" else timezone.utc
+        user_tz = tz_index.get_zone(user_tz_str)
     except:
         user_tz = timezone.utc
         
@@ -2146,6 +2413,7 @@ async def parse_natural_language_groq(text: str, user_tz_str: str = "UTC") -> di
     10. Countdown / Repeated Tags: If the user says "tag me every minute for the next 5 minutes", set time_string="5m", interval_string="0", and generate the countdown reminders yourself in reminders_string (e.g. "4m, 3m, 2m, 1m").
     """
     
+    start = time.perf_counter()
     try:
         completion = await groq_client.chat.completions.create(
             messages=[{"role": "user", "content": prompt}],
@@ -2156,8 +2424,11 @@ async def parse_natural_language_groq(text: str, user_tz_str: str = "UTC") -> di
         content = completion.choices[0].message.content
         return json.loads(content)
     except Exception as e:
+        metrics.GROQ_ERRORS.inc(reason="bad_json" if isinstance(e, json.JSONDecodeError) else type(e).__name__)
         logger.error(f"Groq parsing error: {e}")
         raise ValueError("Failed to understand the request.")
+    finally:
+        metrics.GROQ_SECONDS.observe(time.perf_counter() - start)
 
 @bot.tree.command(name="chrono", description="Universal AI Engine: Manage events, timers, and cycles (e.g. 'Set Foundry to 14:00')")
 @app_commands.allowed_installs(guilds=True, users=True)
@@ -2165,6 +2436,8 @@ async def parse_natural_language_groq(text: str, user_tz_str: str = "UTC") -> di
 @app_commands.describe(request="Your request (e.g. 'Move Bear Trap to 14:00', 'Cancel Castle', 'Ping @R4 for Joe')")
 async def remind_slash(interaction: discord.Interaction, request: str):
     await interaction.response.defer(ephemeral=True)
+    # Start DB + role/member lookups now, they resolve while Groq is thinking
+    spec = SpeculativeContext(interaction.guild)
     try:
         user_tz_str = get_user_tz_str(interaction.user.id)
         parsed = await parse_natural_language_groq(request, user_tz_str)
@@ -2186,15 +2459,16 @@ async def remind_slash(interaction: discord.Interaction, request: str):
                 return
                 
             # Find the user
-            target_member = discord.utils.find(lambda m: target_name in m.name.lower() or target_name in m.display_name.lower(), interaction.guild.members)
+            await spec.names_ready()
+            target_member = await find_member_by_name(interaction.guild, target_name)
             if not target_member:
                 await interaction.followup.send(f"❌ Could not find a member matching `{target_name}`.", ephemeral=True)
                 return
-                
+
             async with db_lock:
-                data = load_data()
+                data = await spec.data_for_update()
                 context_id = str(interaction.guild_id)
-                if context_id not in data: data[context_id] = {}
+                if context_id not in data: data[context_id] = {"kind": "guild"}
                 if "timing_managers" not in data[context_id]: data[context_id]["timing_managers"] = []
                 
                 mgrs = data[context_id]["timing_managers"]
@@ -2224,7 +2498,7 @@ async def remind_slash(interaction: discord.Interaction, request: str):
                 await interaction.followup.send("❌ Only Server Administrators can manage Event Cycles.", ephemeral=True)
                 return
                 
-            user_tz = get_user_tz_str(interaction.user.id)
+            user_tz = user_tz_str
             if parsed.get("timezone"):
                 user_tz = parsed.get("timezone")
             time_str = parsed.get("time_string", "")
@@ -2243,11 +2517,11 @@ async def remind_slash(interaction: discord.Interaction, request: str):
             except: interval_sec = 1209600
             
             async with db_lock:
-                data = load_data()
+                data = await spec.data_for_update()
                 context_id = str(interaction.guild_id)
-                if context_id not in data: data[context_id] = {}
+                if context_id not in data: data[context_id] = {"kind": "guild"}
                 if "cycles" not in data[context_id]: data[context_id]["cycles"] = []
-                
+
                 cycles = data[context_id]["cycles"]
                 cycle = next((c for c in cycles if c['name'].lower() == label.lower()), None)
                 if cycle:
@@ -2275,16 +2549,15 @@ async def remind_slash(interaction: discord.Interaction, request: str):
         if action == "delete":
             removed_timer = None
             async with db_lock:
-                data = load_data()
+                data = await spec.data_for_update()
                 context_id = str(interaction.guild_id) if interaction.guild else str(interaction.user.id)
-                if context_id in data and "timers" in data[context_id]:
-                    for idx, t in enumerate(data[context_id]["timers"]):
-                        if t['label'].lower() == label.lower():
-                            if not check_permissions(interaction, t['owner_id']):
-                                await interaction.followup.send("❌ **Access Denied.** You can only delete your own timers.", ephemeral=True); return
-                            removed_timer = data[context_id]["timers"].pop(idx)
-                            save_data(data)
-                            break
+                pos = find_timer(data, context_id, label)
+                if pos is not None:
+                    t = data[context_id]["timers"][pos]
+                    if not check_permissions(interaction, t['owner_id']):
+                        await interaction.followup.send("❌ **Access Denied.** You can only delete your own timers.", ephemeral=True); return
+                    removed_timer = data[context_id]["timers"].pop(pos)
+                    save_data(data)
             
             if removed_timer:
                 if removed_timer.get("discord_event_id") and interaction.guild:
@@ -2297,7 +2570,7 @@ async def remind_slash(interaction: discord.Interaction, request: str):
             return
 
         # Time Parsing for Create/Edit
-        user_tz = get_user_tz_str(interaction.user.id)
+        user_tz = user_tz_str
         if parsed.get("timezone"):
             user_tz = parsed.get("timezone")
         time_str = parsed.get("time_string", "")
@@ -2342,14 +2615,14 @@ async def remind_slash(interaction: discord.Interaction, request: str):
             notify_method = "📩 DM Me"
         elif target_role_str:
             # Fuzzy match role
-            for r in interaction.guild.roles:
-                if target_role_str.lower() in r.name.lower():
-                    # Check hierarchy/permissions
-                    if interaction.user.guild_permissions.administrator or interaction.user.guild_permissions.manage_roles or interaction.user.top_role.position > r.position:
-                        role_id = r.id
-                    else:
-                        await interaction.followup.send(f"⚠️ You lack permissions to ping the **{r.name}** role. Reverting to channel alert without ping.", ephemeral=True)
-                    break
+            await spec.names_ready()
+            r = find_role_by_name(interaction.guild, target_role_str)
+            if r:
+                # Check hierarchy/permissions
+                if interaction.user.guild_permissions.administrator or interaction.user.guild_permissions.manage_roles or interaction.user.top_role.position > r.position:
+                    role_id = r.id
+                else:
+                    await interaction.followup.send(f"⚠️ You lack permissions to ping the **{r.name}** role. Reverting to channel alert without ping.", ephemeral=True)
             # If no role matched and target_role_str is set, maybe they meant DM?
             if not role_id and "me" in target_role_str.lower():
                 notify_method = "📩 DM Me"
@@ -2358,78 +2631,105 @@ async def remind_slash(interaction: discord.Interaction, request: str):
             
         # 2. EDIT ACTION
         if action == "edit":
-            data = load_data()
-            context_id = str(interaction.guild_id) if interaction.guild else str(interaction.user.id)
-            if context_id in data and "timers" in data[context_id]:
-                for t in data[context_id]["timers"]:
-                    if t['label'].lower() == label.lower():
-                        if not check_permissions(interaction, t['owner_id']):
-                            await interaction.followup.send("❌ **Access Denied.** You can only edit your own timers.", ephemeral=True); return
-                        
+            found = denied = False
+            event_op = None
+            async with db_lock:
+                data = await spec.data_for_update()
+                context_id = str(interaction.guild_id) if interaction.guild else str(interaction.user.id)
+                pos = find_timer(data, context_id, label)
+                if pos is not None:
+                    t = data[context_id]["timers"][pos]
+                    found = True
+                    if not check_permissions(interaction, t['owner_id']):
+                        denied = True
+                    else:
                         if end_epoch:
                             t["end_epoch"] = end_epoch
                             t["start_epoch"] = int(time.time())
                             t["sent_reminders"] = []
                         if recurrence_seconds is not None: t["recurrence_seconds"] = recurrence_seconds
+                        if end_epoch or recurrence_seconds is not None:
+                            rule_tz = recurrence.rule_zone_name(t.get("recurrence_seconds", 0), user_tz if end_epoch else t.get("recurrence_tz"))
+                            if rule_tz: t["recurrence_tz"] = rule_tz
+                            else: t.pop("recurrence_tz", None)
                         if reminders_list is not None: t["reminders"] = reminders_list
                         if notify_method: t["notify_method"] = notify_method
-                        if target_role_str: 
+                        if target_role_str:
                             t["role_id"] = role_id
                             if not role_id and "me" in target_role_str.lower(): t["role_id"] = None
                         if description: t["description"] = description
-                        
+
                         if not t.get("role_id") and t.get("discord_event_id") and interaction.guild:
-                            try: await delete_discord_event(interaction.guild, t["discord_event_id"])
-                            except: pass
+                            event_op = ("delete", t["discord_event_id"])
                             t["discord_event_id"] = None
                         elif t.get("discord_event_id") and interaction.guild:
-                             await update_discord_event(interaction.guild, t["discord_event_id"], t["label"], t.get("end_epoch", end_epoch), t.get("event_duration", 900))
-                        
+                            event_op = ("update", t["discord_event_id"], t["label"], t.get("end_epoch", end_epoch), t.get("event_duration", 900))
+
                         data[context_id]["timers"].sort(key=lambda x: x["end_epoch"])
                         save_data(data)
-                        if interaction.guild: await update_dashboard(interaction.guild, data[context_id], resend=True)
-                        await interaction.followup.send(f"✅ Updated timer **{label}**.", ephemeral=True)
-                        return
+
+            if denied:
+                await interaction.followup.send("❌ **Access Denied.** You can only edit your own timers.", ephemeral=True); return
+            if found:
+                # Discord calls happen outside the lock
+                if event_op and event_op[0] == "delete":
+                    try: await delete_discord_event(interaction.guild, event_op[1])
+                    except: pass
+                elif event_op:
+                    await update_discord_event(interaction.guild, *event_op[1:])
+                if interaction.guild: await update_dashboard(interaction.guild, data[context_id], resend=True)
+                await interaction.followup.send(f"✅ Updated timer **{label}**.", ephemeral=True)
+                return
             await interaction.followup.send(f"❌ Timer **{label}** not found to edit.", ephemeral=True)
             return
 
         # 2.5 OVERRIDE ACTION
         if action == "override":
-            data = load_data()
-            context_id = str(interaction.guild_id) if interaction.guild else str(interaction.user.id)
-            if context_id in data and "timers" in data[context_id]:
-                for t in data[context_id]["timers"]:
-                    if t['label'].lower() == label.lower():
-                        if not check_permissions(interaction, t['owner_id']):
-                            await interaction.followup.send("❌ **Access Denied.** You can only override your own timers.", ephemeral=True); return
-                        
-                        if not end_epoch:
-                            await interaction.followup.send("❌ You must specify the new overridden time.", ephemeral=True); return
-                            
-                        if not t.get("recurrence_seconds"):
-                            await interaction.followup.send("❌ Overrides are only for recurring events. For normal events, use edit.", ephemeral=True); return
-
+            error = None
+            found = False
+            event_id = None
+            async with db_lock:
+                data = await spec.data_for_update()
+                context_id = str(interaction.guild_id) if interaction.guild else str(interaction.user.id)
+                pos = find_timer(data, context_id, label)
+                if pos is not None:
+                    t = data[context_id]["timers"][pos]
+                    found = True
+                    if not check_permissions(interaction, t['owner_id']):
+                        error = "❌ **Access Denied.** You can only override your own timers."
+                    elif not end_epoch:
+                        error = "❌ You must specify the new overridden time."
+                    elif not t.get("recurrence_seconds"):
+                        error = "❌ Overrides are only for recurring events. For normal events, use edit."
+                    else:
                         t["override_epoch"] = end_epoch
                         t["sent_reminders"] = []
-                        
-                        # Update native discord event to reflect the override
-                        if t.get("discord_event_id") and interaction.guild:
-                             await update_discord_event(interaction.guild, t["discord_event_id"], t["label"], end_epoch, t.get("event_duration", 900))
-                        
+                        event_id = t.get("discord_event_id")
+                        event_label = t["label"]
+                        event_duration = t.get("event_duration", 900)
                         # Note: we don't re-sort by end_epoch since the base end_epoch hasn't changed.
                         save_data(data)
-                        if interaction.guild: await update_dashboard(interaction.guild, data[context_id], resend=True)
-                        await interaction.followup.send(f"✅ Set one-off override for **{label}** to <t:{end_epoch}:f>.", ephemeral=True)
-                        return
+
+            if error:
+                await interaction.followup.send(error, ephemeral=True); return
+            if found:
+                # Update native discord event to reflect the override
+                if event_id and interaction.guild:
+                     await update_discord_event(interaction.guild, event_id, event_label, end_epoch, event_duration)
+                if interaction.guild: await update_dashboard(interaction.guild, data[context_id], resend=True)
+                await interaction.followup.send(f"✅ Set one-off override for **{label}** to <t:{end_epoch}:f>.", ephemeral=True)
+                return
             await interaction.followup.send(f"❌ Recurring timer **{label}** not found.", ephemeral=True)
             return
 
-        await add_timer(interaction, label, end_epoch, role_id, notify_method or "📢 Message in Server (Ping Role)", "smart", recurrence_seconds or 0, None, event_duration or 900, reminders_list or [], description)
+        await add_timer(interaction, label, end_epoch, role_id, notify_method or "📢 Message in Server (Ping Role)", "smart", recurrence_seconds or 0, None, event_duration or 900, reminders_list or [], description, spec=spec, recurrence_tz=user_tz)
         
     except ValueError as e:
         await interaction.followup.send(f"❌ {str(e)}", ephemeral=True)
     except Exception as e:
         await interaction.followup.send(f"❌ Error: {e}", ephemeral=True)
+    finally:
+        spec.discard()
 
 
 @bot.tree.command(name="dashboard", description="Create or Move a Chrono Dashboard")
@@ -2450,7 +2750,7 @@ async def dashboard(interaction: discord.Interaction, name: str = "Main Dashboar
     
     async with db_lock:
         data = load_data()
-        if context_id not in data: data[context_id] = {}
+        if context_id not in data: data[context_id] = {"kind": "guild"}
         
         # Migration block
         if "dashboards" not in data[context_id]:
@@ -2555,7 +2855,7 @@ async def set_cycle(interaction: discord.Interaction, event_name: str, voting_st
     async with db_lock:
         data = load_data()
         context_id = str(interaction.guild_id)
-        if context_id not in data: data[context_id] = {}
+        if context_id not in data: data[context_id] = {"kind": "guild"}
         if "cycles" not in data[context_id]: data[context_id]["cycles"] = []
         
         # Update or add cycle
@@ -2620,129 +2920,217 @@ async def sync_global(ctx):
     """Admin command to force a global slash command sync (for DMs)"""
     msg = await ctx.send("🔄 Syncing global slash commands... (This might take a moment)")
     try:
-        synced = await bot.tree.sync()
+        synced = await sync_global_commands()
         await msg.edit(content=f"✅ Successfully synced {len(synced)} global commands! They should now appear in DMs.")
     except Exception as e:
         await msg.edit(content=f"❌ Failed to sync: {e}")
 
-async def check_missed_events():
+# --- Catch-up ---
+def context_kind(context_id: str, context_data: dict) -> str | None:
+    """"guild" or "dm" for a context, None if its stored data doesn't tell.
+    New contexts are stamped with their kind; older ones are classified by classify_contexts at startup."""
+    if context_data.get("kind"): return context_data["kind"]
+    if context_id.isdigit() and bot.get_guild(int(context_id)): return "guild"
+    # Only guild contexts have these
+    if context_data.get("cycles") or context_data.get("timing_managers"): return "guild"
+    if any(t.get("role_id") or t.get("discord_event_id") for t in context_data.get("timers", [])): return "guild"
+    return None
+
+async def classify_contexts(data: dict) -> dict[str, str]:
+    """Kinds for contexts stored without one. Ids the stored data can't settle are looked up
+    as users: an id that isn't a user is a guild (one we may not be able to see right now)."""
+    kinds, unknown = {}, []
+    for context_id, context_data in data.items():
+        if not isinstance(context_data, dict) or not context_id.isdigit() or context_data.get("kind"): continue
+        kind = context_kind(context_id, context_data)
+        if kind: kinds[context_id] = kind
+        else: unknown.append(context_id)
+    
+    async def probe(context_id: str) -> str:
+        try:
+            await bot.fetch_user(int(context_id))
+            return "dm"
+        except discord.NotFound:
+            return "guild"
+    for context_id, result in zip(unknown, await gather_bounded(probe(c) for c in unknown)):
+        if isinstance(result, Exception): logger.warning(f"Couldn't classify context {context_id}: {result}")
+        else: kinds[context_id] = result
+    return kinds
+
+# Planned under db_lock without awaiting anything; sends and event recreation run afterwards, outside the lock.
+class CatchUpPlan:
+    """Late reminders / missed expiries from while we were offline, grouped by destination."""
+    def __init__(self):
+        self.alerts: dict[tuple[str, int], list[dict]] = {} # ("channel", id) / ("user", id) -> items
+        self.guilds: dict[int, discord.Guild | None] = {} # Channel id -> guild (None if not cached)
+        self.event_deletes: list[tuple[discord.Guild, int]] = []
+        self.event_creates: list[tuple[str, str, discord.Guild, str, int, int]] = [] # (context, timer id, guild, label, start, duration)
+        self.changed: set[str] = set()
+
+    def add_alert(self, context_data: dict, guild: discord.Guild | None, context_id: int, item: dict, is_dm: bool):
+        if not is_dm:
+            chan_id = context_data["dashboards"][0].get("channel_id") if context_data.get("dashboards") else context_data.get("dashboard_channel_id")
+            if not chan_id: return
+            dest = ("channel", chan_id)
+            self.guilds[chan_id] = guild
+        else:
+            dest = ("user", context_id)
+        self.alerts.setdefault(dest, []).append(item)
+
+def plan_missed_events(data: dict) -> CatchUpPlan:
+    """Applies the timer state changes for everything missed while offline (caller holds db_lock
+    and saves) and returns what still has to be sent/recreated."""
     logger.info("Checking for missed events...")
-    async with db_lock:
-        data = load_data()
-        try: now = int(time.time())
-        except: now = int(time.time()) 
+    now = int(time.time())
+    plan = CatchUpPlan()
+    ensure_timer_ids(data) # Event ids are written back by timer id
+    
+    for context_id_str, context_data in data.items():
+        if not isinstance(context_data, dict) or "timers" not in context_data: continue
+        if not context_id_str.isdigit(): continue
+        # By the stored context, not the guild cache: an unavailable guild isn't a DM
+        is_dm = context_kind(context_id_str, context_data) == "dm"
+        if not ownership.owns(context_id_str, dm=is_dm): continue
+        timers_to_keep = []
         
-        changed_guilds = set()
+        guild = None if is_dm else bot.get_guild(int(context_id_str))
+        guild_changed = False
         
-        for context_id_str, context_data in data.items():
-            if "timers" not in context_data: continue
-            timers_to_keep = []
-            
-            # Resolve Context
-            guild = None
-            user = None
-            try: guild = bot.get_guild(int(context_id_str)) or await bot.fetch_guild(int(context_id_str))
-            except: pass
-            if not guild:
-                try: user = await bot.fetch_user(int(context_id_str))
-                except: pass
+        for timer in context_data["timers"]:
+            if timer["end_epoch"] > now:
+                # Timer still active, check if we missed any reminders
+                sent = timer.get("sent_reminders", [])
+                for r_sec in timer.get("reminders", []):
+                    if r_sec in sent: continue
+                    remain = timer["end_epoch"] - now
+                    if remain <= r_sec:
+                        plan.add_alert(context_data, guild, int(context_id_str), {"kind": "reminder", "label": timer["label"], "r_sec": r_sec, "remain": remain, "end_epoch": timer["end_epoch"]}, is_dm)
+                        sent.append(r_sec)
+                        timer["sent_reminders"] = sent
+                        guild_changed = True
+                
+                # BUGFIX: Must always keep active timers!
+                timers_to_keep.append(timer)
+                continue
             
-            guild_changed = False
+            logger.info(f"Restoring expired timer: {timer['label']}")
+            plan.add_alert(context_data, guild, int(context_id_str), {"kind": "expiry", "label": timer["label"], "end_epoch": timer["end_epoch"], "owner_id": timer.get("owner_id")}, is_dm)
+            guild_changed = True
             
-            # Re-check timers for missed reminders (even if not expired)
-            for timer in context_data["timers"]:
-                if timer["end_epoch"] > now:
-                    # Timer still active, check if we missed any reminders
-                    reminders = timer.get("reminders", [])
-                    sent = timer.get("sent_reminders", [])
-                    for r_sec in reminders:
-                        if r_sec in sent: continue
-                        remain = timer["end_epoch"] - now
-                        # If we are PAST the reminder time (remain < r_sec) but within reasonable window (e.g. didn't happen 10 years ago)
-                        # And only if remain > 0 (event technically active)
-                        if remain <= r_sec:
-                            msg = f"⚠️ **Late Reminder (Bot Restarted):** `{timer['label']}` was due {get_interval_str(r_sec)} ago! (Event in {get_interval_str(remain)})"
-                            try:
-                                if guild:
-                                    chan = guild.get_channel(context_data["dashboards"][0].get("channel_id") if context_data.get("dashboards") else context_data.get("dashboard_channel_id"))
-                                    if chan: asyncio.create_task(chan.send(msg))
-                                elif user:
-                                    asyncio.create_task(user.send(msg))
-                            except Exception as e:
-                                logger.error(f"Failed to send missed early reminder: {e}")
-                            sent.append(r_sec)
-                            timer["sent_reminders"] = sent
-                            guild_changed = True
-                    
-                    # BUGFIX: Must always keep active timers!
-                    timers_to_keep.append(timer)
-    
-                elif timer["end_epoch"] <= now:
-                    logger.info(f"Restoring expired timer: {timer['label']}")
-                    try:
-                        embed = discord.Embed(title="⚠️ Missed Alert (Offline)", description=f"**{timer['label']}** ended at <t:{timer['end_epoch']}:t>.", color=discord.Color.orange())
-                        if guild:
-                            chan = guild.get_channel(context_data["dashboards"][0].get("channel_id") if context_data.get("dashboards") else context_data.get("dashboard_channel_id"))
-                            if chan:
-                                asyncio.create_task(chan.send(content=f"<@{timer['owner_id']}>", embed=embed))
-                        elif user:
-                            asyncio.create_task(user.send(embed=embed))
-                    except Exception as e:
-                        logger.error(f"Failed to send missed expiry alert: {e}")
-                    
-                    recur = timer.get("recurrence_seconds", 0)
-                    if recur > 0:
-                        next_time = timer["end_epoch"]
-                        while next_time < now: next_time += recur
-                        timer["end_epoch"] = next_time
-                        timer["start_epoch"] = now 
-                        timer["sent_reminders"] = []
-                        
-                        # New Cycle = New Event (If Guild)
-                        if guild:
-                            dur = timer.get("event_duration", 900)
-                            # Clean old event first if exists
-                            if timer.get("discord_event_id"):
-                                 try:
-                                     asyncio.create_task(delete_discord_event(guild, timer["discord_event_id"]))
-                                 except: pass
-                                 timer["discord_event_id"] = None
-    
-                            if timer.get("role_id") and timer.get("mode", "") != "silent":
-                                try:
-                                    evt_id = await create_discord_event(guild, timer["label"], next_time, dur)
-                                    timer["discord_event_id"] = evt_id
-                                except Exception as e:
-                                    logger.error(f"Failed to create missed event: {e}")
-                                    timer["discord_event_id"] = None
-                        
-                        timers_to_keep.append(timer)
-                        guild_changed = True
-                    else:
-                        guild_changed = True
-    
-            if guild_changed:
-                timers_to_keep.sort(key=lambda x: x["end_epoch"])
-                context_data["timers"] = timers_to_keep
-                changed_guilds.add(context_id_str)
+            recur = timer.get("recurrence_seconds", 0)
+            if recur > 0:
+                zone = recurrence.rule_zone(recur, timer.get("recurrence_tz"))
+                next_time = recurrence.next_occurrence(timer["end_epoch"], recur, now, zone, inclusive=True)
+                timer["end_epoch"] = next_time
+                timer["start_epoch"] = now 
+                timer["sent_reminders"] = []
                 
-        if changed_guilds:
-            save_data(data)
+                # New Cycle = New Event (If Guild)
+                if guild:
+                    if timer.get("discord_event_id"):
+                        plan.event_deletes.append((guild, timer["discord_event_id"]))
+                        timer["discord_event_id"] = None
+                    if timer.get("role_id") and timer.get("mode", "") != "silent":
+                        plan.event_creates.append((context_id_str, timer["id"], guild, timer["label"], next_time, timer.get("event_duration", 900)))
+                
+                timers_to_keep.append(timer)
+        
+        if guild_changed:
+            timers_to_keep.sort(key=lambda x: x["end_epoch"])
+            context_data["timers"] = timers_to_keep
+            plan.changed.add(context_id_str)
+    
+    return plan
 
-    for context_id_str in changed_guilds:
+def _catch_up_line(item: dict) -> str:
+    if item["kind"] == "reminder":
+        return f"⚠️ `{item['label']}` reminder was due {get_interval_str(item['r_sec'])} ago (event <t:{item['end_epoch']}:R>)"
+    return f"⏰ **{item['label']}** ended at <t:{item['end_epoch']}:t>"
+
+async def send_catch_up(dest: tuple[str, int], items: list[dict], plan: CatchUpPlan):
+    """One message per destination: the usual single alert, or a digest if several piled up."""
+    kind, target_id = dest
+    try:
+        if kind == "channel":
+            guild = plan.guilds.get(target_id)
+            target = (guild and guild.get_channel(target_id)) or bot.get_channel(target_id) or await bot.fetch_channel(target_id)
+        else:
+            target = bot.get_user(target_id) or await bot.fetch_user(target_id)
+        if not target: return
+        send = (lambda *a, **kw: channel_alert(target, *a, **kw)) if kind == "channel" else target.send
+        
+        owners = {i["owner_id"] for i in items if i["kind"] == "expiry" and i.get("owner_id")}
+        mentions = " ".join(f"<@{o}>" for o in owners) if kind == "channel" and owners else None
+        if len(items) == 1:
+            item = items[0]
+            if item["kind"] == "reminder":
+                await send(f"⚠️ **Late Reminder (Bot Restarted):** `{item['label']}` was due {get_interval_str(item['r_sec'])} ago! (Event in {get_interval_str(item['remain'])})")
+            else:
+                embed = discord.Embed(title="⚠️ Missed Alert (Offline)", description=f"**{item['label']}** ended at <t:{item['end_epoch']}:t>.", color=discord.Color.orange())
+                await send(content=mentions, embed=embed)
+        else:
+            lines = [_catch_up_line(i) for i in sorted(items, key=lambda i: i["end_epoch"])]
+            description = ""
+            for n, line in enumerate(lines):
+                if len(description) + len(line) > 3900:
+                    description += f"…and {len(lines) - n} more"
+                    break
+                description += line + "\n"
+            embed = discord.Embed(title=f"⚠️ Missed While Offline ({len(items)})", description=description, color=discord.Color.orange())
+            await send(content=mentions, embed=embed)
+        metrics.CATCHUP_ACTIONS.inc(action="alert", status="ok")
+    except Exception as e:
+        metrics.CATCHUP_ACTIONS.inc(action="alert", status="error")
+        logger.error(f"Failed to send missed alerts to {kind} {target_id}: {e}")
+    finally:
+        metrics.CATCHUP_PENDING.dec(action="alert")
+
+async def recreate_catch_up_event(guild: discord.Guild, label: str, start: int, duration: int) -> int | None:
+    try:
+        evt_id = await create_discord_event(guild, label, start, duration)
+        metrics.CATCHUP_ACTIONS.inc(action="event", status="ok" if evt_id else "error")
+        return evt_id
+    finally:
+        metrics.CATCHUP_PENDING.dec(action="event")
+
+async def run_catch_up(plan: CatchUpPlan):
+    """Carries out a plan with bounded concurrency; new event ids are written back in one save."""
+    metrics.CATCHUP_PENDING.set(len(plan.alerts), action="alert")
+    metrics.CATCHUP_PENDING.set(len(plan.event_creates), action="event")
+    sends = gather_bounded(send_catch_up(dest, items, plan) for dest, items in plan.alerts.items())
+    deletes = gather_bounded(delete_discord_event(g, eid) for g, eid in plan.event_deletes)
+    creates = gather_bounded(recreate_catch_up_event(g, label, start, dur) for _, _, g, label, start, dur in plan.event_creates)
+    _, _, event_ids = await asyncio.gather(sends, deletes, creates)
+    plan.changed |= await link_discord_events(plan.event_creates, event_ids)
+
+async def link_discord_events(jobs: list[tuple], event_ids: list) -> set[str]:
+    """Writes new event ids back by timer id, in one save. Events whose timer changed meanwhile
+    (or that the save couldn't record) are deleted again. Returns the contexts changed."""
+    created = [(job, evt_id) for job, evt_id in zip(jobs, event_ids) if isinstance(evt_id, int)]
+    if not created: return set()
+    linked, stale = set(), []
+    async with db_lock:
+        data = load_data()
+        for (context_id, timer_id, guild, _, start, _), evt_id in created:
+            timers = data.get(context_id, {}).get("timers", [])
+            pos = locate(timers, timer_id)
+            # Edited, deleted or already re-linked while we were creating it
+            if pos is None or timers[pos]["end_epoch"] != start or timers[pos].get("discord_event_id"):
+                stale.append((guild, evt_id))
+                continue
+            timers[pos]["discord_event_id"] = evt_id
+            linked.add(context_id)
         try:
-            g = bot.get_guild(int(context_id_str))
-            async with db_lock:
-                current_data = load_data()
-                ctx_data = current_data.get(context_id_str)
-            if g and ctx_data:
-                await update_dashboard(g, ctx_data)
-        except Exception as e:
-            logger.error(f"Dashboard refresh error in check_missed_events: {e}")
+            save_data(data)
+        except RowConflict as e:
+            logger.warning(f"Couldn't link recreated Discord events: {e}")
+            stale = [(job[2], evt_id) for job, evt_id in created]
+            linked = set()
+    await gather_bounded(delete_discord_event(g, eid) for g, eid in stale)
+    return linked
 
 async def resolve_rps_match(msg: discord.Message, match_id: str, p1_choice: str = None, p2_choice: str = None):
     import random
-    import os
     import asyncio
     import time
     
@@ -2755,13 +3143,12 @@ async def resolve_rps_match(msg: discord.Message, match_id: str, p1_choice: str
     if not p1_choice: p1_choice = random.choice(options)
     if not p2_choice: p2_choice = random.choice(options)
     
-    rolling_path = "assets/rps_roll.gif"
-    if not os.path.exists(rolling_path):
-        return
-        
     embed_rolling = discord.Embed(title="✊ ✋ ✌️ Rock Paper Scissors", description="Evaluating...", color=discord.Color.dark_gray())
+    # Always a fresh upload: the next edit drops this attachment, so its URL can't be reused
+    file_roll = asset_cache.file("rps_roll.gif")
+    if not file_roll:
+        return
     embed_rolling.set_thumbnail(url="attachment://rps_roll.gif")
-    file_roll = discord.File(rolling_path, filename="rps_roll.gif")
     
     try:
         await msg.edit(content=None, embed=embed_rolling, attachments=[file_roll], view=None)
@@ -2840,14 +3227,14 @@ async def resolve_rps_match(msg: discord.Message, match_id: str, p1_choice: str
         
     img_choice = p1_choice if winner_id == p1_id else p2_choice
     if winner_id == "tie": img_choice = p1_choice
-    file_path = f"assets/rps_{img_choice}.png"
+    asset_name = f"rps_{img_choice}.png"
     
     embed_result = discord.Embed(title="✊ ✋ ✌️ Rock Paper Scissors", description=result_text, color=color)
-    if os.path.exists(file_path):
-        file_result = discord.File(file_path, filename="rps.png")
-        embed_result.set_thumbnail(url="attachment://rps.png")
+    files_result = asset_cache.thumbnail(embed_result, asset_name, "rps.png")
+    if files_result is not None:
         try:
-            await msg.edit(content=None, embed=embed_result, attachments=[file_result], view=None)
+            edited = await msg.edit(content=None, embed=embed_result, attachments=files_result, view=None)
+            if files_result: asset_cache.remember(asset_name, edited, "rps.png")
         except:
             pass
     else:
@@ -2908,16 +3295,10 @@ async def rps_slash(interaction: discord.Interaction, target: discord.Member = N
 async def tz_autocomplete(interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
     choices = [app_commands.Choice(name="UTC", value="UTC")]
     
-    # Filter available zones
-    matched = []
-    current_lower = current.lower()
-    for z in zoneinfo.available_timezones():
-        if current_lower in z.lower():
-
-            matched.append(app_commands.Choice(name=z, value=z))
-            
-    matched.sort(key=lambda x: x.name)
-    choices.extend(matched)
+    # Prefix, word and alias matches from the prebuilt index
+    for name, zone in tz_index.get_index().search(current, limit=25):
+        if zone != "UTC":
+            choices.append(app_commands.Choice(name=name, value=zone))
     return choices[:25]
 
 @bot.tree.command(name="set_timezone", description="Set your local timezone for perfect timer creation!")
@@ -2928,6 +3309,7 @@ async def tz_autocomplete(interaction: discord.Interaction, current: str) -> lis
 async def set_timezone_slash(interaction: discord.Interaction, timezone: str):
     success = await set_user_tz_str(interaction.user.id, timezone)
     if success:
+        timezone = tz_index.get_index().resolve(timezone)
         await interaction.response.send_message(f"✅ Your timezone has been secured as **{timezone}**!\n\nWhen you create timers via DM or the Command Menu, I will now assume the time you type belongs to this timezone instead of raw UTC. Easy!", ephemeral=True)
     else:
         await interaction.response.send_message(f"❌ Failed to set timezone. Please type a valid timezone like 'America/New_York' or 'Asia/Kolkata'. You provided: {timezone}", ephemeral=True)
@@ -2938,35 +3320,35 @@ async def set_timezone_slash(interaction: discord.Interaction, timezone: str):
 @app_commands.allowed_contexts(guilds=True, dms=True, private_channels=True)
 @app_commands.allowed_installs(guilds=True, users=True)
 async def show_event_slash(interaction: discord.Interaction, label: str):
-    data = load_data()
     context_id = str(interaction.guild_id) if interaction.guild else str(interaction.user.id)
-    if context_id not in data or "timers" not in data[context_id]:
+    idx = get_timer_index(context_id)
+    if not idx:
         await interaction.response.send_message(f"❌ No active timers found.", ephemeral=True)
         return
         
-    found_timer = None
-    for t in data[context_id]["timers"]:
-        if t['label'].lower() == label.lower():
-            found_timer = t
-            break
+    found_timer = idx.find(label)
             
     if not found_timer:
         await interaction.response.send_message(f"❌ Timer **{label}** not found.", ephemeral=True)
         return
         
-    ts = found_timer['end_epoch']
-    recur = found_timer.get('recurrence_seconds', 0)
-    owner = found_timer.get('owner_id', 'Unknown')
-    role_id = found_timer.get('role_id', '')
-    desc = found_timer.get('description', '')
-    notify = found_timer.get('notify_method', 'channel')
-    reminders = found_timer.get('reminders', [])
+    ts = found_timer.end_epoch
+    recur = found_timer.recurrence_seconds or 0
+    owner = found_timer.owner_id if found_timer.has('owner_id') else 'Unknown'
+    role_id = found_timer.role_id
+    desc = found_timer.description
+    notify = found_timer.notify_str if found_timer.has('notify_method') else 'channel'
+    reminders = found_timer.reminders
     
-    embed = discord.Embed(title=f"📅 Event: {found_timer['label']}", color=discord.Color.blue())
+    embed = discord.Embed(title=f"📅 Event: {found_timer.label}", color=discord.Color.blue())
     embed.add_field(name="Next Occurrence", value=f"<t:{ts}:F>\n(<t:{ts}:R>)", inline=False)
     
     if recur > 0:
-        embed.add_field(name="Recurring", value=f"Every {recur} seconds", inline=True)
+        zone = recurrence.rule_zone(recur, found_timer.recurrence_tz)
+        every = f"Every {get_interval_str(recur)}" + (f" ({zone} time)" if zone else "")
+        embed.add_field(name="Recurring", value=every, inline=True)
+        upcoming = itertools.islice(recurrence.occurrences(ts, recur, zone), 1, 4)
+        embed.add_field(name="Then", value="\n".join(f"<t:{t}:f>" for t in upcoming), inline=True)
     else:
         embed.add_field(name="Recurring", value="No", inline=True)
         
@@ -2990,6 +3372,7 @@ async def show_event_slash(interaction: discord.Interaction, label: str):
 @bot.event
 async def on_message(message):
     if message.author.bot: return
+    remember_member(message.author)
     
     # --- STICKY DASHBOARD LOGIC ---
     if message.guild and message.channel.id in cached_dashboard_channels:
@@ -3005,10 +3388,12 @@ async def on_message(message):
         # Check if the message has "remind" or similar intent (optional but good)
         content_no_mentions = message.content.replace(f'<@{bot.user.id}>', '').strip()
         if content_no_mentions:
+            spec = None
             try:
                 # We can't easily defer an on_message like an interaction, so we send a thinking message
                 msg = await message.reply("⏳ Thinking...")
                 user_tz = get_user_tz_str(message.author.id)
+                spec = SpeculativeContext(message.guild)
                 parsed = await parse_natural_language_groq(content_no_mentions, user_tz)
                 
                 time_str = parsed.get("time_string", "")
@@ -3038,7 +3423,7 @@ async def on_message(message):
                 
                 owner_id = message.author.id
                 
-                await add_timer_internal(message.guild, label, end_epoch, None, notify_method, "smart", recurrence_seconds, None, event_duration, reminders_list, owner_id=owner_id)
+                await add_timer_internal(message.guild, label, end_epoch, None, notify_method, "smart", recurrence_seconds, None, event_duration, reminders_list, owner_id=owner_id, spec=spec)
                 
                 ts = int(end_epoch)
                 embed = discord.Embed(title="✅ Timer Set (NLP)", color=discord.Color.green())
@@ -3053,6 +3438,8 @@ async def on_message(message):
             except Exception as e:
                 logger.error(f"NLP error: {e}")
                 await msg.edit(content=f"❌ An error occurred parsing that.")
+            finally:
+                if spec: spec.discard()
     
     # DM Handlers
     if isinstance(message.channel, discord.DMChannel):
@@ -3066,14 +3453,15 @@ async def on_message(message):
             state = user_cycle_states[message.author.id]
             guild_id = state["guild_id"]
             cycle_name = state["cycle_name"]
+            spec = None
             
             try:
                 msg = await message.channel.send(f"⏳ Processing time for **{cycle_name}**...")
                 
-                # Use Groq to parse the time
+                # Use Groq to parse the time (guild DB snapshot loads meanwhile)
                 user_tz = get_user_tz_str(message.author.id)
+                spec = SpeculativeContext(None) # No name lookups needed here
                 parsed = await parse_natural_language_groq(f"Set {cycle_name} to {message.content}", user_tz)
-                user_tz = get_user_tz_str(message.author.id)
                 time_str = parsed.get("time_string", "")
                 if not time_str: raise ValueError("Could not determine a time.")
                 
@@ -3094,7 +3482,8 @@ async def on_message(message):
                         None, 
                         900, 
                         [], 
-                        owner_id=message.author.id
+                        owner_id=message.author.id,
+                        spec=spec
                     )
                     await msg.edit(content=f"✅ Automatically published **{cycle_name}** to the Server Dashboard!")
                     
@@ -3107,6 +3496,8 @@ async def on_message(message):
                 logger.error(f"Cycle NLP error: {e}")
                 await msg.edit(content="❌ An error occurred parsing that. Try replying again with the time.")
                 return
+            finally:
+                if spec: spec.discard()
         
         # Foundry Handler
         if message.author.id in user_foundry_state:
@@ -3184,19 +3575,19 @@ async def on_message(message):
     await bot.process_commands(message)
 
 # Helper Wrapper for Add Timer (Internal Use)
-async def add_timer_internal(guild, label, end_epoch, role_id, notify, mode, recur, img, dur, rems, owner_id=None, description=None):
+async def add_timer_internal(guild, label, end_epoch, role_id, notify, mode, recur, img, dur, rems, owner_id=None, description=None, spec=None):
     # Mock Interaction for reusable logic? Hard to mock.
     # Better: access data directly.
     evt_id = await create_discord_event(guild, label, end_epoch, dur, description=description)
     
     async with db_lock:
-        data = load_data()
+        data = await spec.data_for_update() if spec else load_data()
         gid = str(guild.id)
         if gid not in data: return
         if "timers" not in data[gid]: data[gid]["timers"] = []
         
         nt = {
-            "label": label, "end_epoch": end_epoch, "start_epoch": int(time.time()),
+            "id": new_timer_id(), "label": label, "end_epoch": end_epoch, "start_epoch": int(time.time()),
             "owner_id": owner_id or bot.user.id, "role_id": role_id, "notify_method": notify,
             "mode": mode, "recurrence_seconds": recur, "discord_event_id": evt_id,
             "event_duration": dur, "reminders": rems, "sent_reminders": [],
@@ -3208,16 +3599,379 @@ async def add_timer_internal(guild, label, end_epoch, role_id, notify, mode, rec
         
     await update_dashboard(guild, data[gid], resend=True)
 
+# --- Memory Accounting ---
+allocation_tracker = AllocationTracker()
+
+async def memory_report(top: int = 15) -> dict:
+    """RSS, discord.py caches, our in-process state and the tracemalloc diff since the last report."""
+    state = {
+        "user_setup_state": len(user_setup_state),
+        "user_foundry_state": len(user_foundry_state),
+        "user_cycle_states": len(user_cycle_states),
+        "active_targeted_rps": len(active_targeted_rps),
+        "sticky_tasks": len(sticky_tasks),
+        "cached_dashboard_channels": len(cached_dashboard_channels),
+        "guild_name_indexes": len(guild_indexes),
+        "member_lru": len(member_lru),
+        "timer_index_contexts": len(timer_index.contexts),
+        "user_tz_cache": len(user_tz_cache or {}),
+        "tz_zone_cache": tz_index.get_zone.cache_info().currsize,
+        "asyncio_tasks": len(asyncio.all_tasks()),
+    }
+    return {
+        "rss_bytes": rss_bytes(),
+        "discord_cache": discord_cache_sizes(bot),
+        "state": state,
+        # Snapshot + compare can take a while on a big heap, keep it off the loop
+        "tracemalloc": await asyncio.to_thread(allocation_tracker.diff, top),
+    }
+
+@bot.command(name="memstats")
+@commands.has_permissions(administrator=True)
+async def memstats_cmd(ctx):
+    """Admin command: memory usage summary"""
+    report = await memory_report(10)
+    lines = [f"**RSS:** {format_bytes(report['rss_bytes'])}"]
+    lines.append("**Discord cache:** " + ", ".join(f"{k} {v}" for k, v in report["discord_cache"].items()))
+    lines.append("**State:** " + ", ".join(f"{k} {v}" for k, v in report["state"].items()))
+    tm = report["tracemalloc"]
+    if tm.get("note"):
+        lines.append(f"**tracemalloc:** {tm['note']}")
+    else:
+        lines.append(f"**tracemalloc:** {format_bytes(tm['traced_bytes'])} traced, peak {format_bytes(tm['peak_traced_bytes'])}")
+        for row in tm["top"]:
+            lines.append(f"`{format_bytes(row['size_diff']):>10}` {os.path.basename(row['site'])} ({row['count_diff']:+d} blocks)")
+    await ctx.send("\n".join(lines)[:2000])
+
+@bot.command(name="fanout")
+@commands.has_permissions(administrator=True)
+async def fanout_cmd(ctx):
+    """Admin command: recent role DM fan-outs and their delivery"""
+    lines = [f"**DM queue:** {dm_fanout.queue.qsize()} pending"]
+    for batch in reversed(dm_fanout.batches):
+        b = batch.summary()
+        state = "done" if batch.finished else ("sending" if b["resolved"] else "resolving members")
+        lines.append(f"`{b['label'][:40]}` {b['sent']}/{b['recipients']} sent, {b['failed']} failed, {b['pending']} pending ({state}, {b['seconds']}s)")
+    if len(lines) == 1: lines.append("No role fan-outs yet.")
+    await ctx.send("\n".join(lines)[:2000])
+
+# --- Readiness / Liveness ---
+# Thresholds in seconds (backlog in alerts), overridable per deployment
+READY_MAX_TICK_AGE = float(os.environ.get("READY_MAX_TICK_AGE", 30))
+READY_MAX_BACKLOG = int(os.environ.get("READY_MAX_BACKLOG", 200))
+READY_STORAGE_PROBE_INTERVAL = float(os.environ.get("READY_STORAGE_PROBE_INTERVAL", 15))
+LIVE_MAX_TICK_AGE = float(os.environ.get("LIVE_MAX_TICK_AGE", 120))
+LIVE_STARTUP_GRACE = float(os.environ.get("LIVE_STARTUP_GRACE", 300))
+LIVE_MAX_GATEWAY_DOWN = float(os.environ.get("LIVE_MAX_GATEWAY_DOWN", 600))
+
+process_started_at = time.time()
+last_tick_ok_at: float | None = None # Wall time of the last check_timers pass that finished without raising
+gateway_down_since: float | None = process_started_at
+alerts_in_flight = 0 # Alert sends handed to the loop but not yet delivered
+storage_probe: tuple[float, bool] = (0.0, False) # (checked_at, writable)
+
+def tick_age() -> float | None:
+    return time.time() - last_tick_ok_at if last_tick_ok_at else None
+
+async def readiness_report() -> dict:
+    """Ready = gateway up, scheduler ticking, storage writable, alert backlog bounded."""
+    global storage_probe
+    now = time.time()
+    if now - storage_probe[0] > READY_STORAGE_PROBE_INTERVAL:
+        try: writable = await asyncio.wait_for(asyncio.to_thread(storage_writable), timeout=5)
+        except asyncio.TimeoutError: writable = False
+        storage_probe = (now, writable)
+    age = tick_age()
+    checks = {
+        "gateway": bot.is_ready() and not bot.is_closed() and gateway_down_since is None,
+        "scheduler": age is not None and age <= READY_MAX_TICK_AGE,
+        "storage": storage_probe[1],
+        "backlog": alerts_in_flight <= READY_MAX_BACKLOG,
+    }
+    return {
+        "ready": all(checks.values()), "checks": checks,
+        "tick_age_seconds": age, "backlog": alerts_in_flight,
+        "gateway_latency_seconds": bot.latency if math.isfinite(bot.latency) else None,
+    }
+
+def liveness_report() -> dict:
+    """Live unless alerts are actually at risk: the scheduler died or stalled, or the gateway stayed down."""
+    now = time.time()
+    problems = []
+    if check_timers.failed() or (last_tick_ok_at and not check_timers.is_running()):
+        problems.append("scheduler task stopped")
+    if last_tick_ok_at is None:
+        if now - process_started_at > LIVE_STARTUP_GRACE: problems.append("no scheduler tick since startup")
+    elif now - last_tick_ok_at > LIVE_MAX_TICK_AGE:
+        problems.append("scheduler tick too old")
+    if gateway_down_since and now - gateway_down_since > LIVE_MAX_GATEWAY_DOWN:
+        problems.append("gateway down too long")
+    return {"live": not problems, "problems": problems, "tick_age_seconds": tick_age(), "uptime_seconds": now - process_started_at}
+
+@bot.event
+async def on_connect():
+    global gateway_down_since
+    gateway_down_since = None
+
+@bot.event
+async def on_resumed():
+    global gateway_down_since
+    gateway_down_since = None
+
+@bot.event
+async def on_disconnect():
+    global gateway_down_since
+    if gateway_down_since is None: gateway_down_since = time.time()
+
 # --- Loop ---
+def register_queue_gauges():
+    metrics.QUEUE_DEPTH.set_function(lambda: len(asyncio.all_tasks()), queue="asyncio_tasks")
+    metrics.QUEUE_DEPTH.set_function(lambda: len(sticky_tasks), queue="sticky_dashboard")
+    metrics.QUEUE_DEPTH.set_function(lambda: sum(len(ops) for ops in guild_index_backlog.values()), queue="name_index_backlog")
+    metrics.QUEUE_DEPTH.set_function(lambda: len(user_setup_state) + len(user_foundry_state) + len(user_cycle_states), queue="dm_conversations")
+    metrics.QUEUE_DEPTH.set_function(lambda: 1 if db_lock.locked() else 0, queue="db_lock_held")
+    metrics.QUEUE_DEPTH.set_function(lambda: alerts_in_flight, queue="alerts_in_flight")
+    metrics.QUEUE_DEPTH.set_function(lambda: dm_fanout.queue.qsize(), queue="dm_fanout")
+    metrics.QUEUE_DEPTH.set_function(lambda: len(prearmed), queue="prearmed_alerts")
+    metrics.TICK_AGE.set_function(lambda: tick_age() or 0)
+
+async def send_alert(send, kind: str, target_epoch: float) -> bool:
+    """Awaits an alert send and records how late it landed. False if it failed."""
+    global alerts_in_flight
+    alerts_in_flight += 1
+    try:
+        await send
+    except Exception as e:
+        metrics.ALERTS_FAILED.inc(kind=kind)
+        logger.error(f"Alert send failed ({kind}): {e}")
+        return False
+    finally:
+        alerts_in_flight -= 1
+    metrics.TIMERS_FIRED.inc(kind=kind)
+    metrics.ALERT_LATENCY.observe(max(0.0, time.time() - target_epoch), kind=kind)
+    return True
+
+# ALERT_DELIVERY=webhook: channel alerts go out through a per-channel webhook, off the bot token's rate limits
+webhook_pool = WebhookPool(bot) if os.getenv("ALERT_DELIVERY", "").lower() == "webhook" else None
+
+def channel_alert(channel, content: str | None = None, **kwargs):
+    """Send coroutine for a guild-channel alert (webhook pool if enabled, else the bot user)."""
+    if webhook_pool: return webhook_pool.send(channel, content, **kwargs)
+    return channel.send(content, **kwargs)
+
+def outbox_entry(context_id: str, key: str, kind: str, due: float, content: str, **target) -> dict:
+    """Outbox row for one alert. target: channel_id or user_id (+ fallback_user_id/fallback_content)."""
+    return {"key": key, "kind": kind, "due": due, "context_id": context_id, "payload": {"content": content, **target}}
+
+async def deliver_outbox(row: dict):
+    """Sends one outbox alert; raises if it didn't land (the worker decides whether to retry)."""
+    p = row["payload"]
+    nonce = nonce_for(row["key"])
+    user_id, content = p.get("user_id"), p["content"]
+    channel = row.get("channel") # Pre-armed alerts arrive with their channel already resolved
+    if p.get("channel_id"):
+        try:
+            channel = channel or bot.get_channel(p["channel_id"]) or await bot.fetch_channel(p["channel_id"])
+            if isinstance(channel, discord.abc.GuildChannel): await channel_alert(channel, content, nonce=nonce)
+            else: await channel.send(content, nonce=nonce)
+            return
+        except Exception as e:
+            # DM "Chat" mode: the group chat may be gone, the user isn't
+            if not p.get("fallback_user_id"): raise
+            logger.warning(f"Failed to share in chat ({p['channel_id']}): {e}. Falling back to DM.")
+            user_id, content, channel = p["fallback_user_id"], p["fallback_content"], None
+    channel = channel or bot.get_user(user_id) or await bot.fetch_user(user_id)
+    await channel.send(content, nonce=nonce)
+
+# Reminders / expiry alerts: queued in the DB with the timer change, delivered (and retried) by a worker
+alert_outbox = OutboxWorker(deliver_outbox, concurrency=int(os.getenv("OUTBOX_CONCURRENCY", "8")), scope=ownership.scope)
+
+def alert_channel_id(context_data: dict) -> int | None:
+    return context_data["dashboards"][0].get("channel_id") if context_data.get("dashboards") else context_data.get("dashboard_channel_id")
+
+def render_reminder(context_id: str, context_data: dict, guild, user, timer: dict, r_sec: int, remain: int) -> dict | None:
+    """Outbox entry for an early reminder `remain` seconds before the target (None: nowhere to send it)."""
+    target_epoch = timer.get("override_epoch", timer["end_epoch"])
+    if remain > (r_sec - 30):
+        # Normal Timing (within 30s)
+        if r_sec == 600 and "Foundry Battle" in timer['label']:
+            msg = f"⚠️ **Attention!** `{timer['label']}` in 10 minutes! **Call all troops back and free up the hospital NOW!**"
+        else:
+            msg = f"⚠️ **Reminder:** `{timer['label']}` in {get_interval_str(r_sec)}!"
+    else:
+        # Late Timing (Missed window)
+        msg = f"⚠️ **Late Reminder:** `{timer['label']}` was due {get_interval_str(r_sec)} ago! (Event in {get_interval_str(remain)})"
+    
+    timer_key = timer.get("id") or f"{context_id}:{timer['label']}"
+    key = f"{timer_key}:reminder:{target_epoch}:{r_sec}"
+    if guild:
+        # Fallback: Send to dashboard channel if exists
+        db_ch_id = alert_channel_id(context_data)
+        if db_ch_id and guild.get_channel(db_ch_id):
+            return outbox_entry(context_id, key, "reminder", target_epoch - r_sec, msg, channel_id=db_ch_id)
+    elif user:
+        return outbox_entry(context_id, key, "reminder", target_epoch - r_sec, msg, user_id=user.id)
+    return None
+
+def render_expiry(context_id: str, context_data: dict, guild, user, timer: dict) -> dict | None:
+    """Outbox entry for the "Timer Ended" alert (None: nowhere to send it)."""
+    target_epoch = timer.get("override_epoch", timer["end_epoch"])
+    lbl = timer['label']
+    notify = timer.get('notify_method', 'Silent')
+    role_id = timer.get('role_id')
+    msg = f"⏰ **Timer Ended:** {lbl}"
+    timer_key = timer.get("id") or f"{context_id}:{lbl}"
+    key = f"{timer_key}:expiry:{target_epoch}"
+    
+    if guild:
+        # Find Channel: Dashboard Channel
+        db_ch_id = alert_channel_id(context_data)
+        if not (db_ch_id and guild.get_channel(db_ch_id)): return None
+        content = msg
+        # Always ping at expiry
+        if ("Ping Role" in notify or "Both" in notify) and role_id:
+             content += f" <@&{role_id}>"
+        elif "everyone" in notify:
+             content += " @everyone"
+        return outbox_entry(context_id, key, "expiry", target_epoch, content, channel_id=db_ch_id)
+    if user:
+        # DM Context
+        if "Chat" in notify:
+            # Try to send to the dashboard channel (Group DM or DM), falling back to the user with an explanation
+            db_ch_id = alert_channel_id(context_data)
+            fallback = f"{msg}\n*(Note: I couldn't post in the group chat, so I sent this to you privately.)*"
+            if not db_ch_id: return outbox_entry(context_id, key, "expiry", target_epoch, fallback, user_id=user.id)
+            return outbox_entry(context_id, key, "expiry", target_epoch, msg, channel_id=db_ch_id, fallback_user_id=user.id, fallback_content=fallback)
+        # Default / Private
+        return outbox_entry(context_id, key, "expiry", target_epoch, msg, user_id=user.id)
+    return None
+
+# --- Pre-armed Alerts ---
+# Alerts due within PREARM_SECONDS are rendered and their channel resolved (permissions checked, DM channel
+# opened, webhook provisioned) ahead of time, then fired by a loop timer at the deadline instead of the next pass
+PREARM_SECONDS = float(os.getenv("PREARM_SECONDS", "30"))
+PREARM_LEASE = 60 # A claimed row the bot never got to (crash) goes to the outbox worker this long after its deadline
+
+def armed_signature(timer: dict) -> tuple:
+    """What the rendered alert depends on; a timer a user edited since arming no longer matches.
+    (The pass's own bookkeeping, sent_reminders / expiry / recurrence, is covered by confirm().)"""
+    return (timer.get("label"), timer.get("override_epoch", timer.get("end_epoch")), timer.get("notify_method"), timer.get("role_id"))
+
+async def release_armed(alert: ArmedAlert, reason: str):
+    """Hands a claimed row to the outbox worker (sent on its next drain)."""
+    await asyncio.to_thread(update_outbox, [(alert.key, "pending", 0, time.time(), None, reason)])
+    alert_outbox.wake()
+
+async def resolve_armed(alert: ArmedAlert, guild: discord.Guild | None):
+    """Resolves the alert's channel and claims its outbox row, so that at the deadline only the send is left."""
+    p = alert.entry["payload"]
+    try:
+        if p.get("channel_id") and guild:
+            channel = guild.get_channel(p["channel_id"])
+            perms = channel.permissions_for(guild.me)
+            if not (perms.view_channel and perms.send_messages):
+                # Leave it to the scheduler pass, which records the failure
+                PREARMED.inc(result="forbidden")
+                logger.warning(f"Can't post alert {alert.key} in #{channel.name} ({guild.name}): missing Send Messages")
+                return
+            role_id = alert.entry["payload"]["content"].partition("<@&")[2].rstrip(">")
+            role = guild.get_role(int(role_id)) if role_id.isdigit() else None
+            if role and not role.mentionable and not perms.mention_everyone:
+                logger.warning(f"Alert {alert.key} in {guild.name} will not ping @{role.name} (not mentionable, no Mention Everyone)")
+            if webhook_pool: await webhook_pool.prepare(channel)
+        elif p.get("channel_id"):
+            # Group DMs often need a fetch
+            channel = bot.get_channel(p["channel_id"]) or await bot.fetch_channel(p["channel_id"])
+        else:
+            user = bot.get_user(p["user_id"]) or await bot.fetch_user(p["user_id"])
+            channel = user.dm_channel or await user.create_dm()
+        if not await asyncio.to_thread(claim_outbox_row, alert.entry, PREARM_LEASE):
+            PREARMED.inc(result="taken")
+            return
+    except Exception as e:
+        PREARMED.inc(result="unresolved")
+        logger.warning(f"Could not pre-arm alert {alert.key}: {e}")
+        return
+    if alert.fired:
+        # Claimed after its loop timer went off (only if the claim was very slow): the scheduler
+        # pass's own row for this key was or will be ignored, so the worker must send this one
+        PREARMED.inc(result="released")
+        await release_armed(alert, "Claimed after its deadline")
+        return
+    alert.channel = channel
+
+async def fire_armed(alert: ArmedAlert):
+    if alert.channel is None: return # Not resolved/claimed: the scheduler pass sends it through the outbox
+    if not alert.confirmed:
+        try:
+            idx = get_timer_index(alert.context_id)
+            timer = idx.by_id.get(alert.timer_id) if idx else None
+        except Exception as e:
+            PREARMED.inc(result="released")
+            logger.warning(f"Could not check armed alert {alert.key} ({e}), leaving it to the outbox worker")
+            await release_armed(alert, str(e)[:500])
+            return
+        # The pass confirms every armed alert it takes over before changing the timer,
+        # so an unconfirmed timer that's gone or different was deleted / edited by a user
+        if timer is None or armed_signature(timer.to_dict()) != alert.signature:
+            PREARMED.inc(result="stale")
+            await asyncio.to_thread(update_outbox, [(alert.key, "cancelled", 0, None, None, "Timer edited or deleted before its deadline")])
+            return
+    PREARMED.inc(result="fired")
+    await alert_outbox.deliver_now({**alert.entry, "attempts": 0, "channel": alert.channel})
+
+prearmed = Prearmer(fire_armed, window=PREARM_SECONDS)
+
+def prearm_timer(context_id: str, context_data: dict, guild, user, timer: dict, now: int) -> list[ArmedAlert]:
+    """Arms the timer's reminders / expiry that fall due within the pre-arm window."""
+    if not timer.get("id") or timer.get("type") == "foundry_job": return []
+    target_epoch = timer.get("override_epoch", timer["end_epoch"])
+    sent = timer.get("sent_reminders", [])
+    pending = [(r_sec, target_epoch - r_sec) for r_sec in timer.get("reminders", []) if r_sec not in sent]
+    armed = []
+    for r_sec, deadline in pending + [(None, target_epoch)]:
+        if not now < deadline <= now + prearmed.window: continue
+        if r_sec is None: entry = render_expiry(context_id, context_data, guild, user, timer)
+        else: entry = render_reminder(context_id, context_data, guild, user, timer, r_sec, r_sec)
+        if not entry or entry["key"] in prearmed.armed: continue
+        alert = ArmedAlert(entry, context_id, timer["id"], r_sec, armed_signature(timer))
+        prearmed.arm(alert)
+        armed.append(alert)
+    return armed
+
+# Manager / foundry-lead / role-member DMs: the tick enqueues, a few rate-limited workers open DM channels and send
+dm_fanout = DMFanout(bot, deliver=send_alert, workers=int(os.getenv("DM_FANOUT_WORKERS", "8")), rate=float(os.getenv("DM_FANOUT_RATE", "40")))
+
+last_tick_at: float | None = None
+
 @tasks.loop(seconds=5)
 async def check_timers():
+    global last_tick_at, last_tick_ok_at
+    now = time.monotonic()
+    if last_tick_at is not None:
+        metrics.TICK_LAG.set(max(0.0, now - last_tick_at - check_timers.seconds))
+    last_tick_at = now
+    with metrics.TICK_SECONDS.time():
+        await run_timer_pass()
+    if last_tick_ok_at is None: metrics.STARTUP_FIRST_TICK.set(time.time() - process_started_at)
+    last_tick_ok_at = time.time()
+
+async def run_timer_pass():
     async with db_lock:
         data = load_data()
         current_time = int(time.time())
         changed_guilds = set()
+        outbox = []
+        arming = []
+        # DMs, conversation state and Discord events: only once the save has committed the change
+        # that produced them, so a pass that isn't saved (RowConflict) leaves nothing to redo twice
+        after_save = []
+        event_deletes, event_creates = [], [] # (guild, event id) / (context, timer id, guild, label, start, duration)
         
         for context_id_str, context_data in data.items():
             if "timers" not in context_data: continue
+            # Another shard process schedules it
+            if not ownership.owns(context_id_str, dm=context_kind(context_id_str, context_data) == "dm"): continue
             
             active_timers = []
             expired_timers = []
@@ -3248,13 +4002,9 @@ async def check_timers():
                      # (Same Foundry Logic - uses owner_id so it works in DMs too if lead matches)
                      if timer["end_epoch"] <= current_time:
                          lead_id = timer["owner_id"]
-                         try:
-                             u = await bot.fetch_user(lead_id)
-                             if u:
-                                 asyncio.create_task(u.send(f"👋 **Foundry Assistant here!**\nTime to schedule this Sunday's battle.\n\n**What is the Legion 1 time in UTC?** (Reply with the hour, e.g., `14` or `19`)"))
-                                 user_foundry_state[lead_id] = {"step": "awaiting_l1_time", "guild_id": int(context_id_str)} # Store context
-                         except Exception as e:
-                             logger.error(f"Foundry DM error: {e}")
+                         metrics.TIMERS_DUE.inc(kind="foundry")
+                         after_save.append(functools.partial(user_foundry_state.__setitem__, lead_id, {"step": "awaiting_l1_time", "guild_id": int(context_id_str)})) # Store context
+                         after_save.append(functools.partial(dm_fanout.enqueue, [lead_id], "👋 **Foundry Assistant here!**\nTime to schedule this Sunday's battle.\n\n**What is the Legion 1 time in UTC?** (Reply with the hour, e.g., `14` or `19`)", "foundry", timer["end_epoch"]))
                          timer["end_epoch"] += 1209600
                          timer["start_epoch"] = current_time
                          active_timers.append(timer)
@@ -3275,28 +4025,12 @@ async def check_timers():
                     # If remain <= r_sec, it means we passed the reminder point.
                     # But we only send it if the event hasn't expired (remain > -60 for grace)
                     if remain <= r_sec and remain > -60:
-                         msg = ""
-                         if remain > (r_sec - 30):
-                             # Normal Timing (within 30s)
-                             if r_sec == 600 and "Foundry Battle" in timer['label']:
-                                 msg = f"⚠️ **Attention!** `{timer['label']}` in 10 minutes! **Call all troops back and free up the hospital NOW!**"
-                             else:
-                                 msg = f"⚠️ **Reminder:** `{timer['label']}` in {get_interval_str(r_sec)}!"
-                         else:
-                             # Late Timing (Missed window)
-                             msg = f"⚠️ **Late Reminder:** `{timer['label']}` was due {get_interval_str(r_sec)} ago! (Event in {get_interval_str(remain)})"
-    
-                         try:
-                            if guild:
-                                # Fallback: Send to dashboard channel if exists
-                                db_ch_id = context_data["dashboards"][0].get("channel_id") if context_data.get("dashboards") else context_data.get("dashboard_channel_id")
-                                if db_ch_id:
-                                    ch = guild.get_channel(db_ch_id)
-                                    if ch: asyncio.create_task(ch.send(msg))
-                            elif user:
-                                asyncio.create_task(user.send(msg))
-                         except Exception as e:
-                            logger.error(f"Early reminder send error: {e}")
+                         metrics.TIMERS_DUE.inc(kind="reminder")
+                         # A pre-armed reminder already claimed this key (the outbox ignores the duplicate): make sure it fires
+                         entry = render_reminder(context_id_str, context_data, guild, user, timer, r_sec, remain)
+                         if entry:
+                             prearmed.confirm(entry["key"])
+                             outbox.append(entry)
                          
                          sent.append(r_sec)
                          timer["sent_reminders"] = sent
@@ -3309,47 +4043,27 @@ async def check_timers():
                     expired_timers.append(timer)
                 else:
                     active_timers.append(timer)
+                    # --- Pre-arm whatever falls due before the next passes ---
+                    arming += [(a, guild) for a in prearm_timer(context_id_str, context_data, guild, user, timer, current_time)]
             
             # Process Expired
             for timer in expired_timers:
+                metrics.TIMERS_DUE.inc(kind="expiry")
+                target_epoch = timer.get("override_epoch", timer["end_epoch"])
                 lbl = timer['label']
                 notify = timer.get('notify_method', 'Silent')
-                owner_id = timer.get('owner_id')
                 role_id = timer.get('role_id')
                 
-                msg = f"⏰ **Timer Ended:** {lbl}"
-                
-                # Notification Logic
+                # Notification Logic (a pre-armed alert already claimed its key; the outbox ignores the duplicate)
                 try:
-                    if guild:
-                        # Find Channel: Dashboard Channel
-                        db_ch_id = context_data["dashboards"][0].get("channel_id") if context_data.get("dashboards") else context_data.get("dashboard_channel_id")
-                        channel = guild.get_channel(db_ch_id) if db_ch_id else None
-                        if channel:
-                             content = msg
-                             # Always ping at expiry
-                             if "Ping Role" in notify and role_id:
-                                  content += f" <@&{role_id}>"
-                             elif "everyone" in notify:
-                                  content += " @everyone"
-                             
-                             asyncio.create_task(channel.send(content))
-                    elif user:
-                        # DM Context
-                        if "Chat" in notify:
-                            # Try to send to the dashboard channel (Group DM or DM)
-                            db_ch_id = context_data["dashboards"][0].get("channel_id") if context_data.get("dashboards") else context_data.get("dashboard_channel_id")
-                            try:
-                                # Try fetch if not cached (Group DMs often need fetch)
-                                ch = bot.get_channel(db_ch_id) or await bot.fetch_channel(db_ch_id)
-                                asyncio.create_task(ch.send(msg))
-                            except Exception as e:
-                                logger.warning(f"Failed to share in chat ({db_ch_id}): {e}. Falling back to DM.")
-                                # Fallback to User DM with explanation
-                                asyncio.create_task(user.send(f"{msg}\n*(Note: I couldn't post in the group chat, so I sent this to you privately.)*"))
-                        else:
-                            # Default / Private
-                            asyncio.create_task(user.send(msg))
+                    entry = render_expiry(context_id_str, context_data, guild, user, timer)
+                    if entry:
+                        prearmed.confirm(entry["key"])
+                        outbox.append(entry)
+                    
+                    # "Both": every member of the role gets a DM as well (resolved and sent in the background)
+                    if guild and "Both" in notify and role_id:
+                         after_save.append(functools.partial(dm_fanout.fan_out_roles, guild, [role_id], f"⏰ **Timer Ended:** {lbl} — *{guild.name}*", "role_dm", target_epoch, label=f"{guild.name}: {lbl}"))
                 except Exception as e:
                     logger.error(f"Failed to send expiry alert: {e}")
     
@@ -3359,40 +4073,29 @@ async def check_timers():
                     if "override_epoch" in timer:
                         del timer["override_epoch"]
                         
-                    next_time = timer["end_epoch"] + recur
-                    while next_time <= current_time: next_time += recur
+                    zone = recurrence.rule_zone(recur, timer.get("recurrence_tz"))
+                    next_time = recurrence.next_occurrence(timer["end_epoch"], recur, current_time, zone, min_k=1)
                     timer["end_epoch"] = next_time
                     timer["start_epoch"] = current_time
                     timer["sent_reminders"] = [] # Reset reminders
                     active_timers.append(timer)
                     guild_changed = True
                     
-                    # Re-create Event if Guild
+                    # Re-create Event if Guild (after the save; the new id is linked by timer id)
                     if guild and timer.get("discord_event_id"):
-                         # Fire and forget delete old
-                         asyncio.create_task(delete_discord_event(guild, timer["discord_event_id"]))
-                         dur = timer.get("event_duration", 900)
-                         
+                         event_deletes.append((guild, timer["discord_event_id"]))
+                         timer["discord_event_id"] = None
                          # Only recreate if it has a role ping, as per new rules
                          if timer.get("role_id"):
-                             try:
-                                 # Await is okay here since it's rare, but ideally we'd offload it.
-                                 # We are in db_lock, so it's slightly slow. Let's fire and forget it.
-                                 # Actually we need the new ID. For now, keep await, it's fast.
-                                 new_id = await create_discord_event(guild, timer["label"], timer["end_epoch"], dur)
-                                 timer["discord_event_id"] = new_id
-                             except Exception as e:
-                                 logger.error(f"Failed to recreate Discord Event: {e}")
-                                 timer["discord_event_id"] = None
-                         else:
-                             timer["discord_event_id"] = None
+                             event_creates.append((context_id_str, timer["id"], guild, timer["label"], timer["end_epoch"], timer.get("event_duration", 900)))
     
                 
             context_data["timers"] = active_timers
             if expired_timers and not guild_changed: guild_changed = True # Removal counts as change
     
             # --- Cycle Checks ---
-            cycles = context_data.get("cycles", [])
+            # Skip contexts whose next voting-window DM is still in the future
+            cycles = context_data.get("cycles", []) if cycle_table.due(context_id_str, current_time) else []
             for cycle in cycles:
                 mgr_ids = context_data.get("timing_managers", [])
                 if not mgr_ids: 
@@ -3404,33 +4107,24 @@ async def check_timers():
                 if current_time >= pre_time and not cycle.get('pre_dm_sent', False):
                     cycle['pre_dm_sent'] = True
                     guild_changed = True
-                    for mid in set(mgr_ids):
-                        try:
-                            m = await bot.fetch_user(mid)
-                            asyncio.create_task(m.send(f"🏆 **Reminder:** `{cycle['name']}` voting opens in 24 hours! Don't forget to post the poll."))
-                        except Exception as e:
-                            logger.error(f"Cycle pre-DM error: {e}")
+                    metrics.TIMERS_DUE.inc(len(set(mgr_ids)), kind="cycle")
+                    after_save.append(functools.partial(dm_fanout.enqueue, mgr_ids, f"🏆 **Reminder:** `{cycle['name']}` voting opens in 24 hours! Don't forget to post the poll.", "cycle", pre_time))
                 
                 # Step 2: Post-Voting (start_epoch + duration_sec)
                 post_time = cycle['start_epoch'] + cycle['duration_sec']
                 if current_time >= post_time and not cycle.get('post_dm_sent', False):
                     cycle['post_dm_sent'] = True
                     guild_changed = True
+                    metrics.TIMERS_DUE.inc(len(set(mgr_ids)), kind="cycle")
                     
-                    for mid in set(mgr_ids):
-                        try:
-                            m = await bot.fetch_user(mid)
-                            asyncio.create_task(m.send(f"🗳️ Voting has ended for `{cycle['name']}`!\n\n**What time are we running the event?**\n*(Reply here, e.g. \"Set {cycle['name']} for Thursday 14:00 UTC\")*"))
-                            if guild: user_cycle_states[mid] = {"guild_id": guild.id, "cycle_name": cycle['name']}
-                        except Exception as e:
-                            logger.error(f"Cycle post-DM error: {e}")
+                    if guild:
+                        for mid in set(mgr_ids): after_save.append(functools.partial(user_cycle_states.__setitem__, mid, {"guild_id": guild.id, "cycle_name": cycle['name']}))
+                    after_save.append(functools.partial(dm_fanout.enqueue, mgr_ids, f"🗳️ Voting has ended for `{cycle['name']}`!\n\n**What time are we running the event?**\n*(Reply here, e.g. \"Set {cycle['name']} for Thursday 14:00 UTC\")*", "cycle", post_time))
                         
                     # Move to next cycle
                     if cycle['interval_sec'] > 0:
                         # Catch up if bot was offline
-                        while current_time >= (cycle['start_epoch'] + cycle['interval_sec']):
-                             cycle['start_epoch'] += cycle['interval_sec']
-                        cycle['start_epoch'] += cycle['interval_sec']
+                        cycle['start_epoch'] = recurrence.next_occurrence(cycle['start_epoch'], cycle['interval_sec'], current_time, min_k=1)
                         cycle['pre_dm_sent'] = False
                         cycle['post_dm_sent'] = False
             
@@ -3438,7 +4132,30 @@ async def check_timers():
                 changed_guilds.add(context_id_str)
     
         if changed_guilds:
-            save_data(data)
+            # Alerts are committed with the timer changes that consumed them
+            try:
+                save_data(data, outbox=outbox)
+            except RowConflict as e:
+                # Nothing was written and nothing was sent: the next pass reloads and redoes this one
+                logger.warning(f"Timer pass not saved: {e}")
+                changed_guilds, outbox, after_save, event_deletes, event_creates = set(), [], [], [], []
+            if outbox: alert_outbox.wake()
+            for effect in after_save:
+                try: effect()
+                except Exception as e: logger.error(f"Timer pass follow-up failed: {e}")
+
+    # Resolve newly armed alerts in the background (fetches / DM channel opens don't hold the lock)
+    for alert, g in arming:
+        asyncio.create_task(resolve_armed(alert, g))
+    
+    # Recurring timers' next Discord events, outside the lock
+    if event_deletes or event_creates:
+        _, event_ids = await asyncio.gather(
+            gather_bounded(delete_discord_event(g, eid) for g, eid in event_deletes),
+            gather_bounded(create_discord_event(g, label, start, dur) for _, _, g, label, start, dur in event_creates))
+        for job, result in zip(event_creates, event_ids):
+            if isinstance(result, Exception): logger.error(f"Failed to recreate Discord Event for {job[3]}: {result}")
+        changed_guilds |= await link_discord_events(event_creates, event_ids)
 
     # Refresh Dashboards OUTSIDE the lock to prevent blocking database for other commands!
     for context_id_str in changed_guilds:
@@ -3457,54 +4174,117 @@ async def check_timers():
 async def before_check_timers():
     await bot.wait_until_ready()
 
+# --- Startup Pipeline ---
+# One load, then catch-up plans its work under db_lock while the scheduler is already queued behind it.
+# Network side effects (missed alerts, event recreation, dashboard refreshes, orphan deletes) run with bounded parallelism.
+STARTUP_CONCURRENCY = int(os.getenv("STARTUP_CONCURRENCY", "8"))
+startup_running = False
+
+async def gather_bounded(coros, limit: int = STARTUP_CONCURRENCY) -> list:
+    sem = asyncio.Semaphore(limit)
+    async def run(coro):
+        async with sem: return await coro
+    return await asyncio.gather(*(run(c) for c in coros), return_exceptions=True)
+
+def claim_orphan_events(data: dict) -> list[tuple[discord.Guild, int]]:
+    """Unlinks Discord events of timers without a role ping. Returns the (guild, event_id) pairs to delete."""
+    orphans = []
+    for context_id, ctx_data in data.items():
+        if not isinstance(ctx_data, dict) or "timers" not in ctx_data: continue
+        guild = bot.get_guild(int(context_id)) if context_id.isdigit() else None
+        if not guild: continue
+        for t in ctx_data["timers"]:
+            if t.get("discord_event_id") and not t.get("role_id"):
+                orphans.append((guild, t["discord_event_id"]))
+                t["discord_event_id"] = None
+    return orphans
+
+async def refresh_dashboards(context_ids: set):
+    async with db_lock:
+        current_data = load_data()
+    async def refresh(context_id_str):
+        g = bot.get_guild(int(context_id_str)) if context_id_str.isdigit() else None
+        ctx_data = current_data.get(context_id_str)
+        if g and ctx_data: await update_dashboard(g, ctx_data)
+    for result in await gather_bounded(refresh(cid) for cid in context_ids):
+        if isinstance(result, Exception): logger.error(f"Dashboard refresh error after catch-up: {result}")
+
+async def startup_pipeline():
+    timings = {}
+    phase_start = time.perf_counter()
+    def mark(phase: str):
+        nonlocal phase_start
+        now = time.perf_counter()
+        timings[phase] = now - phase_start
+        metrics.STARTUP_PHASE_SECONDS.set(timings[phase], phase=phase)
+        phase_start = now
+    
+    # Contexts saved before they were stamped with a kind; looked up outside the lock
+    kinds = await classify_contexts(load_data())
+    mark("classify")
+    
+    async with db_lock:
+        data = load_data()
+        classified = [cid for cid, kind in kinds.items() if isinstance(data.get(cid), dict) and not data[cid].get("kind")]
+        for cid in classified: data[cid]["kind"] = kinds[cid]
+        for ctx_data in data.values():
+            if not isinstance(ctx_data, dict): continue
+            for db in ctx_data.get("dashboards", []):
+                if db.get("channel_id"):
+                    cached_dashboard_channels.add(db["channel_id"])
+        mark("load")
+        
+        # The first pass waits on db_lock, so it sees catch-up's result rather than racing it
+        if not check_timers.is_running(): check_timers.start()
+        
+        orphans = claim_orphan_events(data)
+        plan = plan_missed_events(data)
+        if plan.changed or orphans or classified:
+            save_data(data)
+        mark("catch_up_plan")
+    
+    logger.info(f"Catch-up: {sum(len(v) for v in plan.alerts.values())} missed alerts to {len(plan.alerts)} destinations, {len(plan.event_creates)} events to recreate")
+    await asyncio.gather(
+        run_catch_up(plan),
+        gather_bounded(delete_discord_event(g, eid) for g, eid in orphans),
+    )
+    if orphans: logger.info(f"Deleted {len(orphans)} Discord Events without a role ping.")
+    mark("catch_up")
+    
+    await refresh_dashboards(plan.changed)
+    mark("dashboards")
+    
+    logger.info("Startup pipeline: " + ", ".join(f"{k} {v:.2f}s" for k, v in timings.items()) + f" (total {sum(timings.values()):.2f}s)")
+
 @bot.event
 async def on_ready():
+    global startup_running
     logger.info(f"Chrono Cloudy v45 ONLINE as {bot.user}")
     
-    # Only sync if not already done recently or if needed
-    # (setup_hook already does this, but on_ready is a safety net)
+    # setup_hook already does this, on_ready is a safety net if that attempt failed
     if not hasattr(bot, 'commands_synced'):
         try:
-            synced = await bot.tree.sync()
-            logger.info(f"✅ Auto-Synced {len(synced)} Global Commands")
-            bot.commands_synced = True
+            await sync_commands_if_changed()
         except Exception as e:
             logger.error(f"❌ Auto-Sync Failed: {e}")
 
     bot.add_view(DashboardView())
-    await check_missed_events()
     
-    # Preload cached dashboard channels
-    data = load_data()
-    for ctx_data in data.values():
-        for db in ctx_data.get("dashboards", []):
-            if db.get("channel_id"):
-                cached_dashboard_channels.add(db["channel_id"])
+    # Partition by the shards actually running here (AutoShardedBot may have picked the count itself)
+    if SHARDED:
+        ownership.update(bot.shard_count, bot.shard_ids)
+        logger.info(f"Scheduling {ownership}")
     
-    # Cleanup Discord Events without Role Pings
-    logger.info("Cleaning up Discord Scheduled Events without Role Pings...")
-    data = load_data()
-    data_changed = False
-    for context_id, ctx_data in data.items():
-        if "timers" in ctx_data:
-            guild = bot.get_guild(int(context_id)) if context_id.isdigit() else None
-            if not guild: continue
-            
-            for t in ctx_data["timers"]:
-                if t.get("discord_event_id") and not t.get("role_id"):
-                    try:
-                        await delete_discord_event(guild, t["discord_event_id"])
-                        logger.info(f"Deleted Discord Event for {t['label']} because it has no role ping.")
-                    except: pass
-                    t["discord_event_id"] = None
-                    data_changed = True
-                    
-    if data_changed:
-        save_data(data)
-        logger.info("Saved data after event cleanup.")
-        
-    if not check_timers.is_running(): check_timers.start()
-
+    # on_ready fires again after a non-resumed reconnect; don't overlap a pipeline still running
+    if startup_running: return
+    startup_running = True
+    try:
+        await startup_pipeline()
+    except Exception as e:
+        logger.error(f"Startup pipeline failed: {e}")
+    finally:
+        startup_running = False
+        if not check_timers.is_running(): check_timers.start()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,79 @@
+import sys
+import threading
+import tracemalloc
+
+def rss_bytes() -> int | None:
+    """Current resident set size. Falls back to peak RSS where /proc isn't available, None on Windows."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"): return int(line.split()[1]) * 1024
+    except OSError: pass
+    try:
+        import resource # Unix only
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024 # Bytes on macOS, KiB elsewhere
+    except Exception:
+        return None
+
+def discord_cache_sizes(bot) -> dict[str, int]:
+    guilds = bot.guilds
+    return {
+        "guilds": len(guilds),
+        "members": sum(len(g.members) for g in guilds),
+        "member_count_reported": sum(g.member_count or 0 for g in guilds),
+        "channels": sum(len(g.channels) for g in guilds),
+        "roles": sum(len(g.roles) for g in guilds),
+        "users": len(bot.users),
+        "private_channels": len(bot.private_channels),
+        "messages": len(bot.cached_messages),
+    }
+
+class AllocationTracker:
+    """tracemalloc snapshots diffed against the previous call.
+
+    The first diff() starts tracing and records a baseline; every later call reports the top
+    allocation sites that grew since the call before it. stop() turns tracing back off.
+    """
+    def __init__(self, frames: int = 1):
+        self.frames = frames
+        self._previous: tracemalloc.Snapshot | None = None
+        self._lock = threading.Lock() # diff() runs in worker threads
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+
+    def diff(self, top: int = 15) -> dict:
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+                self._previous = self._snapshot()
+                return {"tracing": True, "note": "tracemalloc started; call again for a diff", "top": []}
+            current = self._snapshot()
+            previous, self._previous = self._previous, current
+        traced, peak = tracemalloc.get_traced_memory()
+        stats = current.compare_to(previous, "lineno") if previous else current.statistics("lineno")
+        rows = []
+        for stat in stats[:top]:
+            frame = stat.traceback[0]
+            rows.append({
+                "site": f"{frame.filename}:{frame.lineno}",
+                "size_diff": getattr(stat, "size_diff", stat.size),
+                "count_diff": getattr(stat, "count_diff", stat.count),
+                "size": stat.size,
+            })
+        return {"tracing": True, "traced_bytes": traced, "peak_traced_bytes": peak, "top": rows}
+
+    def stop(self):
+        with self._lock:
+            if tracemalloc.is_tracing(): tracemalloc.stop()
+            self._previous = None
+
+def format_bytes(n: int | None) -> str:
+    if n is None: return "n/a"
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(n) < 1024 or unit == "GiB": return f"{n:.1f} {unit}" if unit != "B" else f"{n} B"
+        n /= 1024
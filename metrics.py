@@ -0,0 +1,174 @@
+import abc
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Minimal Prometheus text-format (0.0.4) registry. No client library dependency.
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Alerts are judged in seconds late, not milliseconds
+LATENESS_BUCKETS = (0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra: parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _num(value: float) -> str:
+    if value == float("inf"): return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric(abc.ABC):
+    kind = ""
+    def __init__(self, name: str, doc: str, labelnames: tuple = ()):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock() # Some observations come from worker threads
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    @abc.abstractmethod
+    def samples(self) -> list[str]:
+        """Exposition lines for every label set, without HELP/TYPE."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+class Counter(_Metric):
+    kind = "counter"
+    def __init__(self, name, doc, labelnames=()):
+        super().__init__(name, doc, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock: self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock: items = list(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in items]
+
+class Gauge(_Metric):
+    kind = "gauge"
+    def __init__(self, name, doc, labelnames=()):
+        super().__init__(name, doc, labelnames)
+        self._values: dict[tuple, float] = {}
+        self._functions: dict[tuple, callable] = {}
+
+    def set(self, value: float, **labels):
+        with self._lock: self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock: self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, fn, **labels):
+        """Evaluates fn() at scrape time instead of storing a value."""
+        with self._lock: self._functions[self._key(labels)] = fn
+
+    def samples(self):
+        with self._lock:
+            items = dict(self._values)
+            functions = list(self._functions.items())
+        for key, fn in functions:
+            try: items[key] = float(fn())
+            except Exception: pass
+        return [f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in items.items()]
+
+class Histogram(_Metric):
+    kind = "histogram"
+    def __init__(self, name, doc, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, doc, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple, list] = {} # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            if i < len(self.buckets): series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try: yield
+        finally: self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        with self._lock: items = [(k, list(v)) for k, v in self._series.items()]
+        lines = []
+        for key, series in items:
+            running = 0
+            for bound, count in zip(self.buckets, series):
+                running += count
+                le = 'le="%s"' % _num(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {running}")
+            inf = _labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf} {series[-1]}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_num(series[-2])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {series[-1]}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def _add(self, metric: _Metric) -> _Metric:
+        # Re-registering returns the existing metric, so module reloads don't duplicate series
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, doc, labelnames=()) -> Counter:
+        return self._add(Counter(name, doc, labelnames))
+
+    def gauge(self, name, doc, labelnames=()) -> Gauge:
+        return self._add(Gauge(name, doc, labelnames))
+
+    def histogram(self, name, doc, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, doc, labelnames, buckets))
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in self._metrics.values()) + "\n"
+
+REGISTRY = Registry()
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
+
+# --- Bot Metrics ---
+TICK_SECONDS = histogram("chrono_scheduler_tick_seconds", "Duration of one check_timers pass.")
+TICK_AGE = gauge("chrono_scheduler_last_tick_age_seconds", "Seconds since the last check_timers pass completed.")
+TICK_LAG = gauge("chrono_scheduler_tick_lag_seconds", "How late the last check_timers pass started versus its 5s schedule.")
+TIMERS_DUE = counter("chrono_timers_due_total", "Alerts that came due in a scheduler pass.", ("kind",))
+TIMERS_FIRED = counter("chrono_timers_fired_total", "Alerts delivered to Discord.", ("kind",))
+ALERTS_FAILED = counter("chrono_alerts_failed_total", "Alerts whose Discord send raised.", ("kind",))
+ALERT_LATENCY = histogram("chrono_alert_latency_seconds", "Delivery time minus the alert's target epoch.", ("kind",), LATENESS_BUCKETS)
+DB_SECONDS = histogram("chrono_db_seconds", "Legacy storage load/save latency.", ("op",))
+DB_ROWS = gauge("chrono_db_rows", "Rows in the legacy storage blob as of the last load/save.", ("kind",))
+REST_SECONDS = histogram("chrono_discord_rest_seconds", "Discord REST request latency (including rate-limit waits).", ("method", "route"))
+REST_ERRORS = counter("chrono_discord_rest_errors_total", "Discord REST requests that failed.", ("method", "route", "status"))
+GROQ_SECONDS = histogram("chrono_groq_seconds", "Groq natural-language parse latency.", buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0))
+GROQ_ERRORS = counter("chrono_groq_errors_total", "Groq parse failures.", ("reason",))
+QUEUE_DEPTH = gauge("chrono_queue_depth", "Pending work items per in-process queue.", ("queue",))
+LOOP_LAG = histogram("chrono_event_loop_lag_seconds", "Event-loop scheduling delay, sampled continuously.", buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0))
+LOOP_LAG_LAST = gauge("chrono_event_loop_lag_last_seconds", "Most recent event-loop lag sample.")
+STARTUP_PHASE_SECONDS = gauge("chrono_startup_phase_seconds", "Duration of each startup pipeline phase (last run).", ("phase",))
+STARTUP_FIRST_TICK = gauge("chrono_startup_first_tick_seconds", "Process start to the first completed scheduler pass.")
+CATCHUP_PENDING = gauge("chrono_catchup_pending", "Catch-up work still outstanding after a restart (alert digests, event recreations).", ("action",))
+CATCHUP_ACTIONS = counter("chrono_catchup_actions_total", "Catch-up alert digests / event recreations carried out.", ("action", "status"))
@@ -0,0 +1,150 @@
+import bisect
+from collections import defaultdict
+
+# Substring queries shorter than this fall back to prefix lookups (bigram postings would be huge).
+NGRAM = 3
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+class NameIndex:
+    """Trigram + sorted-prefix index over the lowercased names of objects keyed by id.
+
+    Each key can carry several names (e.g. username and display name). Matches are ranked:
+    exact name > name prefix > word prefix > substring, shorter names first.
+    """
+    def __init__(self):
+        self._names: dict[int, tuple[str, ...]] = {}
+        self._grams: dict[str, set[int]] = defaultdict(set)
+        self._prefixes: list[tuple[str, int]] = [] # Sorted (name or word, key)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._names
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add(self, key: int, *names: str | None):
+        """Adds or replaces the names stored for key."""
+        if key in self._names: self.remove(key)
+        for entry in self._index(key, names):
+            bisect.insort(self._prefixes, entry)
+
+    def bulk_add(self, items):
+        """Adds many (key, names) pairs with a single sort, for initial builds."""
+        for key, names in items:
+            if key in self._names: self.remove(key)
+            self._prefixes.extend(self._index(key, names))
+        self._prefixes.sort()
+
+    def _index(self, key: int, names) -> list[tuple[str, int]]:
+        lowered = tuple(dict.fromkeys(n.lower() for n in names if n))
+        if not lowered: return []
+        self._names[key] = lowered
+        entries = set()
+        for name in lowered:
+            for gram in _trigrams(name):
+                self._grams[gram].add(key)
+            entries.update((word, key) for word in (name, *name.split()))
+        return list(entries)
+
+    def remove(self, key: int):
+        lowered = self._names.pop(key, None)
+        if not lowered: return
+        entries = set()
+        for name in lowered:
+            for gram in _trigrams(name):
+                postings = self._grams.get(gram)
+                if postings is None: continue
+                postings.discard(key)
+                if not postings: del self._grams[gram]
+            entries.update((word, key) for word in (name, *name.split()))
+        for entry in entries:
+            i = bisect.bisect_left(self._prefixes, entry)
+            if i < len(self._prefixes) and self._prefixes[i] == entry:
+                del self._prefixes[i]
+
+    def _prefix_keys(self, q: str, cap: int) -> dict[int, None]:
+        found = {}
+        i = bisect.bisect_left(self._prefixes, (q,))
+        while i < len(self._prefixes) and len(found) < cap and self._prefixes[i][0].startswith(q):
+            found[self._prefixes[i][1]] = None
+            i += 1
+        return found
+
+    def _substring_keys(self, q: str, cap: int) -> list[int]:
+        postings = sorted((self._grams.get(g, set()) for g in _trigrams(q)), key=len)
+        if not postings or not postings[0]: return []
+        found = postings[0].intersection(*postings[1:]) if len(postings) > 1 else postings[0]
+        # Trigrams can match out of order, confirm the real substring
+        hits = []
+        for k in found:
+            if any(q in n for n in self._names[k]):
+                hits.append(k)
+                if len(hits) >= cap: break
+        return hits
+
+    def search(self, query: str, limit: int = 5) -> list[int]:
+        """Returns up to `limit` keys whose names contain the query, best match first.
+
+        Candidate gathering is capped, so very broad queries stay fast (ranking is then best-effort).
+        """
+        q = query.lower().strip()
+        if not q: return []
+        cap = max(limit * 10, 50)
+        candidates = self._prefix_keys(q, cap)
+        if len(candidates) < cap and len(q) >= NGRAM:
+            candidates.update(dict.fromkeys(self._substring_keys(q, cap - len(candidates))))
+
+        def rank(key: int) -> tuple[int, int]:
+            best = (4, 0)
+            for n in self._names[key]:
+                if n == q: tier = 0
+                elif n.startswith(q): tier = 1
+                elif any(w.startswith(q) for w in n.split()): tier = 2
+                else: tier = 3
+                best = min(best, (tier, len(n)))
+            return best
+
+        return sorted(candidates, key=rank)[:limit]
+
+
+class GuildNameIndex:
+    """Member and role name indexes for one guild. Stores ids only; callers resolve objects."""
+    def __init__(self):
+        self.members = NameIndex()
+        self.roles = NameIndex()
+        self.complete = False # True once built from a fully chunked member list
+
+    @staticmethod
+    def member_names(member) -> tuple:
+        return (member.name, getattr(member, "global_name", None), member.display_name)
+
+    def add_member(self, member):
+        self.members.add(member.id, *self.member_names(member))
+
+    def remove_member(self, member_id: int):
+        self.members.remove(member_id)
+
+    def add_role(self, role):
+        self.roles.add(role.id, role.name)
+
+    def remove_role(self, role_id: int):
+        self.roles.remove(role_id)
+
+    @classmethod
+    def snapshot(cls, guild) -> tuple[list, list, bool]:
+        """Copies the names out of a guild. Cheap; must run on the event loop thread."""
+        roles = [(r.id, (r.name,)) for r in guild.roles]
+        members = [(m.id, cls.member_names(m)) for m in guild.members]
+        return roles, members, bool(getattr(guild, "chunked", True))
+
+    @classmethod
+    def from_snapshot(cls, snapshot: tuple[list, list, bool]) -> "GuildNameIndex":
+        """Builds the index from snapshot(). Heavy; safe to run in a worker thread."""
+        roles, members, complete = snapshot
+        idx = cls()
+        idx.roles.bulk_add(roles)
+        idx.members.bulk_add(members)
+        idx.complete = complete
+        return idx
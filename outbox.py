@@ -0,0 +1,129 @@
+import asyncio
+import hashlib
+import logging
+import time
+
+import discord
+
+import metrics
+from db_turso import fetch_due_outbox, outbox_stats, prune_outbox, update_outbox
+
+logger = logging.getLogger("Chrono")
+
+OUTBOX_PENDING = metrics.gauge("chrono_outbox_pending", "Alerts queued in the outbox and not yet delivered (or given up on).")
+OUTBOX_LAG = metrics.gauge("chrono_outbox_lag_seconds", "Age of the oldest undelivered outbox alert past its due time.")
+OUTBOX_RESULTS = metrics.counter("chrono_outbox_attempts_total", "Outbox delivery attempts by outcome (sent, retry, dead).", ("status",))
+
+RETENTION = 7 * 86400 # Finished rows (and their idempotency keys) are kept this long
+PRUNE_EVERY = 3600
+
+def nonce_for(key: str) -> str:
+    """Message nonce for an outbox key (Discord takes at most 25 chars).
+
+    Best effort only: discord.py sends enforce_nonce with it, so Discord drops a repeat from the
+    bot user for a few minutes, but later retries and webhook sends (which take no nonce) aren't
+    deduplicated. Delivery is at-least-once."""
+    return hashlib.sha1(key.encode()).hexdigest()[:25]
+
+class OutboxWorker:
+    """Drains the alert_outbox table.
+
+    Alerts are written to the outbox in the same transaction as the timer change that
+    produced them, so a crash or a failed send can't lose one: rows stay pending until
+    `deliver(row)` returns. Transient failures retry with exponential backoff; a missing
+    channel/user or missing permissions is final and marks the row dead. A send that takes
+    longer than `timeout` seconds is cancelled and retried like any other transient failure,
+    so one hung request can't hold up the drain.
+
+    Delivery is at-least-once: a send that landed but raised (timeout, lost response) is retried
+    and can post twice. See nonce_for for the little dedupe Discord does.
+    """
+    def __init__(self, deliver, concurrency: int = 8, interval: float = 5.0,
+                 max_attempts: int = 8, batch: int = 50, timeout: float = 30.0, scope=lambda: None):
+        self.deliver = deliver
+        self.scope = scope # -> (shard_count, shard_ids) when other processes drain the rest of the table
+        self.concurrency = concurrency
+        self.interval = interval
+        self.max_attempts = max_attempts
+        self.batch = batch
+        self.timeout = timeout
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._pruned = 0.0
+
+    def start(self):
+        if self._task: return
+        self._task = asyncio.create_task(self._run(), name="alert-outbox")
+
+    def wake(self):
+        """Drain now instead of at the next poll (call after saving new rows)."""
+        self._wake.set()
+
+    @staticmethod
+    def backoff(attempts: int) -> float:
+        return min(5 * 2 ** attempts, 600)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                while await self.drain() == self.batch: pass # Full batch: there may be more
+                await self._housekeeping()
+            except Exception as e:
+                logger.error(f"Outbox drain failed: {e}")
+
+    async def drain(self) -> int:
+        """Attempts every due row once. Returns how many were attempted."""
+        rows = await asyncio.to_thread(fetch_due_outbox, time.time(), self.batch, self.scope())
+        if not rows: return 0
+        sem = asyncio.Semaphore(self.concurrency)
+        async def bounded(row):
+            async with sem:
+                return await self._attempt(row)
+        results = await asyncio.gather(*(bounded(r) for r in rows))
+        await asyncio.to_thread(update_outbox, results)
+        return len(rows)
+
+    async def deliver_now(self, row: dict):
+        """Delivers a row the caller already claimed, skipping the poll. Failures retry as usual."""
+        result = await self._attempt(row)
+        await asyncio.to_thread(update_outbox, [result])
+
+    async def _attempt(self, row: dict) -> tuple:
+        key, kind, attempts = row["key"], row["kind"], row["attempts"] + 1
+        try:
+            await asyncio.wait_for(self.deliver(row), timeout=self.timeout)
+        except (discord.Forbidden, discord.NotFound) as e:
+            metrics.ALERTS_FAILED.inc(kind=kind)
+            OUTBOX_RESULTS.inc(status="dead")
+            logger.error(f"Alert {key} can't be delivered: {e}")
+            return key, "dead", attempts, None, None, str(e)[:500]
+        except Exception as e:
+            metrics.ALERTS_FAILED.inc(kind=kind)
+            error = f"timed out after {self.timeout}s" if isinstance(e, asyncio.TimeoutError) else str(e)
+            if attempts >= self.max_attempts:
+                OUTBOX_RESULTS.inc(status="dead")
+                logger.error(f"Alert {key} failed {attempts} times, giving up: {error}")
+                return key, "dead", attempts, None, None, error[:500]
+            OUTBOX_RESULTS.inc(status="retry")
+            delay = self.backoff(attempts)
+            logger.warning(f"Alert {key} failed ({error}), retrying in {delay}s")
+            return key, "pending", attempts, time.time() + delay, None, error[:500]
+        now = time.time()
+        OUTBOX_RESULTS.inc(status="sent")
+        metrics.TIMERS_FIRED.inc(kind=kind)
+        metrics.ALERT_LATENCY.observe(max(0.0, now - row["due"]), kind=kind)
+        return key, "sent", attempts, None, now, None
+
+    async def _housekeeping(self):
+        pending, oldest = await asyncio.to_thread(outbox_stats, self.scope())
+        now = time.time()
+        OUTBOX_PENDING.set(pending)
+        OUTBOX_LAG.set(max(0.0, now - oldest) if oldest else 0.0)
+        if now - self._pruned >= PRUNE_EVERY:
+            self._pruned = now
+            await asyncio.to_thread(prune_outbox, now - RETENTION)
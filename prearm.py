@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+import metrics
+
+PREARMED = metrics.counter("chrono_prearmed_alerts_total", "Alerts armed ahead of their deadline, by outcome.", ("result",))
+
+class ArmedAlert:
+    """One alert rendered ahead of its deadline. `channel` is set once its target is resolved;
+    `confirmed` once the scheduler pass has taken the timer over (it's due, whatever the timer looks like now)."""
+    __slots__ = ("entry", "deadline", "context_id", "timer_id", "r_sec", "signature", "channel", "handle", "confirmed", "fired")
+    def __init__(self, entry: dict, context_id: str, timer_id: str, r_sec: int | None, signature: tuple):
+        self.entry = entry
+        self.deadline = entry["due"]
+        self.context_id = context_id
+        self.timer_id = timer_id
+        self.r_sec = r_sec # None for the expiry alert
+        self.signature = signature
+        self.channel = None
+        self.handle: asyncio.TimerHandle | None = None
+        self.confirmed = False
+        self.fired = False
+
+    @property
+    def key(self) -> str:
+        return self.entry["key"]
+
+class Prearmer:
+    """Alerts armed up to `window` seconds ahead. Each fires from a loop timer at its deadline,
+    not at the next 5s scheduler pass, with the target already resolved: only the send is left."""
+    def __init__(self, fire, window: float = 30.0):
+        self.fire = fire
+        self.window = window
+        self.armed: dict[str, ArmedAlert] = {} # Until its fire() returns
+        self._tasks: set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self.armed)
+
+    def arm(self, alert: ArmedAlert):
+        loop = asyncio.get_running_loop()
+        alert.handle = loop.call_at(loop.time() + max(0.0, alert.deadline - time.time()), self._due, alert.key)
+        self.armed[alert.key] = alert
+        PREARMED.inc(result="armed")
+
+    def confirm(self, key: str) -> bool:
+        """Called by the scheduler pass for an alert it found due: fire it even though the pass
+        is about to mark the reminder sent / expire or advance the timer."""
+        alert = self.armed.get(key)
+        if alert: alert.confirmed = True
+        return alert is not None
+
+    def _due(self, key: str):
+        alert = self.armed.get(key)
+        if not alert or alert.fired: return
+        alert.fired = True
+        task = asyncio.create_task(self._fire(alert))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _fire(self, alert: ArmedAlert):
+        try:
+            await self.fire(alert)
+        finally:
+            self.armed.pop(alert.key, None)
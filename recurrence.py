@@ -0,0 +1,69 @@
+"""Next-occurrence math for recurring timers.
+
+A timer repeats every `recurrence_seconds` from its `end_epoch`. Whole-day periods can carry a
+`recurrence_tz`, in which case they repeat at the same wall-clock time in that zone, so DST
+shifts the UTC instant instead of the local time. Either way the n-th occurrence is computed
+directly from the anchor (no stepping through missed periods, no accumulated drift).
+"""
+import itertools
+from datetime import datetime, timedelta, timezone, tzinfo
+
+from tz_index import get_zone
+
+DAY = 86400
+
+def rule_zone(period: int, tz_name: str | None) -> tzinfo | None:
+    """Zone for a wall-clock rule, or None if the timer repeats on a fixed UTC interval."""
+    if not tz_name or not period or period <= 0 or period % DAY: return None
+    try: zone = get_zone(tz_name)
+    except ValueError: return None
+    return None if zone is timezone.utc else zone
+
+def rule_zone_name(period: int, tz_name: str | None) -> str | None:
+    """What to store as recurrence_tz for a timer set in `tz_name` (None = plain interval)."""
+    zone = rule_zone(period, tz_name)
+    return str(zone) if zone else None
+
+def occurrence(anchor: int, period: int, k: int, zone: tzinfo | None = None) -> int:
+    """The k-th occurrence after the anchor (k=0 is the anchor itself)."""
+    if zone is None: return anchor + k * period
+    # Aware datetime + timedelta keeps the wall clock; timestamp() then applies that day's offset.
+    # Wall times that don't exist (spring-forward gap) land an hour later, like most calendars.
+    local = datetime.fromtimestamp(anchor, zone) + timedelta(days=k * (period // DAY))
+    return int(local.timestamp())
+
+def _next_k(anchor: int, period: int, after: int, zone: tzinfo | None, inclusive: bool, min_k: int) -> tuple[int, int]:
+    def ok(t: int) -> bool:
+        return t >= after if inclusive else t > after
+    # Exact for fixed intervals; a DST offset is far less than a day, so at most one step off otherwise
+    k = max(min_k, (after - anchor) // period + (0 if inclusive else 1))
+    t = occurrence(anchor, period, k, zone)
+    while k > min_k:
+        prev = occurrence(anchor, period, k - 1, zone)
+        if not ok(prev): break
+        k, t = k - 1, prev
+    while not ok(t):
+        k += 1
+        t = occurrence(anchor, period, k, zone)
+    return k, t
+
+def next_occurrence(anchor: int, period: int, after: int, zone: tzinfo | None = None,
+                    inclusive: bool = False, min_k: int = 0) -> int:
+    """First occurrence later than `after` (or equal, if inclusive), at least min_k periods past the anchor."""
+    return _next_k(anchor, period, after, zone, inclusive, min_k)[1]
+
+def occurrences(anchor: int, period: int, zone: tzinfo | None = None, start: int | None = None):
+    """Lazily yields occurrences from the first one at/after `start` (default: the anchor)."""
+    if period <= 0:
+        if start is None or anchor >= start: yield anchor
+        return
+    first = _next_k(anchor, period, start, zone, True, 0)[0] if start is not None else 0
+    for k in itertools.count(first):
+        yield occurrence(anchor, period, k, zone)
+
+def rrule(period: int) -> str | None:
+    """iCalendar RRULE for whole-day periods (Google Calendar can't express the others)."""
+    if period <= 0 or period % DAY: return None
+    days = period // DAY
+    if days % 7 == 0: return f"RRULE:FREQ=WEEKLY;INTERVAL={days // 7}"
+    return f"RRULE:FREQ=DAILY;INTERVAL={days}"
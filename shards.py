@@ -0,0 +1,57 @@
+"""Which guild / DM contexts this process schedules when the bot is split across shard processes.
+
+Discord routes a guild to shard `(guild_id >> 22) % shard_count`. Guild contexts are owned by the
+process running that shard. Discord delivers every DM interaction and message to shard 0, so DM
+contexts (keyed by user id) are owned by the process running shard 0. Each context is then written
+by the one process that receives its interactions. Global rows (USER_PREFS and friends) are shared by
+every process; the row versions in db_turso catch the writes that race.
+"""
+import os
+
+def shard_for(snowflake: int, shard_count: int) -> int:
+    return (snowflake >> 22) % shard_count
+
+def from_env() -> tuple[int | None, list[int] | None]:
+    """SHARD_COUNT and SHARD_IDS ("0,1" or "0-3"). Raises ValueError on a bad combination."""
+    count = int(os.getenv("SHARD_COUNT", "0")) or None
+    ids = []
+    for part in os.getenv("SHARD_IDS", "").replace(" ", "").split(","):
+        if not part: continue
+        lo, _, hi = part.partition("-")
+        ids.extend(range(int(lo), int(hi or lo) + 1))
+    if ids and not count: raise ValueError("SHARD_IDS needs SHARD_COUNT")
+    if count and any(i >= count for i in ids): raise ValueError(f"SHARD_IDS must be below SHARD_COUNT ({count})")
+    return count, sorted(set(ids)) or None
+
+class ShardOwnership:
+    """The shards this process runs. With shard_ids None (single process) it owns everything."""
+    def __init__(self, shard_count: int | None = None, shard_ids: list[int] | None = None):
+        self.update(shard_count, shard_ids)
+
+    def update(self, shard_count: int | None, shard_ids):
+        self.shard_count = shard_count or 1
+        self.shard_ids = frozenset(shard_ids) if shard_ids is not None and self.shard_count > 1 else None
+
+    @property
+    def partitioned(self) -> bool:
+        return self.shard_ids is not None
+
+    def owns(self, context_id, dm: bool = False) -> bool:
+        if self.shard_ids is None: return True
+        if dm: return self.owns_globals()
+        try: cid = int(context_id)
+        except (TypeError, ValueError): return self.owns_globals()
+        return shard_for(cid, self.shard_count) in self.shard_ids
+
+    def owns_globals(self) -> bool:
+        """Process-wide chores (command sync, shared rows, DM contexts): the process running shard 0."""
+        return self.shard_ids is None or 0 in self.shard_ids
+
+    def scope(self) -> tuple[int, tuple[int, ...]] | None:
+        """(shard_count, shard_ids) for filtering shared tables, or None for everything.
+        Rows owned by shard 0 (DMs, globals) go with shard_ids containing 0."""
+        return None if self.shard_ids is None else (self.shard_count, tuple(sorted(self.shard_ids)))
+
+    def __repr__(self) -> str:
+        if self.shard_ids is None: return f"all contexts ({self.shard_count} shard(s))"
+        return f"shards {sorted(self.shard_ids)} of {self.shard_count}"
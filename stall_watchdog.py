@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+import metrics
+
+logger = logging.getLogger("Chrono")
+
+LOOP_STALLS = metrics.counter("chrono_event_loop_stalls_total", "Event-loop stalls longer than the watchdog threshold.")
+STALL_SECONDS = metrics.histogram("chrono_event_loop_stall_seconds", "Duration of detected event-loop stalls.", buckets=(0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0))
+
+class StallWatchdog:
+    """Measures event-loop lag and captures what the loop thread was running when it stalls.
+
+    A coroutine on the loop beats every `interval`. A daemon thread watches the beats; once the
+    loop has been silent for `threshold` seconds it snapshots the loop thread's stack and the
+    current asyncio task. When the loop wakes up the stall is logged and folded into per-site stats.
+    """
+    def __init__(self, threshold: float = 0.25, interval: float = 0.05, root: str | None = None):
+        self.threshold = threshold
+        self.interval = interval
+        self.root = root or os.path.dirname(os.path.abspath(__file__))
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.loop_thread_id: int | None = None
+        self.last_beat = time.monotonic()
+        self.sites: dict[str, dict] = {} # "file:line in func" -> {count, total, max, handler, stack}
+        self._pending: dict | None = None # Capture for the stall in progress
+        self._lock = threading.Lock()
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        """Must be called from the running loop."""
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        self.last_beat = time.monotonic()
+        self._task = asyncio.create_task(self._beat(), name="stall-watchdog")
+        threading.Thread(target=self._watch, name="stall-watchdog", daemon=True).start()
+
+    async def _beat(self):
+        while True:
+            start = self.loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, self.loop.time() - start - self.interval)
+            self.last_beat = time.monotonic()
+            metrics.LOOP_LAG.observe(lag)
+            metrics.LOOP_LAG_LAST.set(lag)
+            with self._lock:
+                pending, self._pending = self._pending, None
+            if pending: self._record(pending, lag)
+
+    def _watch(self):
+        while True:
+            time.sleep(self.interval)
+            if time.monotonic() - self.last_beat < self.threshold: continue
+            with self._lock:
+                if self._pending: continue
+            capture = self._capture()
+            with self._lock:
+                if self._pending is None: self._pending = capture
+
+    def _capture(self) -> dict:
+        frame = sys._current_frames().get(self.loop_thread_id)
+        stack = traceback.format_stack(frame, limit=25) if frame else []
+        handler = "<callback>"
+        try:
+            task = asyncio.current_task(self.loop)
+            if task:
+                coro = task.get_coro()
+                handler = f"{task.get_name()} ({getattr(coro, '__qualname__', coro)})"
+        except Exception: pass
+        return {"handler": handler, "site": self._site(frame), "stack": "".join(stack)}
+
+    def _site(self, frame) -> str:
+        """Innermost frame from our own code, else the innermost frame."""
+        innermost = None
+        while frame is not None:
+            code = frame.f_code
+            where = f"{os.path.basename(code.co_filename)}:{frame.f_lineno} in {code.co_name}"
+            if innermost is None: innermost = where
+            if code.co_filename.startswith(self.root) and code.co_filename != __file__:
+                return where
+            frame = frame.f_back
+        return innermost or "<unknown>"
+
+    def _record(self, capture: dict, duration: float):
+        LOOP_STALLS.inc()
+        STALL_SECONDS.observe(duration)
+        stats = self.sites.setdefault(capture["site"], {"count": 0, "total": 0.0, "max": 0.0})
+        stats["count"] += 1
+        stats["total"] += duration
+        if duration >= stats["max"]:
+            stats.update(max=duration, handler=capture["handler"], stack=capture["stack"])
+        logger.warning(f"Event loop stalled {duration:.2f}s in {capture['handler']} at {capture['site']}\n{capture['stack']}")
+
+    def report(self, n: int = 10) -> list[dict]:
+        """Top-n blocking sites by total stalled time."""
+        ranked = sorted(self.sites.items(), key=lambda kv: kv[1]["total"], reverse=True)[:n]
+        return [
+            {"site": site, "count": s["count"], "total_seconds": round(s["total"], 3), "max_seconds": round(s["max"], 3),
+             "handler": s.get("handler"), "stack": s.get("stack")}
+            for site, s in ranked
+        ]
@@ -0,0 +1,113 @@
+import importlib.util
+import time
+
+import pytest
+
+import db_turso
+
+def process(name: str):
+    """A fresh copy of the module: its own row state, like another shard process."""
+    spec = importlib.util.spec_from_file_location(name, db_turso.__file__)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path) # chrono_local.db is opened relative to the cwd
+    a, b = process("db_a"), process("db_b")
+    a.init_db()
+    return a, b
+
+GUILD_0, GUILD_1, USER = str(4 << 22), str(5 << 22), str(7 << 22)
+
+def seed(a):
+    data = a.load_legacy_data()
+    data.update({GUILD_0: {"kind": "guild", "timers": []}, GUILD_1: {"kind": "guild", "timers": []},
+                 USER: {"kind": "dm", "timers": []}, "USER_PREFS": {}})
+    assert a.save_legacy_data(data) == {GUILD_0, GUILD_1, USER, "USER_PREFS"}
+
+def test_only_changed_rows_are_written(db):
+    a, _ = db
+    seed(a)
+    data = a.load_legacy_data()
+    data[GUILD_1]["timers"].append({"id": "x"})
+    assert a.save_legacy_data(data) == {GUILD_1}
+    assert a.save_legacy_data(data) == set()
+
+def test_scoped_loads(db):
+    a, b = db
+    seed(a)
+    # Guilds by shard; DM contexts with shard 0; global rows everywhere
+    assert set(b.load_legacy_data((2, (0,)))) == {GUILD_0, USER, "USER_PREFS"}
+    assert set(b.load_legacy_data((2, (1,)))) == {GUILD_1, "USER_PREFS"}
+    assert set(b.load_legacy_data()) == {GUILD_0, GUILD_1, USER, "USER_PREFS"}
+
+def test_stale_save_conflicts_and_writes_nothing(db):
+    a, b = db
+    seed(a)
+    mine, theirs = a.load_legacy_data(), b.load_legacy_data()
+    theirs["USER_PREFS"] = {"1": "Asia/Tokyo"}
+    b.save_legacy_data(theirs)
+    mine["USER_PREFS"] = {"2": "UTC"}
+    mine[GUILD_0]["timers"].append({"id": "x"})
+    with pytest.raises(a.RowConflict):
+        a.save_legacy_data(mine)
+    fresh = a.load_legacy_data()
+    assert fresh["USER_PREFS"] == {"1": "Asia/Tokyo"} and fresh[GUILD_0]["timers"] == []
+
+def test_older_snapshot_in_same_process_conflicts(db):
+    a, _ = db
+    seed(a)
+    old, new = a.load_legacy_data(), a.load_legacy_data()
+    new[GUILD_0]["n"] = 1
+    a.save_legacy_data(new)
+    old[GUILD_0]["n"] = 2
+    with pytest.raises(a.RowConflict):
+        a.save_legacy_data(old)
+
+def test_creating_an_existing_row_conflicts(db):
+    a, b = db
+    seed(a)
+    with pytest.raises(b.RowConflict):
+        b.save_legacy_data({GUILD_0: {"kind": "guild"}})
+
+def test_changed_rows_are_reported(db):
+    a, b = db
+    seed(a)
+    b.load_legacy_data()
+    b.pop_changed_rows()
+    data = a.load_legacy_data()
+    data[GUILD_1]["timers"].append({"id": "x"})
+    a.save_legacy_data(data)
+    b.load_legacy_data()
+    assert b.pop_changed_rows() == {GUILD_1}
+    assert b.pop_changed_rows() == set()
+
+def test_outbox_rows_without_context_go_to_shard_zero(db):
+    a, _ = db
+    conn = a.get_db_connection()
+    a.add_outbox_rows(conn.cursor(), [
+        {"key": "old", "kind": "expiry", "payload": {}, "due": 0.0},
+        {"key": "g1", "kind": "expiry", "payload": {}, "due": 0.0, "context_id": GUILD_1},
+    ])
+    conn.commit()
+    conn.close()
+    now = time.time()
+    assert [r["key"] for r in a.fetch_due_outbox(now, 50, (2, (0,)))] == ["old"]
+    assert [r["key"] for r in a.fetch_due_outbox(now, 50, (2, (1,)))] == ["g1"]
+    assert {r["key"] for r in a.fetch_due_outbox(now, 50)} == {"old", "g1"}
+
+def test_late_load_does_not_roll_back_row_state(db):
+    a, _ = db
+    seed(a)
+    # A worker-thread load that read the row before this save committed, recorded after it
+    before = a.load_legacy_data()
+    data = a.load_legacy_data()
+    data[GUILD_0]["n"] = 1
+    a.save_legacy_data(data)
+    a._note_rows(before.loaded, changed=True)
+    assert a._row_state[GUILD_0] == data.loaded[GUILD_0]
+    a.pop_changed_rows()
+    plain = {GUILD_0: {**data[GUILD_0], "n": 2}}
+    assert a.save_legacy_data(plain) == {GUILD_0} # No spurious RowConflict
@@ -0,0 +1,43 @@
+from game_calendar import DAY, SERIES, WEEK, CycleTable, GameCalendar, cycle_windows
+
+def test_next_after_is_on_the_series_grid():
+    cal = GameCalendar(weeks=4)
+    anchor, period = SERIES["foundry"]
+    for after in (anchor - 1, anchor, anchor + 1, anchor + 10 * period + 5):
+        got = cal.next_after("foundry", after)
+        assert got > after and got - period <= after
+        assert (got - anchor) % period == 0
+
+def test_next_after_tops_up_and_goes_back():
+    cal = GameCalendar(weeks=2)
+    anchor, period = SERIES["sunday"]
+    far = anchor + 100 * WEEK
+    assert cal.next_after("sunday", far) == far + period
+    # Asking about the past rebuilds the table from there
+    assert cal.next_after("sunday", anchor + 1) == anchor + period
+
+def test_refresh_drops_old_instants():
+    cal = GameCalendar(weeks=2)
+    anchor, _ = SERIES["sunday"]
+    cal.refresh(anchor)
+    cal.refresh(anchor + 10 * WEEK)
+    assert cal.table["sunday"][0] >= anchor + 10 * WEEK - DAY
+
+def cycle(start, **sent):
+    return {"start_epoch": start, "duration_sec": 3600, **sent}
+
+def test_cycle_windows():
+    assert cycle_windows(cycle(10 * DAY)) == [(9 * DAY, "pre"), (10 * DAY + 3600, "post")]
+    assert cycle_windows(cycle(10 * DAY, pre_dm_sent=True)) == [(10 * DAY + 3600, "post")]
+    assert cycle_windows(cycle(10 * DAY, pre_dm_sent=True, post_dm_sent=True)) == []
+
+def test_cycle_table():
+    data = {"1": {"cycles": [cycle(10 * DAY), cycle(5 * DAY, pre_dm_sent=True)]}, "2": {"timers": []}, "USER_PREFS": {}}
+    table = CycleTable()
+    table.rebuild(data)
+    assert table.next_due == {"1": 5 * DAY + 3600}
+    assert not table.due("1", 5 * DAY) and table.due("1", 5 * DAY + 3600)
+    assert table.due("2", 0) # Unknown: can't rule it out
+    data["1"]["cycles"] = []
+    table.update(data, {"1"})
+    assert "1" not in table.next_due
@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+
+from name_index import GuildNameIndex, NameIndex
+
+def build() -> NameIndex:
+    idx = NameIndex()
+    idx.bulk_add([
+        (1, ("Alice", "Ali the Great")),
+        (2, ("alicia",)),
+        (3, ("Bob", None)),
+        (4, ("Malice",)),
+        (5, ("Big Al",)),
+    ])
+    return idx
+
+def test_ranking_exact_prefix_word_substring():
+    idx = build()
+    assert idx.search("alice") == [1, 4]
+    assert idx.search("al", limit=10) == [1, 2, 5] # Name prefix (shorter first), then word prefix
+    hits = idx.search("lic", limit=10) # Substring only: shorter names first
+    assert hits[0] == 1 and set(hits) == {1, 2, 4}
+
+def test_case_and_blank_queries():
+    idx = build()
+    assert idx.search("  BOB ") == [3]
+    assert idx.search("") == []
+    assert idx.search("zzz") == []
+
+def test_add_replaces_and_remove_clears():
+    idx = build()
+    idx.add(3, "Robert")
+    assert idx.search("bob") == [] and idx.search("rob") == [3]
+    idx.remove(1)
+    assert 1 not in idx and len(idx) == 4
+    assert idx.search("alice") == [4]
+    assert idx.search("great") == []
+    idx.remove(99) # Unknown keys are ignored
+
+def test_names_without_text_are_not_indexed():
+    idx = NameIndex()
+    idx.add(1, None, "")
+    assert 1 not in idx and len(idx) == 0
+
+def test_guild_snapshot_round_trip():
+    member = SimpleNamespace(id=10, name="carol", global_name="Carol C", display_name="CC")
+    role = SimpleNamespace(id=20, name="Officers")
+    guild = SimpleNamespace(roles=[role], members=[member], chunked=False)
+    idx = GuildNameIndex.from_snapshot(GuildNameIndex.snapshot(guild))
+    assert idx.members.search("carol") == [10] and idx.members.search("cc") == [10]
+    assert idx.roles.search("off") == [20]
+    assert not idx.complete
+    idx.remove_member(10)
+    assert idx.members.search("carol") == []
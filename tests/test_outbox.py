@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+from outbox import OutboxWorker, nonce_for
+
+ROW = {"key": "t1:expiry:c1", "kind": "expiry", "due": 0.0, "attempts": 0}
+
+def attempt(worker: OutboxWorker, row: dict) -> tuple:
+    return asyncio.run(worker._attempt(row))
+
+def worker(deliver, **kwargs) -> OutboxWorker:
+    async def wrapped(row): return deliver(row)
+    return OutboxWorker(wrapped, **kwargs)
+
+@pytest.mark.parametrize("attempts, delay", [(0, 5), (1, 10), (3, 40), (6, 320), (7, 600), (30, 600)])
+def test_backoff_doubles_and_caps(attempts, delay):
+    assert OutboxWorker.backoff(attempts) == delay
+
+def test_sent():
+    key, status, attempts, next_attempt, delivered, error = attempt(worker(lambda row: None), ROW)
+    assert (key, status, attempts, next_attempt, error) == (ROW["key"], "sent", 1, None, None)
+    assert delivered is not None
+
+def fail(row):
+    raise RuntimeError("boom")
+
+def test_transient_failure_retries_with_backoff():
+    _, status, attempts, next_attempt, delivered, error = attempt(worker(fail), {**ROW, "attempts": 2})
+    assert status == "pending" and attempts == 3 and delivered is None and error == "boom"
+    assert next_attempt is not None
+
+def test_gives_up_after_max_attempts():
+    _, status, attempts, next_attempt, _, _ = attempt(worker(fail, max_attempts=3), {**ROW, "attempts": 2})
+    assert status == "dead" and attempts == 3 and next_attempt is None
+
+def test_hung_delivery_times_out_and_retries():
+    async def hang(row): await asyncio.sleep(60)
+    _, status, attempts, next_attempt, delivered, error = attempt(OutboxWorker(hang, timeout=0.01), ROW)
+    assert status == "pending" and attempts == 1 and delivered is None
+    assert next_attempt is not None and error == "timed out after 0.01s"
+
+def test_nonce_is_stable_and_short():
+    assert nonce_for(ROW["key"]) == nonce_for(ROW["key"])
+    assert nonce_for(ROW["key"]) != nonce_for(ROW["key"] + "x")
+    assert len(nonce_for("x" * 500)) == 25
@@ -0,0 +1,73 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from recurrence import DAY, next_occurrence, occurrence, occurrences, rrule, rule_zone, rule_zone_name
+from tz_index import get_zone
+
+def utc(*args) -> int:
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp())
+
+ANCHOR = utc(2026, 3, 1, 12)
+BERLIN = get_zone("Europe/Berlin")
+
+@pytest.mark.parametrize("period, tz, expected", [
+    (DAY, "Europe/Berlin", "Europe/Berlin"),
+    (7 * DAY, "cest", "Europe/Paris"),  # Aliases resolve to their zone
+    (DAY, "UTC", None),                # UTC is a plain interval
+    (3600, "Europe/Berlin", None),     # Only whole days follow the wall clock
+    (DAY, None, None),
+    (DAY, "Not/AZone", None),
+    (0, "Europe/Berlin", None),
+])
+def test_rule_zone_name(period, tz, expected):
+    assert rule_zone_name(period, tz) == expected
+
+def test_fixed_interval_occurrences():
+    assert occurrence(ANCHOR, 3600, 0) == ANCHOR
+    assert occurrence(ANCHOR, 3600, 5) == ANCHOR + 5 * 3600
+
+def test_next_occurrence_fixed():
+    assert next_occurrence(ANCHOR, 3600, ANCHOR) == ANCHOR + 3600
+    assert next_occurrence(ANCHOR, 3600, ANCHOR, inclusive=True) == ANCHOR
+    assert next_occurrence(ANCHOR, 3600, ANCHOR + 1) == ANCHOR + 3600
+    # Far past the anchor: computed directly, still on the grid
+    after = ANCHOR + 1000 * 3600 + 17
+    assert next_occurrence(ANCHOR, 3600, after) == ANCHOR + 1001 * 3600
+    # Before the anchor, min_k keeps it from going back
+    assert next_occurrence(ANCHOR, 3600, ANCHOR - 10 * 3600, min_k=1) == ANCHOR + 3600
+
+def test_wall_clock_rule_keeps_local_time_across_dst():
+    # 09:00 in Berlin, daily; Europe moves to summer time on 2026-03-29
+    anchor = utc(2026, 3, 27, 8) # 09:00 CET
+    zone = rule_zone(DAY, "Europe/Berlin")
+    after_switch = occurrence(anchor, DAY, 3, zone)
+    assert after_switch == utc(2026, 3, 30, 7) # 09:00 CEST
+    assert datetime.fromtimestamp(after_switch, BERLIN).hour == 9
+    # Without the zone the UTC instant stays put and the local time drifts
+    assert datetime.fromtimestamp(occurrence(anchor, DAY, 3), BERLIN).hour == 10
+
+def test_next_occurrence_with_zone_matches_stepping():
+    anchor = utc(2026, 3, 20, 8)
+    zone = rule_zone(DAY, "Europe/Berlin")
+    for after in range(anchor, anchor + 20 * DAY, 7 * 3600):
+        expected = next(t for t in (occurrence(anchor, DAY, k, zone) for k in range(40)) if t > after)
+        assert next_occurrence(anchor, DAY, after, zone) == expected
+
+def test_occurrences_from_start():
+    gen = occurrences(ANCHOR, DAY, start=ANCHOR + DAY + 1)
+    assert [next(gen) for _ in range(3)] == [ANCHOR + 2 * DAY, ANCHOR + 3 * DAY, ANCHOR + 4 * DAY]
+
+def test_occurrences_without_period():
+    assert list(occurrences(ANCHOR, 0)) == [ANCHOR]
+    assert list(occurrences(ANCHOR, 0, start=ANCHOR + 1)) == []
+
+@pytest.mark.parametrize("period, expected", [
+    (DAY, "RRULE:FREQ=DAILY;INTERVAL=1"),
+    (3 * DAY, "RRULE:FREQ=DAILY;INTERVAL=3"),
+    (14 * DAY, "RRULE:FREQ=WEEKLY;INTERVAL=2"),
+    (3600, None),
+    (0, None),
+])
+def test_rrule(period, expected):
+    assert rrule(period) == expected
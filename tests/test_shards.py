@@ -0,0 +1,59 @@
+import pytest
+
+import shards
+from shards import ShardOwnership, shard_for
+
+def snowflake(shard: int, count: int) -> int:
+    return (count * 1000 + shard) << 22
+
+def test_shard_for_matches_discord_routing():
+    assert shard_for(snowflake(3, 4), 4) == 3
+    assert shard_for(81384788765712384, 1) == 0
+
+@pytest.mark.parametrize("env, expected", [
+    ({}, (None, None)),
+    ({"SHARD_COUNT": "4"}, (4, None)),
+    ({"SHARD_COUNT": "4", "SHARD_IDS": "0-1"}, (4, [0, 1])),
+    ({"SHARD_COUNT": "8", "SHARD_IDS": "3, 1,2-3"}, (8, [1, 2, 3])),
+])
+def test_from_env(monkeypatch, env, expected):
+    monkeypatch.delenv("SHARD_COUNT", raising=False)
+    monkeypatch.delenv("SHARD_IDS", raising=False)
+    for key, value in env.items(): monkeypatch.setenv(key, value)
+    assert shards.from_env() == expected
+
+@pytest.mark.parametrize("env", [{"SHARD_IDS": "0"}, {"SHARD_COUNT": "2", "SHARD_IDS": "2"}])
+def test_from_env_rejects_bad_combinations(monkeypatch, env):
+    monkeypatch.delenv("SHARD_COUNT", raising=False)
+    for key, value in env.items(): monkeypatch.setenv(key, value)
+    with pytest.raises(ValueError):
+        shards.from_env()
+
+def test_single_process_owns_everything():
+    own = ShardOwnership()
+    assert not own.partitioned and own.scope() is None
+    assert own.owns(snowflake(1, 2)) and own.owns("USER_PREFS") and own.owns(123, dm=True)
+    assert own.owns_globals()
+    # Every shard in one process is the same thing
+    assert ShardOwnership(4, [0, 1, 2, 3]).partitioned
+    assert not ShardOwnership(1, [0]).partitioned
+
+def test_partitioned_guilds_follow_their_shard():
+    own = ShardOwnership(4, [1, 3])
+    assert own.partitioned and own.scope() == (4, (1, 3))
+    assert own.owns(snowflake(1, 4)) and own.owns(str(snowflake(3, 4)))
+    assert not own.owns(snowflake(0, 4)) and not own.owns(snowflake(2, 4))
+
+def test_dm_contexts_and_globals_belong_to_shard_zero():
+    zero, other = ShardOwnership(4, [0]), ShardOwnership(4, [1, 2, 3])
+    user_id = snowflake(2, 4)
+    assert zero.owns(user_id, dm=True) and not other.owns(user_id, dm=True)
+    assert zero.owns("USER_PREFS") and not other.owns("USER_PREFS")
+    assert zero.owns_globals() and not other.owns_globals()
+
+def test_update_repartitions():
+    own = ShardOwnership()
+    own.update(2, [1])
+    assert own.scope() == (2, (1,))
+    own.update(None, None)
+    assert not own.partitioned
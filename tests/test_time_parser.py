@@ -0,0 +1,63 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from time_parser import parse_duration_string, parse_time_input
+
+NOW = datetime(2026, 3, 4, 10, 30, tzinfo=timezone.utc) # A Wednesday
+
+def utc(*args) -> int:
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp())
+
+@pytest.mark.parametrize("text, seconds", [
+    ("", 0), ("15", 900), ("30m", 1800), ("1h 30m", 5400), ("47h30m", 171000),
+    ("2 days", 172800), ("1d 2h", 93600), (" 10 MINS ", 600),
+])
+def test_durations(text, seconds):
+    assert parse_duration_string(text) == seconds
+
+@pytest.mark.parametrize("text", ["soon", "5 weeks", "1h 5x"])
+def test_bad_durations(text):
+    with pytest.raises(ValueError):
+        parse_duration_string(text)
+
+@pytest.mark.parametrize("text, expected", [
+    ("10m", utc(2026, 3, 4, 10, 40)),
+    ("14:00", utc(2026, 3, 4, 14)),
+    ("14:00 utc", utc(2026, 3, 4, 14)),
+    ("tomorrow 9:15", utc(2026, 3, 5, 9, 15)),
+    ("tomorrow at 9:15", utc(2026, 3, 5, 9, 15)),
+    ("friday 20:00", utc(2026, 3, 6, 20)),
+    ("wed 12:00", utc(2026, 3, 4, 12)),   # Later today
+    ("wed 09:00", utc(2026, 3, 11, 9)),   # Already past: next week
+    ("next wed 12:00", utc(2026, 3, 11, 12)),
+    ("2026-03-10 08:05", utc(2026, 3, 10, 8, 5)),
+    ("10/03/2026 08:05:30", utc(2026, 3, 10, 8, 5, 30)),
+])
+def test_smart_mode(text, expected):
+    assert parse_time_input(text, now=NOW) == expected
+
+@pytest.mark.parametrize("text, date", [("2026-03-10", "2026-03-10"), ("10-03-2026", "2026-03-10"), ("sunday", "2026-03-08")])
+def test_date_only(text, date):
+    assert parse_time_input(text, now=NOW) == ("DATE_ONLY", date)
+
+def test_user_timezone():
+    # 14:00 in Tokyo (UTC+9) is 05:00 UTC
+    assert parse_time_input("14:00", user_tz_str="Asia/Tokyo", now=NOW) == utc(2026, 3, 4, 5)
+    assert parse_time_input("14:00", user_tz_str="jst", now=NOW) == utc(2026, 3, 4, 5)
+    # Unknown zones fall back to UTC
+    assert parse_time_input("14:00", user_tz_str="Mars/Base", now=NOW) == utc(2026, 3, 4, 14)
+
+@pytest.mark.parametrize("text", ["25:00", "2026-02-30 10:00", "whenever"])
+def test_smart_mode_rejects(text):
+    with pytest.raises(ValueError):
+        parse_time_input(text, now=NOW)
+
+def test_restricted_modes():
+    assert parse_time_input("90m", mode="duration", now=NOW) == utc(2026, 3, 4, 12)
+    assert parse_time_input("08:00", mode="utc_tomorrow", now=NOW) == utc(2026, 3, 5, 8)
+    assert parse_time_input("2026-04-01 00:00", mode="utc_custom", now=NOW) == utc(2026, 4, 1)
+    assert parse_time_input("2026-04-01", mode="utc_date_only", now=NOW) == ("DATE_ONLY", "2026-04-01")
+    for text, mode in (("tomorrow", "utc_today"), ("2026-04-01", "utc_custom"), ("14:00", "utc_date_only")):
+        with pytest.raises(ValueError):
+            parse_time_input(text, mode=mode, now=NOW)
@@ -0,0 +1,53 @@
+from array import array
+
+import pytest
+
+from timer_model import FIELDS, Mode, NotifyMethod, Timer
+
+SAMPLE = {
+    "id": "abc123", "label": "Bear Trap", "end_epoch": 1_800_000_000, "start_epoch": 1_799_990_000,
+    "owner_id": 42, "role_id": 7, "notify_method": NotifyMethod.BOTH.value, "mode": Mode.SMART.value,
+    "recurrence_seconds": 86400, "image_url": "https://example.com/x.png", "discord_event_id": 99,
+    "event_duration": 900, "reminders": [600, 300], "sent_reminders": [600], "description": "d",
+    "override_epoch": 1_800_000_060, "type": "timer", "recurrence_tz": "Europe/Berlin",
+}
+
+def test_sample_covers_every_field():
+    assert set(SAMPLE) == set(FIELDS)
+
+def test_round_trip_every_field():
+    t = Timer.from_dict(SAMPLE)
+    assert t.to_dict() == SAMPLE
+    for name in FIELDS:
+        assert t.has(name)
+
+@pytest.mark.parametrize("name", FIELDS)
+def test_single_field_round_trip(name):
+    t = Timer.from_dict({name: SAMPLE[name]})
+    assert t.to_dict() == {name: SAMPLE[name]}
+    # Every slot is readable, present or not
+    for other in FIELDS:
+        getattr(t, other)
+
+def test_absent_fields_read_as_none():
+    t = Timer.from_dict({"label": "x"})
+    assert t.recurrence_tz is None and t.override_epoch is None
+    assert t.target_epoch is None
+
+def test_conversions():
+    t = Timer.from_dict(SAMPLE)
+    assert t.notify_method is NotifyMethod.BOTH
+    assert t.mode is Mode.SMART
+    assert isinstance(t.reminders, array)
+    assert t.target_epoch == SAMPLE["override_epoch"]
+    assert [(r.offset, r.sent) for r in t.reminder_list()] == [(600, True), (300, False)]
+
+def test_unknown_values_kept_raw():
+    row = {"notify_method": "Something Old", "mode": "legacy", "reminders": [1, "x"], "custom": {"a": 1}}
+    t = Timer.from_dict(row)
+    assert t.notify_method == "Something Old"
+    assert t.extra == {"custom": {"a": 1}}
+    assert t.to_dict() == row
+
+def test_constructor_matches_from_dict():
+    assert Timer(**SAMPLE).to_dict() == Timer.from_dict(SAMPLE).to_dict()
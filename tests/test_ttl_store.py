@@ -0,0 +1,83 @@
+import pytest
+
+import ttl_store
+from ttl_store import TTLStore
+
+class Clock:
+    def __init__(self): self.now = 1000.0
+    def monotonic(self): return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = Clock()
+    monkeypatch.setattr(ttl_store, "time", c)
+    return c
+
+def test_expires_after_ttl(clock):
+    store = TTLStore("t_expire", ttl=10)
+    store["a"] = 1
+    clock.now += 9
+    assert store["a"] == 1
+    clock.now += 11
+    assert "a" not in store
+    with pytest.raises(KeyError): store["a"]
+    assert store.get("a") is None
+
+def test_reads_slide_the_deadline(clock):
+    store = TTLStore("t_slide", ttl=10)
+    store["a"] = 1
+    for _ in range(5):
+        clock.now += 8
+        assert store["a"] == 1
+
+def test_fixed_ttl_when_not_sliding(clock):
+    store = TTLStore("t_fixed", ttl=10, sliding=False)
+    store["a"] = 1
+    clock.now += 8
+    assert store["a"] == 1
+    clock.now += 3
+    assert "a" not in store
+
+def test_membership_does_not_refresh(clock):
+    store = TTLStore("t_contains", ttl=10)
+    store["a"] = 1
+    clock.now += 8
+    assert "a" in store
+    clock.now += 3
+    assert "a" not in store
+
+def test_len_and_iter_skip_expired(clock):
+    store = TTLStore("t_len", ttl=10)
+    store["a"] = 1
+    clock.now += 5
+    store["b"] = 2
+    assert len(store) == 2
+    clock.now += 6
+    assert len(store) == 1 and list(store) == ["b"]
+
+def test_size_bound_evicts_least_recently_used(clock):
+    store = TTLStore("t_size", ttl=100, max_size=2)
+    store["a"] = 1
+    store["b"] = 2
+    store["a"] # Now b is the oldest
+    store["c"] = 3
+    assert set(store) == {"a", "c"}
+
+def test_sweep_reclaims_due_entries(clock):
+    store = TTLStore("t_sweep", ttl=10, granularity=1, slots=8)
+    for i in range(5): store[i] = i
+    clock.now += 5
+    store[0] # Touched: refiled on its old slot's sweep, not evicted
+    assert store.sweep() == 0
+    clock.now += 6
+    assert store.sweep() == 4
+    assert list(store._data) == [0]
+    clock.now += 100 # Longer than a full wheel rotation
+    assert store.sweep() == 1
+    assert not store._data
+
+def test_delete(clock):
+    store = TTLStore("t_del", ttl=10)
+    store["a"] = 1
+    del store["a"]
+    assert "a" not in store and store.sweep(clock.now + 60) == 0
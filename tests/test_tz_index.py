@@ -0,0 +1,37 @@
+from datetime import timezone
+
+import pytest
+
+from tz_index import get_index, get_zone
+
+@pytest.mark.parametrize("name, zone", [
+    ("Europe/Berlin", "Europe/Berlin"), ("europe/berlin", "Europe/Berlin"), ("utc", "UTC"),
+    ("PDT", "America/Los_Angeles"), ("new delhi", "Asia/Kolkata"), (" jst ", "Asia/Tokyo"),
+])
+def test_resolve(name, zone):
+    assert get_index().resolve(name) == zone
+
+def test_resolve_unknown():
+    assert get_index().resolve("Mars/Base") is None
+
+def test_search_prefix_word_and_alias():
+    idx = get_index()
+    assert idx.search("europe/ber")[0] == ("Europe/Berlin", "Europe/Berlin")
+    assert ("America/New_York", "America/New_York") in idx.search("new york")
+    assert ("Asia/Tokyo (JST)", "Asia/Tokyo") in idx.search("jst")
+    assert ("Asia/Kolkata (New Delhi)", "Asia/Kolkata") in idx.search("new delhi")
+    assert ("America/New_York (Miami)", "America/New_York") in idx.search("miami")
+    assert ("Asia/Ho_Chi_Minh (Hanoi)", "Asia/Ho_Chi_Minh") in idx.search("hanoi")
+    assert len(idx.search("a", limit=5)) == 5
+
+def test_search_substring():
+    zones = [zone for _, zone in get_index().search("angeles")]
+    assert "America/Los_Angeles" in zones
+
+def test_get_zone():
+    assert get_zone("UTC") is timezone.utc
+    assert str(get_zone("cest")) == "Europe/Paris"
+    with pytest.raises(ValueError):
+        get_zone("Mars/Base")
+    with pytest.raises(ValueError):
+        get_zone("")
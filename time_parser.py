@@ -0,0 +1,153 @@
+import re
+from datetime import datetime, timedelta, timezone, tzinfo
+
+from tz_index import get_zone
+
+# --- Duration Strings ---
+_DURATION_PAIR = re.compile(r"(\d+)\s*([a-z]+)")
+_UNIT_SECONDS = {
+    'm': 60, 'min': 60, 'mins': 60,
+    'h': 3600, 'hr': 3600, 'hour': 3600, 'hours': 3600,
+    'd': 86400, 'day': 86400, 'days': 86400,
+}
+
+def parse_duration_string(input_str: str) -> int:
+    if not input_str: return 0
+    clean_str = input_str.strip().lower()
+
+    # Check for plain number (default to minutes)
+    if clean_str.isdigit():
+        return int(clean_str) * 60
+
+    # Composite Parser (e.g. "47h 30m", "1d 2h")
+    # Finds all pairs of (number, unit)
+    matches = _DURATION_PAIR.findall(clean_str)
+
+    if not matches:
+        # No units found, and wasn't a plain number.
+        raise ValueError(f"Invalid Duration: '{input_str}'. Use '30m', '1h', '1d', or '1h 30m'.")
+
+    total_seconds = 0
+    for val_str, unit in matches:
+        if unit not in _UNIT_SECONDS:
+             raise ValueError(f"Invalid Unit: '{unit}' in '{input_str}'.")
+        total_seconds += int(val_str) * _UNIT_SECONDS[unit]
+
+    return total_seconds
+
+# --- Time Expressions ---
+_WEEKDAYS = {
+    "mon": 0, "monday": 0, "tue": 1, "tues": 1, "tuesday": 1, "wed": 2, "wednesday": 2,
+    "thu": 3, "thur": 3, "thurs": 3, "thursday": 3, "fri": 4, "friday": 4,
+    "sat": 5, "saturday": 5, "sun": 6, "sunday": 6,
+}
+_DAY_WORDS = "|".join(sorted(["today", "tomorrow", "tmrw", *_WEEKDAYS], key=len, reverse=True))
+_CLOCK = r"\d{1,2}:\d{1,2}"
+
+# One pass over the input: every supported shape is an alternative of this single pattern.
+_EXPR = re.compile(rf"""
+    ^(?:
+        (?P<date>
+            (?P<y1>\d{{4}})(?P<s1>[-/])(?P<m1>\d{{1,2}})(?P=s1)(?P<d1>\d{{1,2}})
+          | (?P<d2>\d{{1,2}})(?P<s2>[-/])(?P<m2>\d{{1,2}})(?P=s2)(?P<y2>\d{{4}})
+        )
+        (?:\s+(?P<dh>\d{{1,2}}):(?P<dmin>\d{{1,2}})(?::(?P<dsec>\d{{1,2}}))?)?
+      | (?:(?P<pre>{_CLOCK})\s+)?(?:on\s+)?(?P<next>next\s+)?(?P<day>{_DAY_WORDS})(?:\s+(?:at\s+)?(?P<post>{_CLOCK}))?
+      | (?P<ch>\d{{1,2}}):(?P<cmin>\d{{2}})
+    )$
+""", re.VERBOSE)
+_TZ_SUFFIX = re.compile(r"\s*\(?(?:utc|gmt)\)?$")
+
+def _resolve_tz(tz_str: str) -> tzinfo:
+    try: return get_zone(tz_str)
+    except ValueError: return timezone.utc
+
+def _clock(text: str) -> tuple[int, int]:
+    hour, minute = (int(p) for p in text.split(":"))
+    if not (0 <= hour <= 23 and 0 <= minute <= 59): raise ValueError("Time out of range.")
+    return hour, minute
+
+def _at(day: datetime, hour: int, minute: int, second: int = 0) -> int:
+    return int(day.replace(hour=hour, minute=minute, second=second, microsecond=0).timestamp())
+
+def _resolve_day(m: re.Match, now_local: datetime) -> int | tuple[str, str]:
+    word = m.group("day")
+    clock = m.group("pre") or m.group("post")
+    hm = _clock(clock) if clock else None
+    if word == "today":
+        day = now_local
+    elif word in ("tomorrow", "tmrw"):
+        day = now_local + timedelta(days=1)
+    else:
+        ahead = (_WEEKDAYS[word] - now_local.weekday()) % 7
+        # Today only counts for a plain weekday whose time is still ahead
+        if ahead == 0 and (m.group("next") or not hm or _at(now_local, *hm) <= now_local.timestamp()):
+            ahead = 7
+        day = now_local + timedelta(days=ahead)
+    if hm is None: return ("DATE_ONLY", day.strftime("%Y-%m-%d"))
+    return _at(day, *hm)
+
+def _resolve_date(m: re.Match, user_tz: tzinfo) -> tuple[datetime, bool]:
+    if m.group("y1"): y, mo, d = m.group("y1", "m1", "d1")
+    else: y, mo, d = m.group("y2", "m2", "d2")
+    has_time = m.group("dh") is not None
+    h, mi, sec = (int(m.group(g) or 0) for g in ("dh", "dmin", "dsec"))
+    # datetime() validates ranges (e.g. Feb 30) and raises ValueError
+    return datetime(int(y), int(mo), int(d), h, mi, sec, tzinfo=user_tz), has_time
+
+def parse_time_input(user_input: str, mode: str = "smart", user_tz_str: str = "UTC", now: datetime | None = None) -> int | tuple[str, str]:
+    """Parses a time expression into a UTC epoch, or ("DATE_ONLY", "YYYY-MM-DD") for bare dates.
+
+    Smart mode classifies the input in a single regex pass: dates (YYYY-MM-DD, YYYY/MM/DD,
+    DD-MM-YYYY, DD/MM/YYYY, optionally with HH:MM[:SS]), clock times (today), weekdays,
+    "today"/"tomorrow" (optionally with a time) and durations. Times are in the user's timezone.
+    The other modes restrict the input to a single shape.
+    """
+    user_input = user_input.strip().lower()
+
+    # Clean up timezone suffixes that NLP might incorrectly leave in the time string
+    user_input = _TZ_SUFFIX.sub('', user_input).strip()
+
+    user_tz = _resolve_tz(user_tz_str)
+    now_utc = now.astimezone(timezone.utc) if now else datetime.now(timezone.utc)
+    now_local = now_utc.astimezone(user_tz)
+
+    if mode == "duration":
+        # Don't catch/mask here, let parse_duration_string error bubble up
+        return int((now_utc + timedelta(seconds=parse_duration_string(user_input))).timestamp())
+
+    m = _EXPR.match(user_input)
+    kind = None
+    if m:
+        if m.group("date"): kind = "datetime" if m.group("dh") is not None else "date"
+        elif m.group("day"): kind = "day"
+        else: kind = "clock"
+
+    if mode == "smart":
+        try:
+            if kind == "clock":
+                return _at(now_local, *_clock(user_input))
+            if kind == "day":
+                return _resolve_day(m, now_local)
+            if kind in ("date", "datetime"):
+                dt, has_time = _resolve_date(m, user_tz)
+                if has_time: return int(dt.timestamp())
+                return ("DATE_ONLY", dt.strftime("%Y-%m-%d"))
+            return int((now_utc + timedelta(seconds=parse_duration_string(user_input))).timestamp())
+        except ValueError:
+            raise ValueError(f"Invalid Time. Use '10m', '14:00' ({user_tz_str}), or 'YYYY-MM-DD'.")
+
+    if mode in ("utc_today", "utc_tomorrow"):
+        if kind != "clock": raise ValueError("Invalid Format.")
+        day = now_local + timedelta(days=1) if mode == "utc_tomorrow" else now_local
+        return _at(day, *_clock(user_input))
+
+    if mode in ("utc_custom", "utc_date_only"):
+        want = "datetime" if mode == "utc_custom" else "date"
+        if kind != want: raise ValueError("Invalid Format.")
+        try: dt, _ = _resolve_date(m, user_tz)
+        except ValueError: raise ValueError("Invalid Format.")
+        if mode == "utc_custom": return int(dt.timestamp())
+        return ("DATE_ONLY", dt.strftime("%Y-%m-%d"))
+
+    raise ValueError("Invalid time expression.")
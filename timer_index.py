@@ -0,0 +1,101 @@
+import bisect
+import uuid
+
+from timer_model import Timer
+
+def new_timer_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+def ensure_timer_ids(data: dict) -> bool:
+    """Gives every timer without one a stable "id". Returns True if anything changed."""
+    changed = False
+    for ctx in data.values():
+        if not isinstance(ctx, dict): continue
+        for t in ctx.get("timers", []):
+            if not t.get("id"):
+                t["id"] = new_timer_id()
+                changed = True
+    return changed
+
+def normalize_label(label: str) -> str:
+    return label.strip().lower()
+
+def locate(timers: list, timer_id: str, hint: int | None = None) -> int | None:
+    """Position of the timer with timer_id. Checks the indexed position first, then scans."""
+    if hint is not None and hint < len(timers) and timers[hint].get("id") == timer_id:
+        return hint
+    for i, t in enumerate(timers):
+        if t.get("id") == timer_id: return i
+    return None
+
+class ContextTimerIndex:
+    """Timers of one guild/DM context as of the last save: id -> Timer, label -> ids, sorted label/word prefixes."""
+    def __init__(self, timers: list):
+        self.order: list[str] = [] # Ids in list (end_epoch) order
+        self.by_id: dict[str, Timer] = {}
+        self.position: dict[str, int] = {}
+        self.by_label: dict[str, list[str]] = {}
+        prefixes = set()
+        for pos, t in enumerate(timers):
+            tid = t.get("id")
+            if not tid: continue
+            # Compact copy: callers keep mutating their loaded dict after save
+            self.by_id[tid] = Timer.from_dict(t)
+            self.position[tid] = pos
+            self.order.append(tid)
+            name = normalize_label(t.get("label", ""))
+            self.by_label.setdefault(name, []).append(tid)
+            prefixes.update((word, pos, tid) for word in (name, *name.split()))
+        self._prefixes = sorted(prefixes)
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def find(self, label: str) -> Timer | None:
+        """First timer (in list order) whose label matches, case-insensitively."""
+        ids = self.by_label.get(normalize_label(label))
+        return self.by_id[ids[0]] if ids else None
+
+    def search(self, query: str, limit: int = 25) -> list[Timer]:
+        """Label or word prefix matches first, then other substring matches, each in list order."""
+        q = normalize_label(query)
+        if not q: return [self.by_id[tid] for tid in self.order[:limit]]
+        hits: dict[str, int] = {}
+        i = bisect.bisect_left(self._prefixes, (q,))
+        while i < len(self._prefixes) and self._prefixes[i][0].startswith(q):
+            _, pos, tid = self._prefixes[i]
+            hits.setdefault(tid, pos)
+            i += 1
+        found = sorted(hits, key=hits.get)[:limit]
+        if len(found) < limit:
+            for tid in self.order:
+                if tid not in hits and q in normalize_label(self.by_id[tid].label):
+                    found.append(tid)
+                    if len(found) >= limit: break
+        return [self.by_id[tid] for tid in found]
+
+class TimerIndex:
+    """Per-context timer indexes: built once from the data dict, then updated per saved context."""
+    def __init__(self):
+        self.contexts: dict[str, ContextTimerIndex] = {}
+        self.timers = 0
+        self.loaded = False
+
+    def rebuild(self, data: dict):
+        self.contexts = {}
+        self.timers = 0
+        self.update(data, data.keys())
+        self.loaded = True
+
+    def update(self, data: dict, context_ids):
+        """Re-indexes just these contexts (the ones a save wrote); O(their timers)."""
+        for cid in context_ids:
+            old = self.contexts.pop(cid, None)
+            if old: self.timers -= len(old)
+            ctx = data.get(cid)
+            if isinstance(ctx, dict) and ctx.get("timers"):
+                self.contexts[cid] = idx = ContextTimerIndex(ctx["timers"])
+                self.timers += len(idx)
+
+    def get(self, context_id: str) -> ContextTimerIndex | None:
+        return self.contexts.get(context_id)
@@ -0,0 +1,153 @@
+import enum
+import sys
+from array import array
+
+class NotifyMethod(enum.Enum):
+    """Notification choices offered by the wizard and the NLP engine (stored by their display string)."""
+    PING_ROLE = "📢 Message in Server (Ping Role)"
+    PING_EVERYONE = "⚠️ Message in Server (Ping @everyone)"
+    SERVER_SILENT = "🔕 Message in Server (Silent)"
+    DM_ME = "📩 DM Me"
+    BOTH = "📣 Both (Ping & DM)"
+    SHARE_IN_CHAT = "🗣️ Share in Chat"
+    SHARE_PRIVATE = "🔒 Share in Private Message"
+    SILENT = "🔕 Silent"
+    SILENT_LEGACY = "Silent"
+    DM = "DM" # Foundry automation jobs
+
+class Mode(enum.Enum):
+    SMART = "smart"
+    SILENT = "silent"
+    AUTO = "auto"
+    DURATION = "duration"
+    UTC_TODAY = "utc_today"
+    UTC_TOMORROW = "utc_tomorrow"
+    UTC_CUSTOM = "utc_custom"
+    UTC_DATE_ONLY = "utc_date_only"
+
+_NOTIFY = {m.value: m for m in NotifyMethod}
+_MODES = {m.value: m for m in Mode}
+
+def _enum_or_raw(lookup: dict, value):
+    # Unknown strings (older versions, hand-edited rows) are kept as-is so nothing is lost
+    return lookup.get(value, value) if isinstance(value, str) else value
+
+_NO_OFFSETS = () # Shared by every timer without reminders
+
+def _offsets(values):
+    """Reminder offsets as a compact int array; anything that isn't a list of ints stays untouched."""
+    if type(values) is list:
+        if not values: return _NO_OFFSETS
+        if all(type(v) is int for v in values):
+            try: return array("q", values)
+            except OverflowError: pass
+    return values
+
+_CONVERT = {
+    "label": lambda v: sys.intern(v) if type(v) is str else v, # Template labels repeat across guilds
+    "notify_method": lambda v: _enum_or_raw(_NOTIFY, v),
+    "mode": lambda v: _enum_or_raw(_MODES, v),
+    "reminders": _offsets,
+    "sent_reminders": _offsets,
+}
+
+class Reminder:
+    """One early reminder: fires `offset` seconds before the timer's target."""
+    __slots__ = ("offset", "sent")
+    def __init__(self, offset: int, sent: bool = False):
+        self.offset = offset
+        self.sent = sent
+
+    def __repr__(self) -> str:
+        return f"Reminder({self.offset}, sent={self.sent})"
+
+# Stored keys, in the order add_timer writes them. Each one maps to the slot of the same name.
+FIELDS = (
+    "id", "label", "end_epoch", "start_epoch", "owner_id", "role_id", "notify_method", "mode",
+    "recurrence_seconds", "image_url", "discord_event_id", "event_duration", "reminders",
+    "sent_reminders", "description", "override_epoch", "type", "recurrence_tz",
+)
+_BIT = {name: 1 << i for i, name in enumerate(FIELDS)}
+_PLAIN = tuple(name for name in FIELDS if name not in _CONVERT) # Stored as-is
+
+class Timer:
+    """Slotted timer record. Converts losslessly to and from the stored JSON dict.
+
+    Keys absent from the stored dict stay absent on the way back out (tracked in `_present`),
+    unknown keys ride along in `extra`, and unrecognised notify/mode strings are kept raw.
+    """
+    __slots__ = FIELDS + ("_present", "extra")
+
+    def __init__(self, **fields):
+        self._clear()
+        for name, value in fields.items():
+            self.set(name, value)
+
+    def _clear(self):
+        self._present = 0
+        self.extra = None
+        for name in FIELDS:
+            setattr(self, name, None)
+
+    def set(self, name: str, value):
+        bit = _BIT.get(name)
+        if bit is None:
+            if self.extra is None: self.extra = {}
+            self.extra[name] = value
+            return
+        convert = _CONVERT.get(name)
+        setattr(self, name, convert(value) if convert else value)
+        self._present |= bit
+
+    def has(self, name: str) -> bool:
+        bit = _BIT.get(name)
+        return bool(self._present & bit) if bit else bool(self.extra and name in self.extra)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Timer":
+        # Hot path (runs for every timer on every save), so no per-key set() calls
+        t = cls.__new__(cls)
+        present = 0
+        extra = None
+        for name in data:
+            bit = _BIT.get(name)
+            if bit: present |= bit
+            else:
+                if extra is None: extra = {}
+                extra[name] = data[name]
+        get = data.get
+        for name in _PLAIN:
+            setattr(t, name, get(name))
+        for name, convert in _CONVERT.items():
+            setattr(t, name, convert(data[name]) if present & _BIT[name] else None)
+        t._present = present
+        t.extra = extra
+        return t
+
+    def to_dict(self) -> dict:
+        out = {}
+        for name in FIELDS:
+            if not self._present & _BIT[name]: continue
+            value = getattr(self, name)
+            if isinstance(value, enum.Enum): value = value.value
+            elif isinstance(value, (array, tuple)): value = list(value)
+            out[name] = value
+        if self.extra: out.update(self.extra)
+        return out
+
+    # --- Derived views used by the scheduler and UI ---
+    @property
+    def target_epoch(self) -> int:
+        override = self.override_epoch
+        return override if override is not None else self.end_epoch
+
+    @property
+    def notify_str(self) -> str | None:
+        return self.notify_method.value if isinstance(self.notify_method, NotifyMethod) else self.notify_method
+
+    def reminder_list(self) -> list[Reminder]:
+        sent = set(self.sent_reminders or ())
+        return [Reminder(offset, offset in sent) for offset in (self.reminders or ())]
+
+    def __repr__(self) -> str:
+        return f"Timer(id={self.id!r}, label={self.label!r}, end_epoch={self.end_epoch})"
@@ -0,0 +1,128 @@
+import asyncio
+import time
+from collections.abc import MutableMapping
+
+import metrics
+
+STATE_ENTRIES = metrics.gauge("chrono_state_entries", "Live entries per in-process state store.", ("store",))
+STATE_EVICTIONS = metrics.counter("chrono_state_evictions_total", "State entries evicted, by reason (ttl or size).", ("store", "reason"))
+
+class _Entry:
+    __slots__ = ("value", "expires", "tick")
+    def __init__(self, value, expires: float, tick: int):
+        self.value = value
+        self.expires = expires
+        self.tick = tick # Wheel tick the key is currently filed under
+
+class TTLStore(MutableMapping):
+    """Dict-like store whose entries expire `ttl` seconds after their last write (or read, if sliding).
+
+    Bounded to `max_size` entries (least recently used go first). Expired entries are invisible
+    immediately and reclaimed by sweep(), which walks a hashed timing wheel of `slots` buckets,
+    each `granularity` seconds wide, so a sweep only touches keys that are due.
+    """
+    def __init__(self, name: str, ttl: float, max_size: int = 10_000, sliding: bool = True,
+                 granularity: float = 5.0, slots: int = 128):
+        self.name = name
+        self.ttl = ttl
+        self.max_size = max_size
+        self.sliding = sliding
+        self.granularity = granularity
+        self._data: dict = {} # Insertion order doubles as LRU order
+        self._wheel: list[set] = [set() for _ in range(slots)]
+        self._swept_tick = self._tick(time.monotonic())
+        STATE_ENTRIES.set_function(lambda: len(self), store=name)
+
+    def _tick(self, t: float) -> int:
+        return int(t // self.granularity)
+
+    def _file(self, key, entry: _Entry):
+        # Never file behind the sweep cursor, or the key would wait a full rotation
+        entry.tick = max(self._tick(entry.expires), self._swept_tick + 1)
+        self._wheel[entry.tick % len(self._wheel)].add(key)
+
+    def _touch(self, key, entry: _Entry, now: float):
+        # Only extend the deadline; the wheel refiles the key lazily when its old slot comes up
+        entry.expires = now + self.ttl
+        self._data[key] = self._data.pop(key)
+
+    def _live(self, key, touch: bool):
+        entry = self._data.get(key)
+        if entry is None: return None
+        now = time.monotonic()
+        if entry.expires <= now:
+            self._evict(key, "ttl")
+            return None
+        if touch and self.sliding: self._touch(key, entry, now)
+        return entry
+
+    def _evict(self, key, reason: str):
+        entry = self._data.pop(key, None)
+        if entry is None: return
+        self._wheel[entry.tick % len(self._wheel)].discard(key)
+        STATE_EVICTIONS.inc(store=self.name, reason=reason)
+
+    def __getitem__(self, key):
+        entry = self._live(key, touch=True)
+        if entry is None: raise KeyError(key)
+        return entry.value
+
+    def __contains__(self, key) -> bool:
+        # Expiry only: a membership check isn't a use, so it doesn't extend the TTL
+        return self._live(key, touch=False) is not None
+
+    def __setitem__(self, key, value):
+        now = time.monotonic()
+        entry = self._data.pop(key, None)
+        if entry is None:
+            entry = _Entry(value, now + self.ttl, 0)
+            self._file(key, entry)
+        else:
+            entry.value = value
+            entry.expires = now + self.ttl
+        self._data[key] = entry
+        while len(self._data) > self.max_size:
+            self._evict(next(iter(self._data)), "size")
+
+    def __delitem__(self, key):
+        entry = self._data.pop(key)
+        self._wheel[entry.tick % len(self._wheel)].discard(key)
+
+    def __iter__(self):
+        now = time.monotonic()
+        return iter([k for k, e in self._data.items() if e.expires > now])
+
+    def __len__(self) -> int:
+        # Expired entries are invisible, swept or not
+        now = time.monotonic()
+        return sum(1 for e in self._data.values() if e.expires > now)
+
+    def sweep(self, now: float | None = None) -> int:
+        """Evicts everything due up to `now`. Returns the number of entries evicted."""
+        now = time.monotonic() if now is None else now
+        target = self._tick(now)
+        slots = len(self._wheel)
+        start = max(self._swept_tick + 1, target - slots + 1) # A long gap only needs one full rotation
+        evicted = 0
+        for tick in range(start, target + 1):
+            bucket = self._wheel[tick % slots]
+            for key in list(bucket):
+                entry = self._data[key]
+                if entry.tick > tick: continue # Due on a later rotation
+                if entry.expires <= now:
+                    self._evict(key, "ttl")
+                    evicted += 1
+                else:
+                    # Touched since it was filed: refile under its new deadline
+                    bucket.discard(key)
+                    self._swept_tick = tick
+                    self._file(key, entry)
+        self._swept_tick = target
+        return evicted
+
+async def sweep_forever(stores: list[TTLStore], interval: float = 5.0):
+    """Sweeps every store on a fixed cadence for the life of the process."""
+    while True:
+        await asyncio.sleep(interval)
+        for store in stores:
+            store.sweep()
@@ -0,0 +1,101 @@
+import bisect
+import functools
+import zoneinfo
+from datetime import timezone, tzinfo
+
+# Abbreviations that aren't part of any IANA zone name, shown upper-cased.
+# Ambiguous ones (CST, IST, ...) map to the zone our players most likely mean.
+ABBREVIATIONS = {
+    "est": "America/New_York", "edt": "America/New_York", "et": "America/New_York",
+    "cst": "America/Chicago", "cdt": "America/Chicago", "ct": "America/Chicago",
+    "mst": "America/Denver", "mdt": "America/Denver", "mt": "America/Denver",
+    "pst": "America/Los_Angeles", "pdt": "America/Los_Angeles", "pt": "America/Los_Angeles",
+    "akst": "America/Anchorage", "hst": "Pacific/Honolulu",
+    "brt": "America/Sao_Paulo", "art": "America/Argentina/Buenos_Aires",
+    "gmt": "UTC", "z": "UTC", "bst": "Europe/London", "wet": "Europe/Lisbon",
+    "cet": "Europe/Paris", "cest": "Europe/Paris", "eet": "Europe/Athens", "eest": "Europe/Athens",
+    "msk": "Europe/Moscow", "trt": "Europe/Istanbul",
+    "sast": "Africa/Johannesburg", "wat": "Africa/Lagos", "eat": "Africa/Nairobi",
+    "gst": "Asia/Dubai", "pkt": "Asia/Karachi", "ist": "Asia/Kolkata", "npt": "Asia/Kathmandu",
+    "ict": "Asia/Bangkok", "wib": "Asia/Jakarta", "pht": "Asia/Manila", "sgt": "Asia/Singapore",
+    "hkt": "Asia/Hong_Kong", "jst": "Asia/Tokyo", "kst": "Asia/Seoul",
+    "awst": "Australia/Perth", "acst": "Australia/Adelaide", "aest": "Australia/Sydney", "aedt": "Australia/Sydney",
+    "nzst": "Pacific/Auckland", "nzdt": "Pacific/Auckland",
+}
+
+# Big cities that aren't part of any IANA zone name, shown title-cased
+CITIES = {
+    "new delhi": "Asia/Kolkata", "delhi": "Asia/Kolkata", "mumbai": "Asia/Kolkata", "bangalore": "Asia/Kolkata",
+    "beijing": "Asia/Shanghai", "hanoi": "Asia/Ho_Chi_Minh", "abu dhabi": "Asia/Dubai", "osaka": "Asia/Tokyo",
+    "washington": "America/New_York", "boston": "America/New_York", "miami": "America/New_York",
+    "dallas": "America/Chicago", "houston": "America/Chicago",
+    "san francisco": "America/Los_Angeles", "seattle": "America/Los_Angeles",
+    "munich": "Europe/Berlin", "frankfurt": "Europe/Berlin", "manchester": "Europe/London", "barcelona": "Europe/Madrid",
+}
+
+ALIASES = ABBREVIATIONS | CITIES
+
+class TimezoneIndex:
+    """Sorted, lower-cased IANA zone list with prefix, word and alias lookups. Build once, query per keystroke."""
+    def __init__(self):
+        self.zones = sorted(zoneinfo.available_timezones() | {"UTC"})
+        self.by_lower = {z.lower(): z for z in self.zones}
+        self._lowered = sorted(self.by_lower) # For prefix bisects on the full name
+        # Words of each zone ("america", "new york", "york") plus aliases, as sorted (word, zone, alias) rows
+        words = set()
+        for lower, zone in self.by_lower.items():
+            for part in lower.split("/"):
+                city = part.replace("_", " ")
+                words.add((city, zone, ""))
+                words.update((w, zone, "") for w in city.split())
+        words.update((alias, zone, alias) for alias, zone in ALIASES.items())
+        self._words = sorted(words)
+
+    def resolve(self, name: str) -> str | None:
+        """Canonical zone name for a zone (any case) or alias, else None."""
+        key = name.strip().lower()
+        if key == "utc": return "UTC"
+        return self.by_lower.get(key) or ALIASES.get(key)
+
+    def search(self, query: str, limit: int = 25) -> list[tuple[str, str]]:
+        """Returns up to `limit` (display name, zone) pairs: name prefix, then word/alias prefix, then substring."""
+        q = query.strip().lower()
+        results: dict[str, str] = {} # zone -> display name, insertion ordered by rank
+
+        i = bisect.bisect_left(self._lowered, q)
+        while i < len(self._lowered) and len(results) < limit and self._lowered[i].startswith(q):
+            zone = self.by_lower[self._lowered[i]]
+            results[zone] = zone
+            i += 1
+
+        i = bisect.bisect_left(self._words, (q,))
+        while i < len(self._words) and len(results) < limit and self._words[i][0].startswith(q):
+            _, zone, alias = self._words[i]
+            label = alias.upper() if alias in ABBREVIATIONS else alias.title()
+            results.setdefault(zone, f"{zone} ({label})" if alias else zone)
+            i += 1
+
+        if q and len(results) < limit:
+            for lower in self._lowered:
+                if q in lower: results.setdefault(self.by_lower[lower], self.by_lower[lower])
+                if len(results) >= limit: break
+        return [(display, zone) for zone, display in results.items()]
+
+_index: TimezoneIndex | None = None
+
+def get_index() -> TimezoneIndex:
+    global _index
+    if _index is None: _index = TimezoneIndex()
+    return _index
+
+def warm():
+    """Builds the index ahead of the first autocomplete request."""
+    get_index()
+
+@functools.lru_cache(maxsize=512)
+def get_zone(name: str) -> tzinfo:
+    """Cached tzinfo for a zone name or alias. Raises ValueError if unknown."""
+    canonical = get_index().resolve(name) if name else None
+    if not canonical: raise ValueError(f"Unknown timezone: {name}")
+    if canonical == "UTC": return timezone.utc
+    return zoneinfo.ZoneInfo(canonical)
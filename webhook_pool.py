@@ -0,0 +1,79 @@
+import asyncio
+import logging
+import time
+
+import aiohttp
+import discord
+
+import metrics
+
+logger = logging.getLogger("Chrono")
+
+WEBHOOK_NAME = "Chrono Alerts"
+RETRY_PROVISION_AFTER = 3600 # Channels where we couldn't get a webhook fall back to channel.send this long
+
+WEBHOOK_SENDS = metrics.counter("chrono_webhook_sends_total", "Alert sends by delivery path (webhook, fallback).", ("path",))
+
+class WebhookPool:
+    """One webhook per alert channel, provisioned on first use and cached.
+
+    Sends go through a dedicated aiohttp session, so they use the webhooks' own rate limits
+    instead of the bot token's (shared with dashboard edits/resends); discord.py's webhook
+    adapter waits out 429s per webhook. A webhook that turns out deleted or invalid is dropped
+    and that alert falls back to channel.send; the next alert provisions a fresh one.
+    """
+    def __init__(self, client: discord.Client):
+        self.client = client
+        self.session: aiohttp.ClientSession | None = None
+        self._hooks: dict[int, discord.Webhook] = {}
+        self._unavailable: dict[int, float] = {} # channel_id -> monotonic time we gave up
+        self._locks: dict[int, asyncio.Lock] = {}
+
+    async def close(self):
+        if self.session: await self.session.close()
+
+    async def _provision(self, channel) -> discord.Webhook | None:
+        if not hasattr(channel, "create_webhook"): return None # Threads, DMs, ...
+        failed_at = self._unavailable.get(channel.id)
+        if failed_at and time.monotonic() - failed_at < RETRY_PROVISION_AFTER: return None
+        lock = self._locks.setdefault(channel.id, asyncio.Lock())
+        async with lock: # Don't create two webhooks for a burst of alerts
+            hook = self._hooks.get(channel.id)
+            if hook: return hook
+            try:
+                me = self.client.user
+                hook = next((w for w in await channel.webhooks() if w.name == WEBHOOK_NAME and w.token and w.user and w.user.id == me.id), None)
+                if not hook:
+                    hook = await channel.create_webhook(name=WEBHOOK_NAME, reason="Timer alert delivery")
+            except discord.HTTPException as e:
+                # Usually missing Manage Webhooks
+                logger.warning(f"No alert webhook for channel {channel.id}: {e}")
+                self._unavailable[channel.id] = time.monotonic()
+                return None
+            if self.session is None or self.session.closed:
+                self.session = aiohttp.ClientSession()
+            hook = discord.Webhook.from_url(hook.url, session=self.session, client=self.client)
+            self._hooks[channel.id] = hook
+            self._unavailable.pop(channel.id, None)
+            return hook
+
+    async def prepare(self, channel) -> bool:
+        """Provisions the channel's webhook ahead of a send. False if alerts there will use channel.send."""
+        return bool(self._hooks.get(channel.id) or await self._provision(channel))
+
+    async def send(self, channel, content: str | None = None, **kwargs):
+        """Sends as the bot's name/avatar through the channel's webhook, or channel.send if there isn't one."""
+        nonce = kwargs.pop("nonce", None) # Webhook executes don't take one, so webhook alerts get no dedupe at all
+        hook = self._hooks.get(channel.id) or await self._provision(channel)
+        if hook:
+            me = self.client.user
+            try:
+                msg = await hook.send(content, username=me.display_name, avatar_url=me.display_avatar.url, wait=True, **kwargs)
+                WEBHOOK_SENDS.inc(path="webhook")
+                return msg
+            except (discord.NotFound, discord.Forbidden) as e:
+                # Deleted by a server admin, or the token was reset
+                logger.warning(f"Alert webhook for channel {channel.id} is gone ({e}), falling back")
+                self._hooks.pop(channel.id, None)
+        WEBHOOK_SENDS.inc(path="fallback")
+        return await channel.send(content, nonce=nonce, **kwargs)